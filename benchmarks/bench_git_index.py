@@ -0,0 +1,78 @@
+"""
+Benchmark of listing the tracked files of a repository by reading its index
+with GitIndexVersioningSystem and by running `git ls-files` with
+GitVersioningSystem, on a synthetic index of empty files.
+
+    python benchmarks/bench_git_index.py --paths 200000 --index-version 4
+"""
+
+import argparse
+import pathlib
+import random
+import subprocess
+import tempfile
+import timeit
+
+from codecov_cli.helpers.versioning_systems import (
+    GitIndexVersioningSystem,
+    GitVersioningSystem,
+)
+
+EMPTY_BLOB = "e69de29bb2d1d6434b8b29ae5ce06ac6ffd9a13e"
+
+
+def make_paths(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = ["core", "api", "models", "utils", "views", "handlers", "internal", "ui"]
+    paths = set()
+    while len(paths) < count:
+        folders = "/".join(rng.choice(words) for _ in range(rng.randrange(1, 6)))
+        paths.add(f"src/{folders}/{rng.choice(words)}_{rng.randrange(10000)}.py")
+    return sorted(paths)
+
+
+def make_repository(folder: pathlib.Path, paths, index_version: int):
+    subprocess.run(["git", "init", "-q", str(folder)], check=True)
+    subprocess.run(
+        ["git", "-C", str(folder), "update-index", "--add", "--index-info"],
+        input="".join(f"100644 {EMPTY_BLOB}\t{path}\n" for path in paths).encode(),
+        check=True,
+    )
+    subprocess.run(
+        ["git", "-C", str(folder), "update-index", "--index-version"]
+        + [str(index_version)],
+        check=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=200000)
+    parser.add_argument("--index-version", type=int, default=2, choices=[2, 3, 4])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = pathlib.Path(tmp)
+        make_repository(folder, make_paths(args.paths), args.index_version)
+        index_size = (folder / ".git" / "index").stat().st_size
+        print(
+            f"{args.paths} paths, index version {args.index_version}, "
+            f"{index_size / 1024 / 1024:.1f} MiB"
+        )
+
+        for label, versioning_system in [
+            ("git ls-files", GitVersioningSystem()),
+            ("index reader", GitIndexVersioningSystem(folder)),
+        ]:
+
+            def list_files():
+                return versioning_system.list_relevant_files(folder)
+
+            files = len(list_files())
+            seconds = min(timeit.repeat(list_files, number=1, repeat=args.repeat))
+            print(f"{label:>12}: {seconds * 1000:7.1f} ms, {files} files")
+
+
+if __name__ == "__main__":
+    main()
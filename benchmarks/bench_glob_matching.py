@@ -0,0 +1,87 @@
+"""
+Micro-benchmark of matching filenames against the report patterns of
+FileFinder, with the regexes of globs_to_regex and with GlobSet.
+
+    python benchmarks/bench_glob_matching.py --names 100000
+"""
+
+import argparse
+import random
+import timeit
+
+from codecov_cli.helpers.folder_searcher import GlobSet, globs_to_regex
+from codecov_cli.services.upload.file_finder import (
+    coverage_files_excluded_patterns,
+    coverage_files_patterns,
+)
+
+
+def make_names(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    extensions = [
+        ".py",
+        ".js",
+        ".ts",
+        ".go",
+        ".json",
+        ".md",
+        ".txt",
+        ".c",
+        ".h",
+        ".java",
+        ".min.js",
+        ".xml",
+    ]
+    reports = ["coverage.xml", "lcov.info", "jacoco.xml", "cover.out", "junit.xml"]
+    names = []
+    for i in range(count):
+        if i % 1000 == 0:
+            names.append(rng.choice(reports))
+        else:
+            names.append(f"file{rng.randrange(10000)}{rng.choice(extensions)}")
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--names", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    names = make_names(args.names)
+    print(
+        f"{len(names)} names, {len(coverage_files_patterns)} included and "
+        f"{len(coverage_files_excluded_patterns)} excluded patterns"
+    )
+
+    for label, compile_globs in [("regex", globs_to_regex), ("GlobSet", GlobSet)]:
+        compile_seconds = min(
+            timeit.repeat(
+                lambda: (
+                    compile_globs(coverage_files_patterns),
+                    compile_globs(coverage_files_excluded_patterns),
+                ),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        include = compile_globs(coverage_files_patterns)
+        exclude = compile_globs(coverage_files_excluded_patterns)
+
+        def match_all():
+            return [
+                name
+                for name in names
+                if not exclude.match(name) and include.match(name)
+            ]
+
+        matches = len(match_all())
+        seconds = min(timeit.repeat(match_all, number=1, repeat=args.repeat))
+        print(
+            f"{label:>8}: compile {compile_seconds * 1000:7.2f} ms, "
+            f"{seconds / len(names) * 1e9:6.0f} ns per name, {matches} matches"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of the network section of the upload payload in the list and
+front-coded formats, on synthetic repository paths: its size (raw and
+compressed), the json.dumps time of the encoded section, and the time to
+stream it from the unsorted paths (sorting and front coding included).
+
+    python benchmarks/bench_network_encoding.py --paths 200000
+"""
+
+import argparse
+import random
+import json
+import timeit
+import zlib
+
+from codecov_cli.services.upload.network_encoding import encode_network
+from codecov_cli.services.upload.payload_encoder import PayloadEncoder
+
+
+def make_paths(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    top = ["src", "lib", "tests", "packages", "vendor/github.com"]
+    words = ["core", "api", "models", "utils", "views", "handlers", "internal", "ui"]
+    extensions = [".py", ".ts", ".go", ".java", ".json", ".md"]
+    paths = set()
+    while len(paths) < count:
+        depth = rng.randrange(1, 6)
+        folders = "/".join(rng.choice(words) for _ in range(depth))
+        name = f"{rng.choice(words)}_{rng.randrange(1000)}{rng.choice(extensions)}"
+        paths.add(f"{rng.choice(top)}/{folders}/{name}")
+    paths = list(paths)
+    rng.shuffle(paths)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paths = make_paths(args.paths)
+    print(f"{len(paths)} paths")
+
+    for network_format in ["list", "front-coded"]:
+        encoder = PayloadEncoder(network_format=network_format)
+        section = encode_network(paths, network_format)
+
+        def stream():
+            return b"".join(encoder.iter_network(paths))
+
+        serialized = stream()
+        dumps_seconds = min(
+            timeit.repeat(lambda: json.dumps(section), number=1, repeat=args.repeat)
+        )
+        stream_seconds = min(timeit.repeat(stream, number=1, repeat=args.repeat))
+        print(
+            f"{network_format:>12}: {len(serialized) / 1024:7.0f} KiB, "
+            f"{len(zlib.compress(serialized)) / 1024:6.0f} KiB compressed, "
+            f"json.dumps {dumps_seconds * 1000:6.1f} ms, "
+            f"streamed {stream_seconds * 1000:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
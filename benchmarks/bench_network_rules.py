@@ -0,0 +1,61 @@
+"""
+Benchmark of filtering and prefixing the network files of a synthetic monorepo
+with FilteredNetwork, against a list comprehension trying the rules in turn
+(which is what the single --network-filter used to be).
+
+    python benchmarks/bench_network_rules.py --paths 200000 --rules 20
+"""
+
+import argparse
+import random
+import timeit
+
+from codecov_cli.services.upload.network_finder import FilteredNetwork, PrefixTrie
+
+
+def make_paths(count: int, services: int, seed: int = 0):
+    rng = random.Random(seed)
+    roots = [f"services/service{i}/" for i in range(services)] + ["lib/", "docs/"]
+    return [
+        f"{rng.choice(roots)}src/module{rng.randrange(100)}/file{i}.py"
+        for i in range(count)
+    ]
+
+
+def filter_in_turn(files, rules):
+    # Rules sorted longest filter first, so the first match is the longest one
+    rules = sorted(rules, key=lambda rule: len(rule[0]), reverse=True)
+    network = []
+    for file in files:
+        for network_filter, network_prefix in rules:
+            if file.startswith(network_filter):
+                network.append(network_prefix + file)
+                break
+    return network
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=200000)
+    parser.add_argument("--rules", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    files = make_paths(args.paths, args.rules)
+    for rules_count in sorted({1, args.rules}):
+        rules = [(f"services/service{i}/", f"service{i}/") for i in range(rules_count)]
+        trie = PrefixTrie(rules)
+        assert list(FilteredNetwork(files, trie)) == filter_in_turn(files, rules)
+        for label, filter_files in [
+            ("in turn", lambda: filter_in_turn(files, rules)),
+            ("trie", lambda: list(FilteredNetwork(files, trie))),
+        ]:
+            seconds = min(timeit.repeat(filter_files, number=1, repeat=args.repeat))
+            print(
+                f"{rules_count:3} rules, {label:>7}: {seconds * 1000:7.1f} ms "
+                f"for {len(files)} paths"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Micro-benchmark of folder_searcher.search_files against the os.walk based
+walk it replaced, on a synthetic source tree.
+
+    python benchmarks/bench_search_files.py --dirs 2000 --files-per-dir 50
+"""
+
+import argparse
+import functools
+import os
+import pathlib
+import tempfile
+import timeit
+
+from codecov_cli.helpers.folder_searcher import globs_to_regex, search_files
+from codecov_cli.services.upload.file_finder import (
+    coverage_files_excluded_patterns,
+    coverage_files_patterns,
+    default_folders_to_ignore,
+)
+
+
+def search_files_with_os_walk(
+    folder_to_search,
+    folders_to_ignore,
+    *,
+    filename_include_regex,
+    filename_exclude_regex=None,
+    multipart_include_regex=None,
+    multipart_exclude_regex=None,
+):
+    for dirpath, dirnames, filenames in os.walk(folder_to_search):
+        dirnames[:] = [d for d in dirnames if d not in folders_to_ignore]
+        for name in filenames:
+            path = pathlib.Path(dirpath) / name
+            if (
+                filename_exclude_regex is not None
+                and filename_exclude_regex.match(path.name)
+            ) or (
+                multipart_exclude_regex is not None
+                and multipart_exclude_regex.match(path.as_posix())
+            ):
+                continue
+            if filename_include_regex.match(path.name) and (
+                multipart_include_regex is None
+                or multipart_include_regex.match(path.resolve().as_posix())
+            ):
+                yield path
+
+
+def build_tree(root: pathlib.Path, dirs: int, files_per_dir: int) -> None:
+    extensions = [".py", ".js", ".ts", ".go", ".json", ".md", ".txt"]
+    for d in range(dirs):
+        directory = root / f"pkg{d % 50}" / f"module{d}"
+        directory.mkdir(parents=True)
+        for f in range(files_per_dir):
+            (directory / f"file{f}{extensions[f % len(extensions)]}").touch()
+        if d % 100 == 0:
+            (directory / "coverage.xml").touch()
+            (directory / "node_modules" / "dep").mkdir(parents=True)
+            (directory / "node_modules" / "dep" / "index.js").touch()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dirs", type=int, default=1000)
+    parser.add_argument("--files-per-dir", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Threads for the parallel search"
+    )
+    parser.add_argument(
+        "--multipart-include",
+        action="store_true",
+        help="Also match every hit against a full path regex",
+    )
+    args = parser.parse_args()
+
+    kwargs = dict(
+        filename_include_regex=globs_to_regex(coverage_files_patterns),
+        filename_exclude_regex=globs_to_regex(coverage_files_excluded_patterns),
+    )
+    if args.multipart_include:
+        kwargs["filename_include_regex"] = globs_to_regex(["*"])
+        kwargs["multipart_include_regex"] = globs_to_regex(["**/module*/*"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(tmp)
+        build_tree(root, args.dirs, args.files_per_dir)
+        print(f"{args.dirs} directories, {args.dirs * args.files_per_dir} files")
+
+        for label, search in [
+            ("os.walk", search_files_with_os_walk),
+            ("search_files", search_files),
+            (
+                f"{args.workers} workers",
+                functools.partial(search_files, workers=args.workers),
+            ),
+        ]:
+            found = list(search(root, default_folders_to_ignore, **kwargs))
+            seconds = min(
+                timeit.repeat(
+                    lambda: list(search(root, default_folders_to_ignore, **kwargs)),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            print(f"{label:>14}: {seconds * 1000:8.1f} ms, {len(found)} matches")
+
+
+if __name__ == "__main__":
+    main()
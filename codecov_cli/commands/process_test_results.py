@@ -254,7 +254,9 @@ def generate_message_payload(
     for result in upload_collection_results:
         try:
             logger.info(f"Parsing {result.get_filename()}")
-            parsed_info = parse_junit_xml(result.get_content())
+            with result.open_buffer() as content:
+                # The parser only takes bytes, so this is the one copy we make
+                parsed_info = parse_junit_xml(content.tobytes())
             for testrun in parsed_info.testruns:
                 if (
                     testrun.outcome == Outcome.Failure
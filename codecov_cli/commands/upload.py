@@ -8,7 +8,9 @@ import sentry_sdk
 from codecov_cli.fallbacks import CodecovOption, FallbackFieldEnum
 from codecov_cli.helpers.args import get_cli_args
 from codecov_cli.helpers.options import global_options
+from codecov_cli.helpers.validators import validate_network_rules
 from codecov_cli.services.upload import do_upload_logic
+from codecov_cli.services.upload.chunked_upload import PART_SIZE_ALIGNMENT
 from codecov_cli.types import CommandContext
 from codecov_cli.helpers.upload_type import report_type_from_str, ReportType
 
@@ -169,6 +171,12 @@ _global_upload_options = [
         is_flag=True,
         help="Use the legacy upload endpoint",
     ),
+    click.option(
+        "--gzip-legacy-upload",
+        "gzip_legacy_upload",
+        is_flag=True,
+        help="Gzip the report sent to storage by the legacy uploader. It is then sent with chunked transfer encoding and no Content-Length, which some storage backends, like presigned S3 URLs, reject",
+    ),
     click.option(
         "--handle-no-reports-found",
         "handle_no_reports_found",
@@ -210,6 +218,106 @@ _global_upload_options = [
         "--swift-project",
         help="Specify the swift project",
     ),
+    click.option(
+        "--compression-workers",
+        help="Number of threads used to compress coverage files before upload. Defaults to 1, which streams every file in chunks. More threads hold up to twice as many whole compressed files in memory",
+        type=click.IntRange(min=1),
+    ),
+    click.option(
+        "--compression-codec",
+        help="Codec used to compress coverage files. 'auto' benchmarks a few zlib levels on the reports and picks the fastest overall, or uses --compression-level if given. Codecs other than zlib must be supported by the Codecov instance receiving the upload",
+        type=click.Choice(["zlib", "deflate", "lzma", "auto"]),
+        default="zlib",
+        show_default=True,
+    ),
+    click.option(
+        "--compression-level",
+        help="Compression level, from 0 (fastest) to 9 (smallest). Defaults to the codec's default level",
+        type=click.IntRange(min=0, max=9),
+    ),
+    click.option(
+        "--payload-format",
+        help="Format of the payload sent to storage. 'binary' sends compressed files as raw bytes instead of base64 in JSON, and must be supported by the Codecov instance receiving the upload",
+        type=click.Choice(["json", "binary"]),
+        default="json",
+        show_default=True,
+    ),
+    click.option(
+        "--deduplicate-files",
+        help="Send coverage files with identical content only once, listing the others as aliases. Must be supported by the Codecov instance receiving the upload",
+        is_flag=True,
+        default=False,
+    ),
+    click.option(
+        "--upload-part-size",
+        help="Send payloads bigger than this many bytes to storage in a resumable upload session (the Google Cloud Storage protocol), in parts of this size rounded down to a multiple of 262144, resuming from what storage has after a failure. Storage that doesn't start a session, like presigned PUT URLs, gets the payload in a single request instead",
+        type=click.IntRange(min=PART_SIZE_ALIGNMENT),
+        default=None,
+    ),
+    click.option(
+        "--max-payload-bytes",
+        help="Split the reports into several uploads, sent one after the other, when the estimated payload is bigger than this many bytes. Every upload carries the network section and file fixes",
+        type=click.IntRange(min=1),
+        default=None,
+    ),
+    click.option(
+        "--overlap-upload-request",
+        help="Write the payload while the upload request to Codecov is in flight instead of before it. The request then doesn't carry the payload size",
+        is_flag=True,
+        default=False,
+    ),
+    click.option(
+        "--search-workers",
+        help="Number of threads listing directories when searching for reports. With more than one, reports are found in no particular order",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+    ),
+    click.option(
+        "--discovery-cache-dir",
+        help="Folder to keep a cache of the report search in. Folders that didn't change since the last search with the same options aren't listed again",
+        type=click.Path(path_type=pathlib.Path, file_okay=False),
+        default=None,
+    ),
+    click.option(
+        "--discovery-mode",
+        help="How to search for reports. `walk` lists every folder of the search root, `git` only looks at the files git doesn't track (ignored ones included), so reports committed to the repository or in submodules aren't found",
+        type=click.Choice(["walk", "git"]),
+        default="walk",
+        show_default=True,
+    ),
+    click.option(
+        "--sniff-report-formats",
+        help="Read the start of every coverage report found by the search, and leave out the ones that aren't lcov, cobertura, jacoco, clover, go cover, gcov or coverage.py json reports. Files given with --file are always uploaded",
+        is_flag=True,
+        default=False,
+    ),
+    click.option(
+        "--max-report-file-bytes",
+        help="Leave out report files larger than this, with a warning",
+        type=click.IntRange(min=1),
+        default=None,
+    ),
+    click.option(
+        "--max-report-total-bytes",
+        help="Leave out the largest report files, with a warning, until the ones left add up to at most this",
+        type=click.IntRange(min=1),
+        default=None,
+    ),
+    click.option(
+        "--network-format",
+        help="How the list of files in the repository is sent. 'front-coded' sends each path as the length of the prefix it shares with the previous one and the rest of it, which is much smaller for large repositories, and must be supported by the Codecov instance receiving the upload",
+        type=click.Choice(["list", "front-coded"]),
+        default="list",
+        show_default=True,
+    ),
+    click.option(
+        "--network-rule",
+        "network_rules",
+        help="A filter and a prefix for the files listed in the network section, as FILTER=PREFIX, either of which can be empty. Can be given several times, for instance for each service of a monorepo: files are kept if their path begins with one of the filters, and get the prefix of the longest one. Applied together with --network-filter and --network-prefix",
+        multiple=True,
+        callback=validate_network_rules,
+    ),
 ]
 
 
@@ -230,8 +338,14 @@ def do_upload(
     branch: typing.Optional[str],
     build_code: typing.Optional[str],
     build_url: typing.Optional[str],
+    compression_codec: str,
+    compression_level: typing.Optional[int],
+    compression_workers: typing.Optional[int],
+    deduplicate_files: bool,
     disable_file_fixes: bool,
     disable_search: bool,
+    discovery_cache_dir: typing.Optional[pathlib.Path],
+    discovery_mode: str,
     dry_run: bool,
     env_vars: typing.Dict[str, str],
     fail_on_error: bool,
@@ -244,19 +358,30 @@ def do_upload(
     gcov_ignore: typing.Optional[str],
     gcov_include: typing.Optional[str],
     git_service: typing.Optional[str],
+    gzip_legacy_upload: bool,
     handle_no_reports_found: bool,
     job_code: typing.Optional[str],
+    max_payload_bytes: typing.Optional[int],
+    max_report_file_bytes: typing.Optional[int],
+    max_report_total_bytes: typing.Optional[int],
     name: typing.Optional[str],
     network_filter: typing.Optional[str],
+    network_format: str,
     network_prefix: typing.Optional[str],
     network_root_folder: pathlib.Path,
+    network_rules: typing.Sequence[str],
+    overlap_upload_request: bool,
+    payload_format: str,
     plugin_names: typing.List[str],
     pull_request_number: typing.Optional[str],
     recurse_submodules: bool,
     report_type_str: str,
+    search_workers: int,
     slug: typing.Optional[str],
+    sniff_report_formats: bool,
     swift_project: typing.Optional[str],
     token: typing.Optional[str],
+    upload_part_size: typing.Optional[int],
     use_legacy_uploader: bool,
 ):
     with sentry_sdk.start_transaction(op="task", name="Do Upload"):
@@ -283,12 +408,29 @@ def do_upload(
                 build_code=build_code,
                 build_url=build_url,
                 commit_sha=commit_sha,
+                compression_codec=compression_codec,
+                compression_level=compression_level,
+                compression_workers=compression_workers,
+                deduplicate_files=deduplicate_files,
                 disable_file_fixes=disable_file_fixes,
                 disable_search=disable_search,
+                discovery_cache_dir=discovery_cache_dir,
+                discovery_mode=discovery_mode,
                 dry_run=dry_run,
                 enterprise_url=enterprise_url,
                 env_vars=env_vars,
                 fail_on_error=fail_on_error,
+                gzip_legacy_upload=gzip_legacy_upload,
+                max_payload_bytes=max_payload_bytes,
+                max_report_file_bytes=max_report_file_bytes,
+                max_report_total_bytes=max_report_total_bytes,
+                network_format=network_format,
+                network_rules=network_rules,
+                overlap_upload_request=overlap_upload_request,
+                payload_format=payload_format,
+                search_workers=search_workers,
+                sniff_report_formats=sniff_report_formats,
+                upload_part_size=upload_part_size,
                 files_search_exclude_folders=list(files_search_exclude_folders),
                 files_search_explicitly_listed_files=list(
                     files_search_explicitly_listed_files
@@ -33,8 +33,14 @@ def upload_coverage(
     build_code: typing.Optional[str],
     build_url: typing.Optional[str],
     commit_sha: str,
+    compression_codec: str,
+    compression_level: typing.Optional[int],
+    compression_workers: typing.Optional[int],
+    deduplicate_files: bool,
     disable_file_fixes: bool,
     disable_search: bool,
+    discovery_cache_dir: typing.Optional[pathlib.Path],
+    discovery_mode: str,
     dry_run: bool,
     env_vars: typing.Dict[str, str],
     fail_on_error: bool,
@@ -47,21 +53,32 @@ def upload_coverage(
     gcov_ignore: typing.Optional[str],
     gcov_include: typing.Optional[str],
     git_service: typing.Optional[str],
+    gzip_legacy_upload: bool,
     handle_no_reports_found: bool,
     job_code: typing.Optional[str],
+    max_payload_bytes: typing.Optional[int],
+    max_report_file_bytes: typing.Optional[int],
+    max_report_total_bytes: typing.Optional[int],
     name: typing.Optional[str],
     network_filter: typing.Optional[str],
+    network_format: str,
     network_prefix: typing.Optional[str],
     network_root_folder: pathlib.Path,
+    network_rules: typing.Sequence[str],
+    overlap_upload_request: bool,
     parent_sha: typing.Optional[str],
+    payload_format: str,
     plugin_names: typing.List[str],
     pull_request_number: typing.Optional[str],
     recurse_submodules: bool,
     report_code: str,
     report_type_str: str,
+    search_workers: int,
     slug: typing.Optional[str],
+    sniff_report_formats: bool,
     swift_project: typing.Optional[str],
     token: typing.Optional[str],
+    upload_part_size: typing.Optional[int],
     use_legacy_uploader: bool,
 ):
     with sentry_sdk.start_transaction(op="task", name="Upload Coverage"):
@@ -92,8 +109,14 @@ def upload_coverage(
                     build_code=build_code,
                     build_url=build_url,
                     commit_sha=commit_sha,
+                    compression_codec=compression_codec,
+                    compression_level=compression_level,
+                    compression_workers=compression_workers,
+                    deduplicate_files=deduplicate_files,
                     disable_file_fixes=disable_file_fixes,
                     disable_search=disable_search,
+                    discovery_cache_dir=discovery_cache_dir,
+                    discovery_mode=discovery_mode,
                     dry_run=dry_run,
                     enterprise_url=enterprise_url,
                     env_vars=env_vars,
@@ -107,20 +130,31 @@ def upload_coverage(
                     gcov_ignore=gcov_ignore,
                     gcov_include=gcov_include,
                     git_service=git_service,
+                    gzip_legacy_upload=gzip_legacy_upload,
                     handle_no_reports_found=handle_no_reports_found,
                     job_code=job_code,
+                    max_payload_bytes=max_payload_bytes,
+                    max_report_file_bytes=max_report_file_bytes,
+                    max_report_total_bytes=max_report_total_bytes,
                     name=name,
                     network_filter=network_filter,
+                    network_format=network_format,
                     network_prefix=network_prefix,
                     network_root_folder=network_root_folder,
+                    network_rules=network_rules,
+                    overlap_upload_request=overlap_upload_request,
                     parent_sha=parent_sha,
+                    payload_format=payload_format,
                     plugin_names=plugin_names,
                     pull_request_number=pull_request_number,
                     recurse_submodules=recurse_submodules,
                     report_code=report_code,
+                    search_workers=search_workers,
                     slug=slug,
+                    sniff_report_formats=sniff_report_formats,
                     swift_project=swift_project,
                     token=token,
+                    upload_part_size=upload_part_size,
                     report_type=report_type,
                     use_legacy_uploader=use_legacy_uploader,
                     args=args,
@@ -153,8 +187,14 @@ def upload_coverage(
                     build_code=build_code,
                     build_url=build_url,
                     commit_sha=commit_sha,
+                    compression_codec=compression_codec,
+                    compression_level=compression_level,
+                    compression_workers=compression_workers,
+                    deduplicate_files=deduplicate_files,
                     disable_file_fixes=disable_file_fixes,
                     disable_search=disable_search,
+                    discovery_cache_dir=discovery_cache_dir,
+                    discovery_mode=discovery_mode,
                     dry_run=dry_run,
                     env_vars=env_vars,
                     fail_on_error=fail_on_error,
@@ -167,20 +207,31 @@ def upload_coverage(
                     gcov_ignore=gcov_ignore,
                     gcov_include=gcov_include,
                     git_service=git_service,
+                    gzip_legacy_upload=gzip_legacy_upload,
                     handle_no_reports_found=handle_no_reports_found,
                     job_code=job_code,
+                    max_payload_bytes=max_payload_bytes,
+                    max_report_file_bytes=max_report_file_bytes,
+                    max_report_total_bytes=max_report_total_bytes,
                     name=name,
                     network_filter=network_filter,
+                    network_format=network_format,
                     network_prefix=network_prefix,
                     network_root_folder=network_root_folder,
+                    network_rules=network_rules,
+                    overlap_upload_request=overlap_upload_request,
+                    payload_format=payload_format,
                     plugin_names=plugin_names,
                     pull_request_number=pull_request_number,
                     recurse_submodules=recurse_submodules,
                     report_code=report_code,
                     report_type_str=report_type_str,
+                    search_workers=search_workers,
                     slug=slug,
+                    sniff_report_formats=sniff_report_formats,
                     swift_project=swift_project,
                     token=token,
+                    upload_part_size=upload_part_size,
                     use_legacy_uploader=use_legacy_uploader,
                 )
     close_telem()
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("codecovcli")
+
+CACHE_FORMAT_VERSION = 1
+
+# A directory changed this recently may change again within the same mtime tick,
+# without its mtime moving. Such directories are listed again on the next search
+RACY_MTIME_WINDOW_NS = 2 * 10**9
+
+
+class DiscoveryCache(object):
+    """
+    Remembers, for every directory a search walked, its mtime along with the names
+    it matched and the subdirectories it walked into.
+
+    A directory's mtime changes whenever an entry is added to it, removed or renamed,
+    so as long as it's the same the directory doesn't need to be listed again.
+    One cache file is kept per search root and set of patterns, see `key`.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.previous: Dict[str, list] = {}
+        self.current: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+        try:
+            with open(path, "r") as f:
+                content = json.load(f)
+            if content.get("version") == CACHE_FORMAT_VERSION:
+                self.previous = content["directories"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    @staticmethod
+    def key(parts: Iterable[Any]) -> str:
+        return hashlib.sha256(
+            json.dumps([CACHE_FORMAT_VERSION, *parts]).encode()
+        ).hexdigest()
+
+    @classmethod
+    def open(cls, cache_dir: pathlib.Path, parts: Iterable[Any]) -> "DiscoveryCache":
+        """Opens the cache for a search, `parts` being everything its results depend on"""
+        return cls(pathlib.Path(cache_dir) / f"discovery-{cls.key(parts)}.json")
+
+    def get(
+        self, directory: str, mtime_ns: Optional[int]
+    ) -> Optional[Tuple[List[str], List[str]]]:
+        """Returns the (matched names, subdirectory names) of an unchanged directory"""
+        entry = self.previous.get(directory)
+        if mtime_ns is None or entry is None or entry[0] != mtime_ns:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.current[directory] = entry
+        return entry[1], entry[2]
+
+    def put(
+        self,
+        directory: str,
+        mtime_ns: Optional[int],
+        matches: List[str],
+        subdirectories: List[str],
+    ) -> None:
+        if mtime_ns is None or time.time_ns() - mtime_ns < RACY_MTIME_WINDOW_NS:
+            return
+        self.current[directory] = [mtime_ns, matches, subdirectories]
+
+    def save(self) -> None:
+        """
+        Writes the directories seen by the last search, dropping the ones it didn't walk.
+        The file is replaced atomically, so concurrent runs never read half of one.
+        """
+        logger.debug(
+            f"Discovery cache reused {self.hits} of {self.hits + self.misses} directories",
+            extra=dict(extra_log_attributes=dict(cache_file=str(self.path))),
+        )
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temporary_path = tempfile.mkstemp(
+                dir=self.path.parent, prefix=".discovery-", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(
+                        {
+                            "version": CACHE_FORMAT_VERSION,
+                            "directories": self.current,
+                        },
+                        f,
+                        separators=(",", ":"),
+                    )
+                os.replace(temporary_path, self.path)
+            except BaseException:
+                os.unlink(temporary_path)
+                raise
+        except OSError as exp:
+            logger.warning(f"Could not write the file discovery cache: {exp}")
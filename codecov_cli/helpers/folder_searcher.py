@@ -1,98 +1,395 @@
-import functools
 import logging
 import os
 import pathlib
+import queue
 import re
-from typing import Generator, List, Optional, Pattern
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import (
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union,
+)
 
+from codecov_cli.helpers.discovery_cache import DiscoveryCache
 from codecov_cli.helpers.glob import translate
 
 logger = logging.getLogger("codecovcli")
 
+# Nested folder names to ignore, relative to the search root. A name mapping
+# to None is a folder to ignore, one mapping to a dict has ignored subfolders
+_IgnoreTrie = Dict[str, Optional["_IgnoreTrie"]]
 
-def _is_included(
-    filename_include_regex: Pattern,
-    multipart_include_regex: Optional[Pattern],
-    path: pathlib.Path,
-):
-    return filename_include_regex.match(path.name) and (
-        multipart_include_regex is None
-        or multipart_include_regex.match(path.resolve().as_posix())
-    )
+# A folder to search, with its posix string, its resolved posix string (if needed)
+# and the node of the ignore trie for its path (if any)
+_Directory = Tuple[pathlib.Path, str, Optional[str], Optional[_IgnoreTrie]]
 
 
-def _is_excluded(
-    filename_exclude_regex: Optional[Pattern],
-    multipart_exclude_regex: Optional[Pattern],
-    path: pathlib.Path,
-):
-    return (
-        filename_exclude_regex is not None and filename_exclude_regex.match(path.name)
-    ) or (
-        multipart_exclude_regex is not None
-        and multipart_exclude_regex.match(path.as_posix())
-    )
+class FolderIgnoreMatcher(object):
+    """
+    Compiled form of a folders_to_ignore list.
+
+    Entries without a path separator are folder names, ignored wherever they
+    are found. Entries with one are paths to single folders, either relative
+    to the search root (`js/generated/coverage`) or absolute.
+    """
+
+    def __init__(self, folders_to_ignore: Iterable[Union[str, os.PathLike]]):
+        self.names: Set[str] = set()
+        self.paths: List[str] = []
+        for folder in folders_to_ignore:
+            folder = os.fspath(folder)
+            if "/" in folder or os.sep in folder:
+                self.paths.append(folder)
+            else:
+                self.names.add(folder)
+
+    def path_trie(self, root: pathlib.Path) -> Optional[_IgnoreTrie]:
+        if not self.paths:
+            return None
+        trie = {}
+        absolute_root = os.path.abspath(root)
+        for folder in self.paths:
+            if os.path.isabs(folder):
+                try:
+                    folder = os.path.relpath(folder, absolute_root)
+                except ValueError:
+                    # On another drive, so not inside the root
+                    continue
+            parts = pathlib.PurePath(os.path.normpath(folder)).parts
+            if not parts or parts[0] in (os.curdir, os.pardir):
+                # The root itself, or outside of it
+                continue
+            node = trie
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+                if node is None:
+                    # A parent folder is ignored already
+                    break
+            else:
+                node[parts[-1]] = None
+        return trie
+
+    def is_ignored(
+        self, parents: Iterable[str], ignore_trie: Optional[_IgnoreTrie]
+    ) -> bool:
+        """
+        Whether a file is in an ignored folder, given the names of the folders it is in
+        relative to the search root, and the path_trie for that root
+        """
+        ignore_node = ignore_trie
+        for parent in parents:
+            if parent in self.names:
+                return True
+            if ignore_node and parent in ignore_node:
+                ignore_node = ignore_node[parent]
+                if ignore_node is None:
+                    return True
+            else:
+                ignore_node = None
+        return False
+
+
+def _child_posix(dir_posix: str, name: str) -> str:
+    # Same as (pathlib.Path(dir_posix) / name).as_posix(), without building the Path
+    if dir_posix == ".":
+        return name
+    if dir_posix.endswith("/"):
+        return dir_posix + name
+    return dir_posix + "/" + name
+
+
+def _scan_directory(
+    directory: pathlib.Path,
+) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+    """
+    Lists a directory like os.walk does, returning its subdirectories and its other
+    entries. Symlinks to directories are listed as directories, but are marked so they
+    aren't walked into. Directories that can't be listed are skipped silently.
+    """
+    dirs = []
+    files = []
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return dirs, files
+    with entries:
+        for entry in entries:
+            try:
+                # DirEntry caches the type from the listing, this is usually free
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            (dirs if is_dir else files).append(entry)
+    return dirs, files
 
 
 def search_files(
     folder_to_search: pathlib.Path,
-    folders_to_ignore: List[str],
+    folders_to_ignore: Union[List[str], FolderIgnoreMatcher],
     *,
     filename_include_regex: Pattern,
     filename_exclude_regex: Optional[Pattern] = None,
     multipart_include_regex: Optional[Pattern] = None,
     multipart_exclude_regex: Optional[Pattern] = None,
     search_for_directories: bool = False,
+    workers: int = 1,
+    sort_results: bool = False,
+    cache_dir: Optional[pathlib.Path] = None,
+    sizes: Optional[Dict[pathlib.Path, int]] = None,
 ) -> Generator[pathlib.Path, None, None]:
     """ "
     Searches for files or directories in a given folder
 
     Parameters:
         folder_to_search (pathlib.Path): in which folder you want the search to be
-        folders_to_ignore (list of str): what folders inside the folder_to_search to ignore and not search inside
+        folders_to_ignore (list of str or FolderIgnoreMatcher): what folders inside the folder_to_search to ignore and not search inside
         filename_include_regex (regex): Regex for filenames only, this does not include the full path of the file
         filename_exclude_regex (regex): Regex for filenames only, this does not include the full path of the file
         multipart_include_regex (regex): Regex for full path of the files you want to include
         multipart_exclude_regex (regex): Regex for full path of the files you want to exclude
         search_for_directories (bool)
+        workers (int): how many threads list directories, matches come in no particular order with more than one
+        sort_results (bool): yield the matches sorted, once the search is over
+        cache_dir (pathlib.Path): where to keep a DiscoveryCache, directories that didn't change since the last search aren't listed again
+        sizes (dict): filled with the size of the files matched, from their directory entries. Files from the cache aren't in it
 
+    Walks the tree in the same order as os.walk, but tests the regexes against the
+    names as listed and only builds Paths for the matches.
     """
-    this_is_included = functools.partial(
-        _is_included, filename_include_regex, multipart_include_regex
-    )
-    this_is_excluded = functools.partial(
-        _is_excluded, filename_exclude_regex, multipart_exclude_regex
-    )
-    for dirpath, dirnames, filenames in os.walk(folder_to_search):
-        dirs_to_remove = set(d for d in dirnames if d in folders_to_ignore)
-
-        if multipart_exclude_regex is not None:
-            dirs_to_remove.union(
-                directory
-                for directory in dirnames
-                if multipart_exclude_regex.match(
-                    (pathlib.Path(dirpath) / directory).as_posix()
-                )
+    if not isinstance(folders_to_ignore, FolderIgnoreMatcher):
+        folders_to_ignore = FolderIgnoreMatcher(folders_to_ignore)
+    ignored_names = folders_to_ignore.names
+    resolved_root = None
+    if multipart_include_regex is not None:
+        # Resolving once here, instead of for every match, gives the same paths
+        # since os.walk-style walks never go through symlinked directories
+        resolved_root = pathlib.Path(folder_to_search).resolve().as_posix()
+    cache = None
+    if cache_dir is not None:
+        cache = DiscoveryCache.open(
+            cache_dir,
+            [
+                os.path.abspath(folder_to_search),
+                filename_include_regex.pattern,
+                *(
+                    regex.pattern if regex is not None else None
+                    for regex in (
+                        filename_exclude_regex,
+                        multipart_include_regex,
+                        multipart_exclude_regex,
+                    )
+                ),
+                sorted(ignored_names),
+                folders_to_ignore.paths,
+                search_for_directories,
+            ],
+        )
+
+    def search_directory(
+        directory: _Directory,
+    ) -> Tuple[List[pathlib.Path], List[_Directory]]:
+        dir_path, dir_posix, dir_resolved, ignore_node = directory
+        if cache is not None:
+            # Taken before listing, so a change made while listing misses next time
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            cached = cache.get(dir_posix, mtime_ns)
+            if cached is not None:
+                return _from_cache(directory, *cached)
+        listed_dirs, files = _scan_directory(dir_path)
+
+        # Pruned here so that ignored folders are never walked into
+        dirs = []
+        dir_ignore_nodes = []
+        for entry in listed_dirs:
+            name = entry.name
+            if name in ignored_names:
+                continue
+            child_ignore_node = None
+            if ignore_node is not None and name in ignore_node:
+                child_ignore_node = ignore_node[name]
+                if child_ignore_node is None:
+                    continue
+            if multipart_exclude_regex is not None and multipart_exclude_regex.match(
+                _child_posix(dir_posix, name)
+            ):
+                continue
+            dirs.append(entry)
+            dir_ignore_nodes.append(child_ignore_node)
+
+        matches = []
+        for entry in dirs if search_for_directories else files:
+            name = entry.name
+            if filename_exclude_regex is not None and filename_exclude_regex.match(
+                name
+            ):
+                continue
+            entry_posix = _child_posix(dir_posix, name)
+            if multipart_exclude_regex is not None and multipart_exclude_regex.match(
+                entry_posix
+            ):
+                continue
+            if not filename_include_regex.match(name):
+                continue
+            if multipart_include_regex is not None:
+                if entry.is_symlink():
+                    resolved = (dir_path / name).resolve().as_posix()
+                else:
+                    resolved = _child_posix(dir_resolved, name)
+                if not multipart_include_regex.match(resolved):
+                    continue
+            matches.append(dir_path / name)
+            if sizes is not None and not search_for_directories:
+                try:
+                    sizes[matches[-1]] = entry.stat().st_size
+                except OSError:
+                    pass
+
+        subdirectories = [
+            (
+                dir_path / entry.name,
+                _child_posix(dir_posix, entry.name),
+                _child_posix(dir_resolved, entry.name)
+                if dir_resolved is not None
+                else None,
+                child_ignore_node,
+            )
+            for entry, child_ignore_node in zip(dirs, dir_ignore_nodes)
+            if not entry.is_symlink()
+        ]
+        if cache is not None:
+            cache.put(
+                dir_posix,
+                mtime_ns,
+                [path.name for path in matches],
+                [path.name for path, _, _, _ in subdirectories],
             )
+        return matches, subdirectories
+
+    root_path = pathlib.Path(folder_to_search)
+    root = (
+        root_path,
+        root_path.as_posix(),
+        resolved_root,
+        folders_to_ignore.path_trie(root_path),
+    )
+    if workers > 1:
+        found = _walk_in_parallel(search_directory, root, workers)
+    else:
+        found = _walk(search_directory, root)
+    if sort_results:
+        found = sorted(found)
+    yield from found
+    if cache is not None:
+        # Only a search that went through the whole tree knows every directory in it
+        cache.save()
 
-        for directory in dirs_to_remove:
-            # Removing to ensure we don't even try to search those
-            # This is the documented way of doing this on python docs
-            dirnames.remove(directory)
 
-        if search_for_directories:
-            for directory in dirnames:
-                dir_path = pathlib.Path(dirpath) / directory
-                if not this_is_excluded(dir_path) and this_is_included(dir_path):
-                    yield dir_path
-        else:
-            for single_filename in filenames:
-                file_path = pathlib.Path(dirpath) / single_filename
-                if not this_is_excluded(file_path) and this_is_included(file_path):
-                    yield file_path
+def _from_cache(
+    directory: _Directory, matched_names: List[str], subdirectory_names: List[str]
+) -> Tuple[List[pathlib.Path], List[_Directory]]:
+    dir_path, dir_posix, dir_resolved, ignore_node = directory
+    matches = [dir_path / name for name in matched_names]
+    subdirectories = [
+        (
+            dir_path / name,
+            _child_posix(dir_posix, name),
+            _child_posix(dir_resolved, name) if dir_resolved is not None else None,
+            ignore_node.get(name) if ignore_node is not None else None,
+        )
+        for name in subdirectory_names
+    ]
+    return matches, subdirectories
 
 
-def globs_to_regex(patterns: List[str]) -> Optional[Pattern]:
+def match_files(
+    folder: pathlib.Path,
+    relative_paths: Iterable[str],
+    folders_to_ignore: Union[List[str], FolderIgnoreMatcher],
+    *,
+    filename_include_regex: Pattern,
+    filename_exclude_regex: Optional[Pattern] = None,
+) -> Generator[pathlib.Path, None, None]:
+    """
+    Filters a listing of the files in a folder, as posix paths relative to it, the way
+    search_files would filter them while walking it.
+
+    Parameters:
+        folder (pathlib.Path): the folder the paths are relative to
+        relative_paths (iterable of str): the files in the folder
+        folders_to_ignore (list of str or FolderIgnoreMatcher): folders to leave out the files of
+        filename_include_regex (regex): Regex for filenames only, this does not include the full path of the file
+        filename_exclude_regex (regex): Regex for filenames only, this does not include the full path of the file
+    """
+    if not isinstance(folders_to_ignore, FolderIgnoreMatcher):
+        folders_to_ignore = FolderIgnoreMatcher(folders_to_ignore)
+    ignore_trie = folders_to_ignore.path_trie(folder)
+    for relative_path in relative_paths:
+        *parents, name = relative_path.split("/")
+        if filename_exclude_regex is not None and filename_exclude_regex.match(name):
+            continue
+        if not filename_include_regex.match(name):
+            continue
+        if not folders_to_ignore.is_ignored(parents, ignore_trie):
+            yield folder / relative_path
+
+
+def _walk(
+    search_directory: Callable, root: _Directory
+) -> Generator[pathlib.Path, None, None]:
+    stack = [root]
+    while stack:
+        matches, subdirectories = search_directory(stack.pop())
+        yield from matches
+        # Pushed in reverse so they are popped, and walked, in listing order
+        stack.extend(reversed(subdirectories))
+
+
+def _walk_in_parallel(
+    search_directory: Callable, root: _Directory, workers: int
+) -> Generator[pathlib.Path, None, None]:
+    """
+    Lists directories on a pool of threads, so that the time spent waiting on the
+    filesystem overlaps. Every directory listed queues its subdirectories to the
+    pool, and matches are yielded in whatever order directories finish.
+    """
+    finished = queue.SimpleQueue()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def submit(directory: _Directory) -> None:
+            future = executor.submit(search_directory, directory)
+            future.add_done_callback(finished.put)
+
+        try:
+            submit(root)
+            outstanding = 1
+            while outstanding:
+                matches, subdirectories = finished.get().result()
+                outstanding -= 1
+                for directory in subdirectories:
+                    submit(directory)
+                outstanding += len(subdirectories)
+                yield from matches
+        finally:
+            # Don't go on listing directories if the caller stopped early or failed
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Enough for every set of patterns used in a run, plugins included
+GLOBS_CACHE_SIZE = 256
+
+
+def globs_to_regex(patterns: Iterable[str]) -> Optional[Pattern]:
     """
     Converts a list of glob patterns to a combined ORed regex
 
@@ -101,7 +398,15 @@ def globs_to_regex(patterns: List[str]) -> Optional[Pattern]:
 
     Returns:
         (Pattern): a combined ORed regex, or None if patterns is an empty list
+
+    The regexes are memoized by their patterns, so calling this again with the same
+    patterns is cheap.
     """
+    return _compile_globs(tuple(patterns))
+
+
+@lru_cache(maxsize=GLOBS_CACHE_SIZE)
+def _compile_globs(patterns: Tuple[str, ...]) -> Optional[Pattern]:
     # if patterns is an empty list, avoid returning re.compile("") since it matches everything
     if not patterns:
         return None
@@ -112,3 +417,65 @@ def globs_to_regex(patterns: List[str]) -> Optional[Pattern]:
         logger.debug(f"Translating `{pattern}` into `{regex_pattern}`")
         regex_patterns.append(regex_pattern)
     return re.compile("|".join(regex_patterns))
+
+
+_GLOB_WILDCARDS = re.compile(r"[*?\[]")
+
+
+def has_wildcards(pattern: str) -> bool:
+    return _GLOB_WILDCARDS.search(pattern) is not None
+
+
+class GlobSet(object):
+    """
+    Filename globs compiled to be matched against a lot of names.
+
+    Literal names are looked up in a set, `*.<extension>` globs in a set of extensions,
+    and other `*<literal>` and `<literal>*` globs in tables of suffixes and prefixes,
+    by length. Only the remaining globs go through a regex, see globs_to_regex.
+    Matches the same names as globs_to_regex(patterns).
+
+    It has the `match` method and the `pattern` attribute of a compiled regex,
+    so it can be given to search_files in place of one.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        self.pattern = "\n".join(self.patterns)
+        self.names: Set[str] = set()
+        self.extensions: Set[str] = set()
+        self.suffixes: Dict[int, Set[str]] = {}
+        self.prefixes: Dict[int, Set[str]] = {}
+        wildcard_patterns = []
+        for pattern in self.patterns:
+            head, star, tail = pattern.partition("*")
+            if "/" in pattern or os.sep in pattern:
+                # Never matches a name, but kept so that matching is the same
+                wildcard_patterns.append(pattern)
+            elif not _GLOB_WILDCARDS.search(pattern):
+                self.names.add(pattern)
+            elif not head and not _GLOB_WILDCARDS.search(tail):
+                if tail.startswith(".") and "." not in tail[1:]:
+                    self.extensions.add(tail[1:])
+                    continue
+                self.suffixes.setdefault(len(tail), set()).add(tail)
+            elif not tail and star and not _GLOB_WILDCARDS.search(head):
+                self.prefixes.setdefault(len(head), set()).add(head)
+            else:
+                wildcard_patterns.append(pattern)
+        self.regex = globs_to_regex(wildcard_patterns)
+
+    def match(self, name: str) -> bool:
+        if name in self.names:
+            return True
+        _, dot, extension = name.rpartition(".")
+        if dot and extension in self.extensions:
+            return True
+        size = len(name)
+        for length, suffixes in self.suffixes.items():
+            if length <= size and name[size - length :] in suffixes:
+                return True
+        for length, prefixes in self.prefixes.items():
+            if name[:length] in prefixes:
+                return True
+        return self.regex is not None and self.regex.match(name) is not None
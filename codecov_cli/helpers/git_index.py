@@ -0,0 +1,118 @@
+"""
+Reads the paths git tracks from its index file, the way `git ls-files` lists
+them, without running git. The format is described in gitformat-index(5).
+"""
+
+import mmap
+import os
+import struct
+import typing
+
+INDEX_SIGNATURE = b"DIRC"
+SUPPORTED_VERSIONS = (2, 3, 4)
+SHA1_SIZE = 20
+SHA256_SIZE = 32
+
+INDEX_HEADER = struct.Struct(">4sII")
+EXTENSION_HEADER = struct.Struct(">4sI")
+ENTRY_FLAGS = struct.Struct(">H")
+# ctime, mtime, dev, ino, mode, uid, gid and size come before the object name
+ENTRY_STAT_SIZE = 40
+EXTENDED_FLAG = 0x4000
+NAME_LENGTH_MASK = 0xFFF
+
+
+class GitIndexError(ValueError):
+    pass
+
+
+def read_index_paths(
+    index_path: typing.Union[str, os.PathLike], hash_size: int = SHA1_SIZE
+) -> typing.List[bytes]:
+    """
+    The paths in the index, in its order and undecoded. Raises GitIndexError if the
+    index can't be listed without git, like split and sparse indexes.
+    """
+    try:
+        f = open(index_path, "rb")
+    except FileNotFoundError:
+        # Nothing was ever added to the repository
+        return []
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise GitIndexError(f"{index_path} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            try:
+                return parse_index(data, hash_size)
+            except (IndexError, struct.error):
+                raise GitIndexError(f"{index_path} is truncated")
+
+
+def parse_index(data: typing.Any, hash_size: int = SHA1_SIZE) -> typing.List[bytes]:
+    signature, version, entries_count = INDEX_HEADER.unpack_from(data)
+    if signature != INDEX_SIGNATURE:
+        raise GitIndexError("Not a git index")
+    if version not in SUPPORTED_VERSIONS:
+        raise GitIndexError(f"Unsupported index version {version}")
+
+    flags_offset = ENTRY_STAT_SIZE + hash_size
+    paths = []
+    previous = b""
+    offset = INDEX_HEADER.size
+    for _ in range(entries_count):
+        # The flags are read a byte at a time, that's faster than unpacking them
+        flags_position = offset + flags_offset
+        high_flags = data[flags_position]
+        name_offset = flags_position + ENTRY_FLAGS.size
+        if version >= 3 and high_flags & EXTENDED_FLAG >> 8:
+            name_offset += ENTRY_FLAGS.size
+        if version == 4:
+            # The name is what's left of the previous one once some bytes are
+            # stripped from its end, followed by the rest of it
+            stripped, name_offset = _read_offset_varint(data, name_offset)
+            if stripped > len(previous):
+                raise GitIndexError("Invalid path prefix compression")
+            end = data.find(b"\0", name_offset)
+            if end < 0:
+                raise GitIndexError("Unterminated path")
+            path = previous[: len(previous) - stripped] + data[name_offset:end]
+            offset = end + 1
+        else:
+            name_length = (
+                high_flags << 8 | data[flags_position + 1]
+            ) & NAME_LENGTH_MASK
+            if name_length == NAME_LENGTH_MASK:
+                end = data.find(b"\0", name_offset + name_length)
+                if end < 0:
+                    raise GitIndexError("Unterminated path")
+            else:
+                end = name_offset + name_length
+            path = data[name_offset:end]
+            # Entries are padded with 1 to 8 NULs to a multiple of 8 bytes
+            offset += (end - offset + 8) & ~7
+        # The stages of a conflicted path follow each other, it is listed once
+        if path != previous:
+            paths.append(path)
+        previous = path
+
+    extensions_end = len(data) - hash_size
+    while offset + EXTENSION_HEADER.size <= extensions_end:
+        extension, size = EXTENSION_HEADER.unpack_from(data, offset)
+        # Extensions starting with a lowercase letter change what the entries mean,
+        # the index can't be read without understanding them
+        if extension[:1].islower():
+            raise GitIndexError(f"Unsupported index extension {extension.decode()!r}")
+        offset += EXTENSION_HEADER.size + size
+    return paths
+
+
+def _read_offset_varint(data: typing.Any, offset: int) -> typing.Tuple[int, int]:
+    byte = data[offset]
+    if byte < 0x80:
+        return byte, offset + 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        offset += 1
+        byte = data[offset]
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset + 1
@@ -35,6 +35,9 @@ def get(url: str, headers: dict = None, params: dict = None) -> requests.Respons
 
 def put(url: str, data: dict = None, headers: dict = None) -> requests.Response:
     headers = _set_user_agent(headers)
+    if hasattr(data, "seek"):
+        # file-like bodies are consumed by the request, rewind them so retries resend everything
+        data.seek(0)
     return requests.put(url, data=data, headers=headers)
 
 
@@ -11,3 +11,10 @@ def validate_commit_sha(ctx, param, value):
     if not re.match(r"[0-9a-f]{40}", value):
         raise click.BadParameter("Commit SHA doesn't match SHA1 regex")
     return value
+
+
+def validate_network_rules(ctx, param, value):
+    for rule in value:
+        if "=" not in rule:
+            raise click.BadParameter(f"{rule!r} isn't in the FILTER=PREFIX format")
+    return value
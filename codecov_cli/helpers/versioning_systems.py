@@ -1,5 +1,6 @@
 from itertools import chain
 import logging
+import os
 import re
 import subprocess
 import typing as t
@@ -9,6 +10,12 @@ from shutil import which
 from codecov_cli.fallbacks import FallbackFieldEnum
 from codecov_cli.helpers.folder_searcher import search_files
 from codecov_cli.helpers.git import parse_git_service, parse_slug
+from codecov_cli.helpers.git_index import (
+    SHA1_SIZE,
+    SHA256_SIZE,
+    GitIndexError,
+    read_index_paths,
+)
 from abc import ABC, abstractmethod
 
 logger = logging.getLogger("codecovcli")
@@ -69,7 +76,8 @@ class VersioningSystemInterface(ABC):
 
 
 def get_versioning_system() -> t.Optional[VersioningSystemInterface]:
-    for klass in [GitVersioningSystem, NoVersioningSystem]:
+    # The index is read when git can't be run, rather than walking the whole folder
+    for klass in [GitVersioningSystem, GitIndexVersioningSystem, NoVersioningSystem]:
         if klass.is_available():
             logger.debug(f"versioning system found: {klass}")
             return klass()
@@ -174,7 +182,163 @@ class GitVersioningSystem(VersioningSystemInterface):
         if recurse_submodules:
             cmd.append("--recurse-submodules")
         res = subprocess.run(cmd, capture_output=True)
-        return res.stdout.decode().split("\0")
+        files = res.stdout.decode().split("\0")
+        # Every path is followed by a NUL, nothing comes after the last one
+        if files[-1] == "":
+            files.pop()
+        return files
+
+    def list_untracked_files(
+        self, directory: Path, excluded_names: t.Iterable[str] = ()
+    ) -> t.Optional[t.List[str]]:
+        """
+        Lists the files in `directory` that git doesn't track, ignored ones included,
+        as paths relative to it. Folders named in `excluded_names` aren't looked into.
+        Returns None if `directory` isn't in a git work tree, or git can't be run.
+        """
+        cmd = ["git", "-C", str(directory), "ls-files", "-z", "--others"]
+        # Escaped so that names are compared as they are, like search_files does
+        cmd.extend(
+            "--exclude=" + re.sub(r"([\\*?\[]|^[!#])", r"\\\1", name)
+            for name in sorted(excluded_names)
+        )
+        try:
+            res = subprocess.run(cmd, capture_output=True)
+        except OSError:
+            return None
+        if res.returncode != 0:
+            return None
+        return [os.fsdecode(path) for path in res.stdout.split(b"\0") if path]
+
+
+# Git reads these to find the repository and its index, they are left to it
+GIT_LOCATION_VARIABLES = [
+    "GIT_COMMON_DIR",
+    "GIT_DIR",
+    "GIT_INDEX_FILE",
+    "GIT_WORK_TREE",
+]
+
+
+def find_git_repository(
+    directory: Path,
+) -> t.Optional[t.Tuple[Path, Path]]:
+    """
+    The work tree `directory` is in and its git directory, found the way git finds
+    them when it is run from `directory`. None if it isn't in a work tree.
+    """
+    directory = directory.resolve()
+    for folder in [directory, *directory.parents]:
+        dot_git = folder / ".git"
+        if dot_git.is_dir():
+            return folder, dot_git
+        if dot_git.is_file():
+            # Worktrees and submodules have a file pointing to their git directory
+            content = dot_git.read_text(errors="replace").strip()
+            if not content.startswith("gitdir:"):
+                return None
+            return folder, (folder / content[len("gitdir:") :].strip()).resolve()
+    return None
+
+
+class GitIndexVersioningSystem(VersioningSystemInterface):
+    """
+    Lists the files git tracks by reading its index, without running git. What the
+    index reader doesn't support, like split and sparse indexes or submodules, is
+    left to `git ls-files`, and so are the fallback values and untracked files.
+    Without a git binary those are walked for, or missing, instead.
+    """
+
+    def __init__(self, directory: t.Optional[Path] = None):
+        repository = find_git_repository(directory or Path.cwd())
+        if repository is None:
+            raise ValueError("Not in a git work tree")
+        self.work_tree, self.git_dir = repository
+        self.hash_size = SHA1_SIZE
+        common_dir = self.git_dir
+        if (self.git_dir / "commondir").is_file():
+            common_dir = self.git_dir / (self.git_dir / "commondir").read_text().strip()
+        try:
+            config = (common_dir / "config").read_text(errors="replace")
+        except OSError:
+            config = ""
+        if re.search(r"^\s*objectformat\s*=\s*sha256\s*$", config, re.I | re.M):
+            self.hash_size = SHA256_SIZE
+        # The work tree is somewhere else, git knows where
+        self.has_separate_work_tree = bool(
+            re.search(r"^\s*worktree\s*=", config, re.I | re.M)
+        )
+
+    @classmethod
+    def is_available(cls):
+        if any(variable in os.environ for variable in GIT_LOCATION_VARIABLES):
+            return False
+        try:
+            return not cls().has_separate_work_tree
+        except (OSError, ValueError):
+            return False
+
+    @staticmethod
+    def _git() -> t.Optional[GitVersioningSystem]:
+        # What needs git to be run is done by it, if there is one
+        if which("git") is None:
+            return None
+        return GitVersioningSystem()
+
+    def get_fallback_value(self, fallback_field: FallbackFieldEnum):
+        git = self._git()
+        if git is None:
+            return None
+        return git.get_fallback_value(fallback_field)
+
+    def get_network_root(self):
+        return self.work_tree
+
+    def list_relevant_files(
+        self, directory: t.Optional[Path] = None, recurse_submodules: bool = False
+    ) -> t.List[str]:
+        paths = None
+        if not recurse_submodules:
+            paths = self._read_index_paths(directory)
+        if paths is not None:
+            return [path.decode() for path in paths]
+        git = self._git()
+        if git is None:
+            return NoVersioningSystem().list_relevant_files(directory or self.work_tree)
+        return git.list_relevant_files(directory or self.work_tree, recurse_submodules)
+
+    def list_untracked_files(
+        self, directory: Path, excluded_names: t.Iterable[str] = ()
+    ) -> t.Optional[t.List[str]]:
+        """
+        Like GitVersioningSystem.list_untracked_files, None if git can't be run, as
+        the index doesn't list them.
+        """
+        git = self._git()
+        if git is None:
+            return None
+        return git.list_untracked_files(directory, excluded_names)
+
+    def _read_index_paths(
+        self, directory: t.Optional[Path] = None
+    ) -> t.Optional[t.List[bytes]]:
+        prefix = b""
+        if directory is not None:
+            try:
+                relative = Path(directory).resolve().relative_to(self.work_tree)
+            except ValueError:
+                return None
+            if relative.parts:
+                prefix = os.fsencode(relative.as_posix()) + b"/"
+        try:
+            paths = read_index_paths(self.git_dir / "index", self.hash_size)
+        except (GitIndexError, OSError) as exc:
+            logger.debug(f"Can't read the git index, listing files with git: {exc}")
+            return None
+        if prefix:
+            # Like `git -C directory ls-files`, relative to the directory
+            return [path[len(prefix) :] for path in paths if path.startswith(prefix)]
+        return paths
 
 
 class NoVersioningSystem(VersioningSystemInterface):
@@ -75,6 +75,7 @@ def _get_plugin(cli_config, plugin_name, plugin_config):
             plugin_config.get("gcov_include", None),
             plugin_config.get("gcov_ignore", None),
             plugin_config.get("gcov_args", None),
+            plugin_config.get("search_workers", 1),
         )
     if plugin_name == "pycoverage":
         config = cli_config.get("plugins", {}).get("pycoverage", {})
@@ -82,6 +83,7 @@ def _get_plugin(cli_config, plugin_name, plugin_config):
     if plugin_name == "xcode":
         return XcodePlugin(
             plugin_config.get("swift_project", None),
+            search_workers=plugin_config.get("search_workers", 1),
         )
     if plugin_name == "compress-pycoverage":
         config = cli_config.get("plugins", {}).get("compress-pycoverage", {})
@@ -22,6 +22,7 @@ class GcovPlugin(object):
         patterns_to_include: typing.Optional[typing.List[str]] = None,
         patterns_to_ignore: typing.Optional[typing.List[str]] = None,
         extra_arguments: typing.Optional[typing.List[str]] = None,
+        search_workers: int = 1,
     ):
         self.executable = executable or "gcov"
         self.extra_arguments = extra_arguments or []
@@ -29,6 +30,7 @@ class GcovPlugin(object):
         self.patterns_to_ignore = patterns_to_ignore or []
         self.patterns_to_include = patterns_to_include or []
         self.project_root = project_root or pathlib.Path(os.getcwd())
+        self.search_workers = search_workers
 
     def run_preparation(self, collector) -> PreparationPluginReturn:
         with sentry_sdk.start_span(name="gcov"):
@@ -50,6 +52,9 @@ class GcovPlugin(object):
                     self.folders_to_ignore,
                     filename_include_regex=filename_include_regex,
                     filename_exclude_regex=filename_exclude_regex,
+                    workers=self.search_workers,
+                    # Parallel searches find files in no particular order
+                    sort_results=self.search_workers > 1,
                 )
             ]
 
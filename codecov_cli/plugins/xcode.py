@@ -5,7 +5,6 @@ import re
 import shutil
 import subprocess
 import typing
-from fnmatch import translate
 
 import sentry_sdk
 
@@ -20,6 +19,7 @@ class XcodePlugin(object):
         self,
         app_name: typing.Optional[str] = None,
         derived_data_folder: typing.Optional[pathlib.Path] = None,
+        search_workers: int = 1,
     ):
         self.derived_data_folder = (
             derived_data_folder
@@ -29,6 +29,7 @@ class XcodePlugin(object):
         # this is to speed up processing and to build reports for the project being tested,
         # if empty the plugin will build reports for every xcode project it finds
         self.app_name = app_name or ""
+        self.search_workers = search_workers
 
     def run_preparation(self, collector) -> PreparationPluginReturn:
         with sentry_sdk.start_span(name="xcode"):
@@ -47,6 +48,9 @@ class XcodePlugin(object):
                     folder_to_search=self.derived_data_folder,
                     folders_to_ignore=[],
                     filename_include_regex=filename_include_regex,
+                    workers=self.search_workers,
+                    # Parallel searches find files in no particular order
+                    sort_results=self.search_workers > 1,
                 )
             )
 
@@ -73,12 +77,14 @@ class XcodePlugin(object):
         build_dir = pathlib.Path(re.sub("(Build).*", "Build", directory))
 
         for type in ["app", "framework", "xctest"]:
-            filename_include_regex = re.compile(translate(f"*.{type}"))
+            filename_include_regex = globs_to_regex([f"*.{type}"])
             matched_dir_paths = search_files(
                 folder_to_search=build_dir,
                 folders_to_ignore=[],
                 filename_include_regex=filename_include_regex,
                 search_for_directories=True,
+                workers=self.search_workers,
+                sort_results=self.search_workers > 1,
             )
 
             for dir_path in matched_dir_paths:
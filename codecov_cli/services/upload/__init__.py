@@ -13,6 +13,10 @@ from codecov_cli.plugins import select_preparation_plugins
 from codecov_cli.services.upload.file_finder import select_file_finder
 from codecov_cli.services.upload.legacy_upload_sender import LegacyUploadSender
 from codecov_cli.services.upload.network_finder import select_network_finder
+from codecov_cli.services.upload.upload_batches import (
+    send_upload_batches,
+    split_upload_data,
+)
 from codecov_cli.services.upload.upload_collector import UploadCollector
 from codecov_cli.services.upload.upload_sender import UploadSender
 from codecov_cli.services.upload_completion import upload_completion_logic
@@ -32,8 +36,14 @@ def do_upload_logic(
     build_code: typing.Optional[str],
     build_url: typing.Optional[str],
     commit_sha: str,
+    compression_codec: str = "zlib",
+    compression_level: typing.Optional[int] = None,
+    compression_workers: typing.Optional[int] = None,
+    deduplicate_files: bool = False,
     disable_file_fixes: bool = False,
     disable_search: bool = False,
+    discovery_cache_dir: typing.Optional[Path] = None,
+    discovery_mode: str = "walk",
     dry_run: bool = False,
     enterprise_url: typing.Optional[str],
     env_vars: typing.Dict[str, str],
@@ -47,20 +57,31 @@ def do_upload_logic(
     gcov_ignore: typing.Optional[str],
     gcov_include: typing.Optional[str],
     git_service: typing.Optional[str],
+    gzip_legacy_upload: bool = False,
     handle_no_reports_found: bool = False,
     job_code: typing.Optional[str],
+    max_payload_bytes: typing.Optional[int] = None,
+    max_report_file_bytes: typing.Optional[int] = None,
+    max_report_total_bytes: typing.Optional[int] = None,
     name: typing.Optional[str],
     network_filter: typing.Optional[str],
+    network_format: str = "list",
     network_prefix: typing.Optional[str],
     network_root_folder: Path,
+    network_rules: typing.Sequence[str] = (),
+    overlap_upload_request: bool = False,
     parent_sha: typing.Optional[str] = None,
+    payload_format: str = "json",
     plugin_names: typing.List[str],
     pull_request_number: typing.Optional[str],
     recurse_submodules: bool = False,
     report_code: str,
+    search_workers: int = 1,
     slug: typing.Optional[str],
+    sniff_report_formats: bool = False,
     swift_project: typing.Optional[str],
     token: typing.Optional[str],
+    upload_part_size: typing.Optional[int] = None,
     report_type: ReportType = ReportType.COVERAGE,
     use_legacy_uploader: bool = False,
 ):
@@ -71,6 +92,7 @@ def do_upload_logic(
         "gcov_ignore": gcov_ignore,
         "gcov_include": gcov_include,
         "project_root": files_search_root_folder,
+        "search_workers": search_workers,
         "swift_project": swift_project,
     }
     if report_type == ReportType.COVERAGE:
@@ -85,6 +107,11 @@ def do_upload_logic(
         files_search_explicitly_listed_files,
         disable_search,
         report_type,
+        search_workers,
+        discovery_cache_dir,
+        discovery_mode,
+        versioning_system,
+        sniff_report_formats,
     )
     network_finder = select_network_finder(
         versioning_system,
@@ -92,6 +119,7 @@ def do_upload_logic(
         network_filter=network_filter,
         network_prefix=network_prefix,
         network_root_folder=network_root_folder,
+        network_rules=network_rules,
     )
     collector = UploadCollector(
         preparation_plugins,
@@ -99,6 +127,8 @@ def do_upload_logic(
         file_selector,
         plugin_config,
         disable_file_fixes,
+        max_report_file_bytes=max_report_file_bytes,
+        max_report_total_bytes=max_report_total_bytes,
     )
     try:
         upload_data = collector.generate_upload_data(report_type)
@@ -124,9 +154,18 @@ def do_upload_logic(
         else:
             raise exp
     if use_legacy_uploader:
-        sender = LegacyUploadSender()
+        sender = LegacyUploadSender(gzip_payload=gzip_legacy_upload)
     else:
-        sender = UploadSender()
+        sender = UploadSender(
+            compression_workers=compression_workers,
+            compression_codec=compression_codec,
+            compression_level=compression_level,
+            deduplicate_files=deduplicate_files,
+            payload_format=payload_format,
+            upload_part_size=upload_part_size,
+            overlap_upload_request=overlap_upload_request,
+            network_format=network_format,
+        )
     logger.debug(f"Selected uploader to use: {type(sender)}")
     ci_service = (
         ci_adapter.get_fallback_value(FallbackFieldEnum.service)
@@ -135,8 +174,12 @@ def do_upload_logic(
     )
 
     if not dry_run:
-        sending_result = sender.send_upload_data(
-            upload_data=upload_data,
+        batches = [upload_data]
+        if max_payload_bytes:
+            batches = split_upload_data(upload_data, max_payload_bytes)
+        sending_result = send_upload_batches(
+            sender,
+            batches,
             commit_sha=commit_sha,
             token=token,
             env_vars=env_vars,
@@ -0,0 +1,124 @@
+"""
+Binary container for upload payloads, an alternative to the JSON payload that
+doesn't base64 encode the coverage files.
+
+Layout:
+    MAGIC (8 bytes, the last one is the format version)
+    header length (4 bytes, big-endian unsigned)
+    header (JSON, utf-8)
+    compressed files, back to back
+
+The header has the same keys as the JSON payload, except that every entry in
+the files list carries the `codec` used and the `offset`/`length` of its blob,
+relative to the end of the header, instead of the data itself.
+"""
+
+import json
+import shutil
+import struct
+import tempfile
+import typing
+
+from codecov_cli.services.upload.compression import get_codec
+from codecov_cli.services.upload.payload_encoder import PayloadEncoder
+from codecov_cli.types import UploadCollectionResultFile
+
+JSON_PAYLOAD_FORMAT = "json"
+BINARY_PAYLOAD_FORMAT = "binary"
+
+MAGIC = b"CCPAYLD\x01"
+HEADER_LENGTH = struct.Struct(">I")
+
+
+class BinaryPayloadError(ValueError):
+    pass
+
+
+def write_binary_payload(
+    encoder: PayloadEncoder,
+    header: typing.Dict[str, typing.Any],
+    files_key: str,
+    files: typing.Iterable[UploadCollectionResultFile],
+) -> typing.Tuple[tempfile.SpooledTemporaryFile, int]:
+    """
+    Writes the container into a spooled temporary file, rewound to the start.
+
+    The header needs the blob lengths, so blobs are staged in their own
+    spooled file while compressing and appended once the header is written.
+
+    Returns the file and the payload size in bytes.
+    """
+    index = []
+    aliases = {}
+    offset = 0
+    with tempfile.SpooledTemporaryFile(max_size=encoder.buffer_size) as blobs:
+        compressed_files = encoder.iter_compressed_files(
+            files, encoded=False, aliases=aliases
+        )
+        for file, content in compressed_files:
+            length = 0
+            for chunk in content:
+                blobs.write(chunk)
+                length += len(chunk)
+            index.append(
+                {
+                    "filename": file.get_filename(),
+                    "codec": encoder.codec.name,
+                    "offset": offset,
+                    "length": length,
+                    "labels": "",
+                }
+            )
+            offset += length
+
+        header = {**header, files_key: index}
+        if encoder.deduplicate:
+            header["file_aliases"] = aliases
+        encoded_header = json.dumps(header).encode()
+        payload = tempfile.SpooledTemporaryFile(max_size=encoder.buffer_size)
+        payload.write(MAGIC)
+        payload.write(HEADER_LENGTH.pack(len(encoded_header)))
+        payload.write(encoded_header)
+        blobs.seek(0)
+        shutil.copyfileobj(blobs, payload, encoder.chunk_size)
+
+    size = payload.tell()
+    payload.seek(0)
+    return payload, size
+
+
+def decode_binary_payload(
+    payload: typing.Union[bytes, bytearray, memoryview],
+    decompress: bool = True,
+) -> typing.Dict[str, typing.Any]:
+    """
+    Parses a binary payload back into the shape of the JSON payload, with the
+    content of every file under `data`. Without `decompress` the data is a
+    memoryview of the compressed blob, sharing memory with `payload`.
+    """
+    view = memoryview(payload)
+    if bytes(view[: len(MAGIC)]) != MAGIC:
+        raise BinaryPayloadError("Not a binary upload payload")
+    header_start = len(MAGIC) + HEADER_LENGTH.size
+    if len(view) < header_start:
+        raise BinaryPayloadError("Truncated binary upload payload")
+    (header_length,) = HEADER_LENGTH.unpack(view[len(MAGIC) : header_start])
+    blobs_start = header_start + header_length
+    if len(view) < blobs_start:
+        raise BinaryPayloadError("Truncated binary upload payload")
+    header = json.loads(bytes(view[header_start:blobs_start]))
+
+    for files_key in ("coverage_files", "test_results_files"):
+        for entry in header.get(files_key, []):
+            start = blobs_start + entry.pop("offset")
+            end = start + entry.pop("length")
+            if end > len(view):
+                raise BinaryPayloadError("Truncated binary upload payload")
+            codec_name = entry.pop("codec")
+            data = view[start:end]
+            if decompress:
+                entry["data"] = get_codec(codec_name).decompress(data)
+            else:
+                entry["codec"] = codec_name
+                entry["data"] = data
+    return header
@@ -0,0 +1,156 @@
+import logging
+import re
+import typing
+from time import sleep
+
+import requests
+
+from codecov_cli.helpers.request import (
+    MAX_RETRIES,
+    backoff_time,
+    post,
+    put,
+    request_result,
+)
+from codecov_cli.types import RequestError, RequestResult
+
+logger = logging.getLogger("codecovcli")
+
+# Parts of a resumable upload, but the last one, must be multiples of 256KiB
+PART_SIZE_ALIGNMENT = 256 * 1024
+
+# Storage answers this to parts of an upload that isn't complete yet
+RESUME_INCOMPLETE = 308
+UPLOAD_COMPLETE = (200, 201)
+PERSISTED_RANGE = re.compile(r"bytes=0-(\d+)")
+
+
+class ResumableUploader(object):
+    """
+    Sends a payload to storage in a resumable upload session, the protocol of
+    Google Cloud Storage resumable uploads:
+
+    - A POST to the upload URL with `x-goog-resumable: start` opens the session,
+      whose URL comes back in the `Location` header.
+    - Parts are PUT to the session one after the other, with a
+      `Content-Range: bytes <first>-<last>/<total>` header. Storage answers 308
+      with the `Range` it has persisted, and 200 or 201 once it has everything.
+    - After a failure, a PUT with `Content-Range: bytes */<total>` asks storage what
+      it has, and the upload resumes from there.
+
+    The upload only succeeds once storage says it has the whole payload. Upload
+    URLs that only allow a PUT, like presigned ones, can't start a session: nothing
+    is sent then, and the payload is left to be sent in a single request.
+    """
+
+    def __init__(self, part_size: int):
+        # Rounded down so that every part but the last is aligned
+        self.part_size = max(
+            PART_SIZE_ALIGNMENT, part_size - part_size % PART_SIZE_ALIGNMENT
+        )
+
+    def upload(
+        self, url: str, payload: typing.BinaryIO, size: int
+    ) -> typing.Optional[RequestResult]:
+        """None if storage didn't start a resumable upload session"""
+        session = self._start_session(url)
+        if session is None or isinstance(session, RequestResult):
+            return session
+
+        offset = 0
+        retry = 0
+        ask_status = False
+        while True:
+            if ask_status:
+                # Storage may have kept some of the part that failed, or all of it
+                body = b""
+                headers = {"Content-Range": f"bytes */{size}"}
+            else:
+                end = min(offset + self.part_size, size)
+                payload.seek(offset)
+                body = payload.read(end - offset)
+                headers = {"Content-Range": f"bytes {offset}-{end - 1}/{size}"}
+            try:
+                resp = put(session, data=body, headers=headers)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                resp = None
+            status_code = resp.status_code if resp is not None else 0
+
+            if status_code in UPLOAD_COMPLETE:
+                if ask_status or end == size:
+                    return request_result(resp)
+                return _incomplete_upload(
+                    status_code,
+                    f"Storage ended the upload after {end} of {size} bytes. URL: {url}",
+                )
+            if status_code == RESUME_INCOMPLETE:
+                persisted = _persisted_size(resp)
+                # A part storage kept nothing of failed too
+                failed = not ask_status and persisted <= offset
+                if persisted > offset:
+                    retry = 0
+                offset = persisted
+                ask_status = False
+            elif 0 < status_code < 500 and status_code != 429:
+                return request_result(resp)
+            else:
+                failed = True
+                ask_status = True
+
+            if failed:
+                retry += 1
+                if retry >= MAX_RETRIES:
+                    return _incomplete_upload(
+                        status_code,
+                        f"Storage has {offset} of {size} bytes after too many retries. URL: {url}",
+                    )
+                logger.warning(
+                    "Upload to storage failed. Resuming it",
+                    extra=dict(extra_log_attributes=dict(retry=retry, offset=offset)),
+                )
+                sleep(backoff_time(retry))
+
+    def _start_session(self, url: str) -> typing.Union[str, RequestResult, None]:
+        retry = 0
+        while True:
+            try:
+                resp = post(url, headers={"x-goog-resumable": "start"})
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                resp = None
+            if resp is not None and resp.status_code < 500:
+                break
+            retry += 1
+            if retry >= MAX_RETRIES:
+                return _incomplete_upload(
+                    resp.status_code if resp is not None else 0,
+                    f"Storage didn't start a resumable upload. URL: {url}",
+                )
+            sleep(backoff_time(retry))
+        session = resp.headers.get("Location")
+        if resp.status_code != 201 or not session:
+            # A signature for PUT requests only is refused with a 4xx
+            logger.warning(
+                "Storage didn't start a resumable upload. Sending the payload in a single request",
+                extra=dict(extra_log_attributes=dict(status_code=resp.status_code)),
+            )
+            return None
+        return session
+
+
+def _persisted_size(resp: requests.Response) -> int:
+    # No Range header means storage has nothing yet
+    match = PERSISTED_RANGE.fullmatch(resp.headers.get("Range", ""))
+    return int(match.group(1)) + 1 if match else 0
+
+
+def _incomplete_upload(status_code: int, description: str) -> RequestResult:
+    return RequestResult(
+        status_code=status_code,
+        error=RequestError(
+            code="Upload incomplete",
+            description=description,
+            params={},
+        ),
+        warnings=[],
+        text="",
+    )
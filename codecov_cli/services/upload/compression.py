@@ -0,0 +1,202 @@
+import logging
+import lzma
+import time
+import typing
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from codecov_cli.types import UploadCollectionResultFile
+
+logger = logging.getLogger("codecovcli")
+
+AUTO_CODEC = "auto"
+# The zlib levels 'auto' chooses from. Other codecs are only used when asked for,
+# the Codecov instance has to be able to decode them
+AUTO_ZLIB_LEVELS = (1, 6, 9)
+# How much of the report set is compressed by every codec when benchmarking
+BENCHMARK_SAMPLE_SIZE = 1024 * 1024
+# Upload speed assumed when trading compression time against payload size
+BENCHMARK_BANDWIDTH = 10 * 1024 * 1024
+
+
+class Codec(ABC):
+    name: str
+    # Tag that tells the ingest side how to decode a file in the payload
+    format: str
+    max_level: int = 9
+
+    def __init__(self, level: typing.Optional[int] = None):
+        if level is not None and not 0 <= level <= self.max_level:
+            raise ValueError(
+                f"Compression level for {self.name} must be between 0 and {self.max_level}"
+            )
+        self.level = level
+
+    @abstractmethod
+    def compressobj(self):
+        """
+        Returns an object with the `compress`/`flush` interface of zlib.compressobj
+        """
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        pass
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(level={self.level})"
+
+
+class ZlibCodec(Codec):
+    name = "zlib"
+    format = "base64+compressed"
+
+    def compressobj(self):
+        return zlib.compressobj(-1 if self.level is None else self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class DeflateCodec(Codec):
+    """
+    Raw deflate stream without the zlib header and checksum, using the
+    largest window and hash table zlib supports.
+    """
+
+    name = "deflate"
+    format = "base64+deflate"
+
+    def compressobj(self):
+        return zlib.compressobj(
+            -1 if self.level is None else self.level,
+            zlib.DEFLATED,
+            -zlib.MAX_WBITS,
+            9,
+        )
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data, -zlib.MAX_WBITS)
+
+
+class LzmaCodec(Codec):
+    """
+    Slower than zlib, but much better on very redundant reports (e.g. lcov)
+    """
+
+    name = "lzma"
+    format = "base64+lzma"
+
+    def compressobj(self):
+        return lzma.LZMACompressor(
+            preset=lzma.PRESET_DEFAULT if self.level is None else self.level
+        )
+
+    def decompress(self, data: bytes) -> bytes:
+        return lzma.decompress(data)
+
+
+codecs: typing.Dict[str, typing.Type[Codec]] = {
+    klass.name: klass for klass in (ZlibCodec, DeflateCodec, LzmaCodec)
+}
+
+
+def get_codec(name: str, level: typing.Optional[int] = None) -> Codec:
+    try:
+        return codecs[name](level)
+    except KeyError:
+        raise ValueError(f"Unknown compression codec: {name}")
+
+
+@dataclass
+class CodecBenchmark(object):
+    __slots__ = ("codec", "input_bytes", "output_bytes", "seconds")
+    codec: Codec
+    input_bytes: int
+    output_bytes: int
+    seconds: float
+
+    @property
+    def ratio(self) -> float:
+        return self.input_bytes / self.output_bytes if self.output_bytes else 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.input_bytes / self.seconds if self.seconds else float("inf")
+
+    def cost(self, bandwidth: float = BENCHMARK_BANDWIDTH) -> float:
+        """
+        Estimated seconds to compress and send the sample
+        """
+        return self.seconds + self.output_bytes / bandwidth
+
+
+def _sample(
+    files: typing.Iterable[UploadCollectionResultFile], sample_size: int
+) -> typing.List[bytes]:
+    files = list(files)
+    if not files:
+        return []
+    per_file = max(sample_size // len(files), 1)
+    samples = []
+    for file in files:
+        chunks = file.iter_content(per_file)
+        sample = bytes(next(chunks, b""))
+        chunks.close()
+        if sample:
+            samples.append(sample)
+    return samples
+
+
+def benchmark_codecs(
+    files: typing.Iterable[UploadCollectionResultFile],
+    candidates: typing.Iterable[Codec],
+    sample_size: int = BENCHMARK_SAMPLE_SIZE,
+) -> typing.List[CodecBenchmark]:
+    """
+    Compresses the beginning of every file with each candidate codec,
+    measuring how long it took and how small the result is.
+    """
+    samples = _sample(files, sample_size)
+    input_bytes = sum(len(sample) for sample in samples)
+    results = []
+    for codec in candidates:
+        output_bytes = 0
+        start = time.perf_counter()
+        for sample in samples:
+            compressor = codec.compressobj()
+            output_bytes += len(compressor.compress(sample)) + len(compressor.flush())
+        seconds = time.perf_counter() - start
+        results.append(CodecBenchmark(codec, input_bytes, output_bytes, seconds))
+    return results
+
+
+def select_codec(
+    files: typing.Iterable[UploadCollectionResultFile],
+    level: typing.Optional[int] = None,
+    bandwidth: float = BENCHMARK_BANDWIDTH,
+) -> Codec:
+    """
+    Picks the zlib level that compresses and sends the reports the fastest. A
+    `level` given is kept as it is.
+    """
+    if level is not None:
+        return ZlibCodec(level)
+    results = benchmark_codecs(files, [ZlibCodec(level) for level in AUTO_ZLIB_LEVELS])
+    for result in results:
+        logger.debug(
+            f"Compression benchmark for {result.codec.name}",
+            extra=dict(
+                extra_log_attributes=dict(
+                    level=result.codec.level,
+                    ratio=round(result.ratio, 2),
+                    seconds=round(result.seconds, 4),
+                )
+            ),
+        )
+    if not results or not results[0].input_bytes:
+        return ZlibCodec()
+    best = min(results, key=lambda result: result.cost(bandwidth))
+    logger.info(f"Selected zlib compression level {best.codec.level} for upload")
+    return best.codec
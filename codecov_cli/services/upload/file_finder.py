@@ -5,8 +5,21 @@ from typing import Iterable, List, Optional, Pattern
 
 import sentry_sdk
 
-from codecov_cli.helpers.folder_searcher import globs_to_regex, search_files
+from codecov_cli.helpers.folder_searcher import (
+    FolderIgnoreMatcher,
+    GlobSet,
+    globs_to_regex,
+    has_wildcards,
+    match_files,
+    search_files,
+)
 from codecov_cli.helpers.upload_type import ReportType
+from codecov_cli.helpers.versioning_systems import (
+    GitIndexVersioningSystem,
+    GitVersioningSystem,
+    VersioningSystemInterface,
+)
+from codecov_cli.services.upload.report_sniffer import filter_known_report_formats
 from codecov_cli.types import UploadCollectionResultFile
 
 logger = logging.getLogger("codecovcli")
@@ -163,6 +176,19 @@ test_results_files_excluded_patterns = (
     coverage_files_patterns + coverage_files_excluded_patterns
 )
 
+# Compiled once, since every name a search finds is matched against them.
+# Maps each report type to its (included, excluded) patterns
+report_files_matchers = {
+    ReportType.COVERAGE: (
+        GlobSet(coverage_files_patterns),
+        GlobSet(coverage_files_excluded_patterns),
+    ),
+    ReportType.TEST_RESULTS: (
+        GlobSet(test_results_files_patterns),
+        GlobSet(test_results_files_excluded_patterns),
+    ),
+}
+
 
 default_folders_to_ignore = [
     "vendor",
@@ -207,41 +233,65 @@ class FileFinder(object):
         explicitly_listed_files: Optional[List[Path]] = None,
         disable_search: bool = False,
         report_type: ReportType = ReportType.COVERAGE,
+        search_workers: int = 1,
+        discovery_cache_dir: Optional[Path] = None,
+        discovery_mode: str = "walk",
+        versioning_system: Optional[VersioningSystemInterface] = None,
+        sniff_report_formats: bool = False,
     ):
         self.search_root = search_root or Path(os.getcwd())
         self.folders_to_ignore = (
             [f.as_posix() for f in folders_to_ignore] if folders_to_ignore else []
         )
+        self.ignore_matcher = FolderIgnoreMatcher(
+            default_folders_to_ignore + self.folders_to_ignore
+        )
+        self.user_files_ignore_matcher = FolderIgnoreMatcher(self.folders_to_ignore)
         self.explicitly_listed_files = explicitly_listed_files or []
         self.disable_search = disable_search
         self.report_type: ReportType = report_type
+        self.search_workers = search_workers
+        self.discovery_cache_dir = discovery_cache_dir
+        self.discovery_mode = discovery_mode
+        self.versioning_system = versioning_system
+        self.sniff_report_formats = sniff_report_formats
 
     def find_files(self) -> List[UploadCollectionResultFile]:
         with sentry_sdk.start_span(name="find_files"):
-            if self.report_type == ReportType.COVERAGE:
-                files_excluded_patterns = coverage_files_excluded_patterns
-                files_patterns = coverage_files_patterns
-            elif self.report_type == ReportType.TEST_RESULTS:
-                files_excluded_patterns = test_results_files_excluded_patterns
-                files_patterns = test_results_files_patterns
-            regex_patterns_to_exclude = globs_to_regex(files_excluded_patterns)
-            assert regex_patterns_to_exclude  # this is never `None`
+            regex_patterns_to_include, regex_patterns_to_exclude = (
+                report_files_matchers[self.report_type]
+            )
             files_paths: Iterable[Path] = []
             user_files_paths = []
             if self.explicitly_listed_files:
                 user_files_paths = self.get_user_specified_files(
                     regex_patterns_to_exclude
                 )
+            listed_sizes = {}
             if not self.disable_search:
-                regex_patterns_to_include = globs_to_regex(files_patterns)
-                assert regex_patterns_to_include  # this is never `None`
-                files_paths = search_files(
-                    self.search_root,
-                    default_folders_to_ignore + self.folders_to_ignore,
-                    filename_include_regex=regex_patterns_to_include,
-                    filename_exclude_regex=regex_patterns_to_exclude,
-                )
-            result_files = [UploadCollectionResultFile(path) for path in files_paths]
+                files_paths = None
+                if self.discovery_mode == "git":
+                    files_paths = self.search_untracked_files(
+                        regex_patterns_to_include, regex_patterns_to_exclude
+                    )
+                if files_paths is None:
+                    files_paths = search_files(
+                        self.search_root,
+                        self.ignore_matcher,
+                        filename_include_regex=regex_patterns_to_include,
+                        filename_exclude_regex=regex_patterns_to_exclude,
+                        workers=self.search_workers,
+                        cache_dir=self.discovery_cache_dir,
+                        sizes=listed_sizes,
+                    )
+            result_files = [
+                UploadCollectionResultFile(path, listed_sizes.get(path))
+                for path in files_paths
+            ]
+            if self.sniff_report_formats and self.report_type == ReportType.COVERAGE:
+                # Only the files found by name, the ones given by the user are kept
+                with sentry_sdk.start_span(name="sniff_report_formats"):
+                    result_files = filter_known_report_formats(result_files)
             user_result_files = [
                 UploadCollectionResultFile(path)
                 for path in user_files_paths
@@ -259,11 +309,56 @@ class FileFinder(object):
 
             return list(set(result_files + user_result_files))
 
+    def search_untracked_files(
+        self,
+        regex_patterns_to_include: Pattern,
+        regex_patterns_to_exclude: Pattern,
+    ) -> Optional[Iterable[Path]]:
+        """
+        Matches the report patterns against the files git doesn't track, instead of
+        walking the search root. Reports are generated, so they are never tracked.
+        Returns None if git can't list them, so that the search root is walked instead.
+        """
+        untracked_files = None
+        if isinstance(
+            self.versioning_system, (GitVersioningSystem, GitIndexVersioningSystem)
+        ):
+            with sentry_sdk.start_span(name="list_untracked_files"):
+                untracked_files = self.versioning_system.list_untracked_files(
+                    self.search_root, self.ignore_matcher.names
+                )
+        if untracked_files is None:
+            logger.warning(
+                f'Could not list the files git doesn\'t track in "{self.search_root}". Searching the whole folder instead'
+            )
+            return None
+        return match_files(
+            self.search_root,
+            untracked_files,
+            self.ignore_matcher,
+            filename_include_regex=regex_patterns_to_include,
+            filename_exclude_regex=regex_patterns_to_exclude,
+        )
+
+    def search_user_specified_patterns(self, patterns: List[Path]) -> List[Path]:
+        """Walks the search root for the files matching any of the `-f` globs"""
+        regex_patterns_to_include = globs_to_regex([path.name for path in patterns])
+        multipart_include_regex = globs_to_regex(
+            [path.resolve().as_posix() for path in patterns]
+        )
+        return list(
+            search_files(
+                self.search_root,
+                self.user_files_ignore_matcher,
+                filename_include_regex=regex_patterns_to_include,
+                multipart_include_regex=multipart_include_regex,
+                workers=self.search_workers,
+            )
+        )
+
     def get_user_specified_files(self, regex_patterns_to_exclude: Pattern):
-        user_filenames_to_include = []
         files_excluded_but_user_includes = []
         for file in self.explicitly_listed_files:
-            user_filenames_to_include.append(file.name)
             if regex_patterns_to_exclude.match(file.name):
                 files_excluded_but_user_includes.append(file.as_posix())
         if files_excluded_but_user_includes:
@@ -273,27 +368,44 @@ class FileFinder(object):
                     extra_log_attributes=dict(files=files_excluded_but_user_includes)
                 ),
             )
-        regex_patterns_to_include = globs_to_regex(user_filenames_to_include)
-        multipart_include_regex = globs_to_regex(
-            [path.resolve().as_posix() for path in self.explicitly_listed_files]
-        )
-        user_files_paths = list(
-            search_files(
-                self.search_root,
-                self.folders_to_ignore,
-                filename_include_regex=regex_patterns_to_include,
-                multipart_include_regex=multipart_include_regex,
-            )
-        )
+        user_files_paths = []
         not_found_files = []
-        user_files_paths_resolved = [path.resolve() for path in user_files_paths]
+        patterns = []
+        resolved_root = self.search_root.resolve()
+        ignore_trie = self.user_files_ignore_matcher.path_trie(self.search_root)
         for filepath in self.explicitly_listed_files:
-            if filepath.resolve() not in user_files_paths_resolved:
-                ## The file given might be linked or in a parent dir, check to see if it exists
-                if filepath.exists():
-                    user_files_paths.append(filepath)
-                else:
-                    not_found_files.append(filepath)
+            if has_wildcards(filepath.as_posix()):
+                patterns.append(filepath)
+                continue
+            # Where the search would have found it, without walking to it
+            resolved = filepath.resolve()
+            try:
+                relative = resolved.relative_to(resolved_root)
+            except ValueError:
+                relative = None
+            if (
+                relative is not None
+                and relative.parts
+                and not self.user_files_ignore_matcher.is_ignored(
+                    relative.parts[:-1], ignore_trie
+                )
+                and resolved.is_file()
+            ):
+                user_files_paths.append(self.search_root / relative)
+            ## The file given might be linked or in a parent dir, check to see if it exists
+            elif filepath.exists():
+                user_files_paths.append(filepath)
+            else:
+                not_found_files.append(filepath)
+
+        if patterns:
+            found_paths = self.search_user_specified_patterns(patterns)
+            found_resolved = {path.resolve().as_posix() for path in found_paths}
+            for pattern in patterns:
+                regex = globs_to_regex([pattern.resolve().as_posix()])
+                if not any(regex.match(path) for path in found_resolved):
+                    not_found_files.append(pattern)
+            user_files_paths.extend(found_paths)
 
         if not_found_files:
             logger.warning(
@@ -310,6 +422,11 @@ def select_file_finder(
     explicitly_listed_files,
     disable_search,
     report_type: ReportType = ReportType.COVERAGE,
+    search_workers: int = 1,
+    discovery_cache_dir: Optional[Path] = None,
+    discovery_mode: str = "walk",
+    versioning_system: Optional[VersioningSystemInterface] = None,
+    sniff_report_formats: bool = False,
 ):
     return FileFinder(
         root_folder_to_search,
@@ -317,4 +434,9 @@ def select_file_finder(
         explicitly_listed_files,
         disable_search,
         report_type,
+        search_workers,
+        discovery_cache_dir,
+        discovery_mode,
+        versioning_system,
+        sniff_report_formats,
     )
@@ -1,6 +1,8 @@
 import logging
 import typing
+import zlib
 from dataclasses import dataclass
+from itertools import islice
 
 import sentry_sdk
 
@@ -11,6 +13,11 @@ from codecov_cli.types import UploadCollectionResult, UploadCollectionResultFile
 
 logger = logging.getLogger("codecovcli")
 
+COVERAGE_FILE_FOOTER = b"\n<<<<<< EOF\n"
+NETWORK_SECTION_FOOTER = b"<<<<<< network\n"
+# How many network paths are encoded per chunk of the payload
+NETWORK_BATCH_SIZE = 1024
+
 
 @dataclass
 class UploadSendingResultWarning(object):
@@ -33,7 +40,40 @@ class UploadSendingResult(object):
     warnings: typing.List[UploadSendingResultWarning]
 
 
+class ReiterableChunks(object):
+    """
+    Request body that streams the chunks from a fresh `factory()` iterator
+    every time it's iterated, so that a retried request resends everything.
+    Having no length, it's sent with chunked transfer encoding.
+    """
+
+    def __init__(self, factory: typing.Callable[[], typing.Iterator[bytes]]):
+        self.factory = factory
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        return self.factory()
+
+
+class SizedReiterableChunks(ReiterableChunks):
+    """
+    ReiterableChunks whose total `length` is known beforehand, requests sends it as
+    the Content-Length instead of using chunked transfer encoding.
+    """
+
+    def __init__(
+        self, factory: typing.Callable[[], typing.Iterator[bytes]], length: int
+    ):
+        super().__init__(factory)
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+
 class LegacyUploadSender(object):
+    def __init__(self, gzip_payload: bool = False):
+        self.gzip_payload = gzip_payload
+
     def send_upload_data(
         self,
         upload_data: UploadCollectionResult,
@@ -86,18 +126,64 @@ class LegacyUploadSender(object):
                 return resp
             result_url, put_url = resp.text.split("\n")
 
-            reports_payload = self._generate_payload(upload_data, env_vars)
-            resp = send_put_request(put_url, data=reports_payload)
+            put_headers = None
+            if self.gzip_payload:
+                put_headers = {"Content-Encoding": "gzip"}
+                # The compressed length isn't known until everything is compressed
+                reports_payload = ReiterableChunks(
+                    lambda: self._iter_payload(upload_data, env_vars)
+                )
+            else:
+                # Storage like presigned S3 URLs rejects bodies without a length
+                reports_payload = SizedReiterableChunks(
+                    lambda: self._iter_payload(upload_data, env_vars),
+                    self._payload_length(upload_data, env_vars),
+                )
+            resp = send_put_request(put_url, data=reports_payload, headers=put_headers)
             return resp
 
     def _generate_payload(
         self, upload_data: UploadCollectionResult, env_vars: typing.Dict[str, str]
     ) -> bytes:
-        env_vars_section = self._generate_env_vars_section(env_vars)
-        network_section = self._generate_network_section(upload_data)
-        coverage_files_section = self._generate_coverage_files_section(upload_data)
+        return b"".join(self._iter_payload(upload_data, env_vars))
 
-        return b"".join([env_vars_section, network_section, coverage_files_section])
+    def _payload_length(
+        self, upload_data: UploadCollectionResult, env_vars: typing.Dict[str, str]
+    ) -> int:
+        """The length of the uncompressed payload, without reading the coverage files"""
+        return (
+            len(self._generate_env_vars_section(env_vars))
+            + self._network_section_length(upload_data)
+            + sum(
+                len(self._coverage_file_header(file))
+                + file.get_size()
+                + len(COVERAGE_FILE_FOOTER)
+                for file in upload_data.files
+            )
+        )
+
+    def _iter_payload(
+        self, upload_data: UploadCollectionResult, env_vars: typing.Dict[str, str]
+    ) -> typing.Iterator[bytes]:
+        chunks = self._iter_payload_sections(upload_data, env_vars)
+        if self.gzip_payload:
+            chunks = self._iter_gzipped(chunks)
+        return chunks
+
+    def _iter_payload_sections(
+        self, upload_data: UploadCollectionResult, env_vars: typing.Dict[str, str]
+    ) -> typing.Iterator[bytes]:
+        yield self._generate_env_vars_section(env_vars)
+        yield from self._iter_network_section(upload_data)
+        yield from self._iter_coverage_files_section(upload_data)
+
+    def _iter_gzipped(self, chunks: typing.Iterable[bytes]) -> typing.Iterator[bytes]:
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
 
     def _generate_env_vars_section(self, env_vars) -> bytes:
         filtered_env_vars = {
@@ -113,20 +199,54 @@ class LegacyUploadSender(object):
         return env_vars_section.encode() + b"<<<<<< ENV\n"
 
     def _generate_network_section(self, upload_data: UploadCollectionResult) -> bytes:
+        return b"".join(self._iter_network_section(upload_data))
+
+    def _iter_network_section(
+        self, upload_data: UploadCollectionResult
+    ) -> typing.Iterator[bytes]:
         network_files = upload_data.network
 
         if not network_files:
-            return b""
+            return
+
+        files = iter(network_files)
+        while True:
+            batch = list(islice(files, NETWORK_BATCH_SIZE))
+            if not batch:
+                break
+            yield "".join(file + "\n" for file in batch).encode()
+        yield NETWORK_SECTION_FOOTER
+
+    def _network_section_length(self, upload_data: UploadCollectionResult) -> int:
+        """The length of the network section, without encoding it"""
+        network_files = upload_data.network
+
+        if not network_files:
+            return 0
 
-        network_files_section = "".join(file + "\n" for file in network_files)
-        return network_files_section.encode() + b"<<<<<< network\n"
+        return sum(
+            (len(file) if file.isascii() else len(file.encode())) + 1
+            for file in network_files
+        ) + len(NETWORK_SECTION_FOOTER)
 
     def _generate_coverage_files_section(self, upload_data: UploadCollectionResult):
-        return b"".join(self._format_coverage_file(file) for file in upload_data.files)
+        return b"".join(self._iter_coverage_files_section(upload_data))
+
+    def _iter_coverage_files_section(
+        self, upload_data: UploadCollectionResult
+    ) -> typing.Iterator[bytes]:
+        for file in upload_data.files:
+            yield from self._iter_coverage_file(file)
 
     def _format_coverage_file(self, file: UploadCollectionResultFile) -> bytes:
-        header = b"# path=" + file.get_filename().encode() + b"\n"
-        file_content = file.get_content() + b"\n"
-        file_end = b"<<<<<< EOF\n"
+        return b"".join(self._iter_coverage_file(file))
+
+    def _iter_coverage_file(
+        self, file: UploadCollectionResultFile
+    ) -> typing.Iterator[bytes]:
+        yield self._coverage_file_header(file)
+        yield from file.iter_content()
+        yield COVERAGE_FILE_FOOTER
 
-        return header + file_content + file_end
+    def _coverage_file_header(self, file: UploadCollectionResultFile) -> bytes:
+        return b"# path=" + file.get_filename().encode() + b"\n"
@@ -0,0 +1,65 @@
+"""
+Encodings of the network section of the upload payload.
+
+The `list` encoding is a JSON list of paths. The `front-coded` encoding sorts the
+paths and writes each one as the number of characters it shares with the path
+before it, followed by the rest of it, all in one flat list:
+
+    {"format": "front-coded", "value": [0, "src/app/a.py", 9, "b.py", 4, "lib/c.py"]}
+
+is src/app/a.py, src/app/b.py and src/lib/c.py. Paths in a repository share long
+directory prefixes, so this is a fraction of the size of the list.
+"""
+
+import typing
+
+LIST_NETWORK_FORMAT = "list"
+FRONT_CODED_NETWORK_FORMAT = "front-coded"
+
+
+def shared_prefix_length(first: str, second: str) -> int:
+    # Binary search on slices, comparing them is much faster than a loop over characters
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def front_code(paths: typing.Iterable[str]) -> typing.Iterator[typing.Tuple[int, str]]:
+    previous = ""
+    for path in sorted(paths):
+        shared = shared_prefix_length(previous, path)
+        yield shared, path[shared:]
+        previous = path
+
+
+def encode_network(
+    paths: typing.Iterable[str], network_format: str = LIST_NETWORK_FORMAT
+) -> typing.Any:
+    """The network section as an object, for payloads that aren't written incrementally"""
+    if network_format == FRONT_CODED_NETWORK_FORMAT:
+        value = []
+        for shared, suffix in front_code(paths):
+            value.append(shared)
+            value.append(suffix)
+        return {"format": FRONT_CODED_NETWORK_FORMAT, "value": value}
+    return list(paths)
+
+
+def decode_network(network: typing.Any) -> typing.List[str]:
+    """The paths in a network section, in either encoding"""
+    if isinstance(network, list):
+        return network
+    if network.get("format") != FRONT_CODED_NETWORK_FORMAT:
+        raise ValueError(f"Unknown network format: {network.get('format')}")
+    paths = []
+    previous = ""
+    value = network["value"]
+    for shared, suffix in zip(value[::2], value[1::2]):
+        previous = previous[:shared] + suffix
+        paths.append(previous)
+    return paths
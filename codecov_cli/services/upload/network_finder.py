@@ -1,7 +1,163 @@
 import pathlib
+import re
 import typing
+from array import array
+from collections.abc import Sequence
 
 from codecov_cli.helpers.versioning_systems import VersioningSystemInterface
+from codecov_cli.services.upload.network_encoding import shared_prefix_length
+
+
+def parse_network_rule(rule: str) -> typing.Tuple[str, str]:
+    """Splits a FILTER=PREFIX network rule, either side can be empty"""
+    network_filter, separator, network_prefix = rule.partition("=")
+    if not separator:
+        raise ValueError(f"Network rule {rule!r} isn't in the FILTER=PREFIX format")
+    return network_filter, network_prefix
+
+
+class _TrieNode(object):
+    __slots__ = ["edges", "is_key"]
+
+    def __init__(self):
+        # The first character of each edge, to its whole label and the node it leads to
+        self.edges: typing.Dict[str, typing.Tuple[str, "_TrieNode"]] = {}
+        self.is_key = False
+
+
+class PrefixTrie(object):
+    """
+    Maps string prefixes to values, and finds the longest of them a string starts
+    with. The trie, with edges labelled by substrings, is compiled into a regex of
+    nested groups: matching a string follows a single path down it, in C, however
+    many prefixes there are.
+    """
+
+    def __init__(self, items: typing.Iterable[typing.Tuple[str, str]] = ()) -> None:
+        self._root = _TrieNode()
+        self.values: typing.Dict[str, str] = {}
+        self._pattern: typing.Optional[typing.Pattern] = None
+        for key, value in items:
+            self[key] = value
+
+    def __setitem__(self, key: str, value: str) -> None:
+        self.values[key] = value
+        self._pattern = None
+        node = self._root
+        while key:
+            edge = node.edges.get(key[0])
+            if edge is None:
+                child = _TrieNode()
+                node.edges[key[0]] = (key, child)
+                node = child
+                break
+            label, child = edge
+            shared = shared_prefix_length(label, key)
+            if shared < len(label):
+                # The key leaves the edge halfway, it's split there
+                middle = _TrieNode()
+                middle.edges[label[shared]] = (label[shared:], child)
+                node.edges[key[0]] = (label[:shared], middle)
+                child = middle
+            node = child
+            key = key[shared:]
+        node.is_key = True
+
+    def __bool__(self) -> bool:
+        return bool(self.values)
+
+    @property
+    def pattern(self) -> typing.Pattern:
+        """Matches the longest key at the start of a string"""
+        if self._pattern is None:
+            self._pattern = re.compile(
+                self._node_pattern(self._root) if self.values else "(?!)"
+            )
+        return self._pattern
+
+    def _node_pattern(self, node: _TrieNode) -> str:
+        if not node.edges:
+            return ""
+        group = "(?:%s)" % "|".join(
+            re.escape(label) + self._node_pattern(child)
+            for label, child in node.edges.values()
+        )
+        # Going further down is greedy, so the match stops at the longest key
+        return group + "?" if node.is_key else group
+
+    def longest_prefix_value(self, text: str) -> typing.Optional[str]:
+        """The value of the longest key `text` starts with, None if there is none"""
+        match = self.pattern.match(text)
+        return None if match is None else self.values[match[0]]
+
+
+class FilteredNetwork(Sequence):
+    """
+    A read-only view of the network files that start with a rule's filter, each
+    one prefixed with the prefix of the longest filter it starts with. Files are
+    matched as the view is iterated over, in a single pass for all the rules, and
+    nothing is copied. len() and indexing need to know where the matches are, they
+    are found once and only their positions kept.
+    """
+
+    def __init__(self, files: typing.Sequence[str], rules: PrefixTrie) -> None:
+        self._files = files
+        self._rules = rules
+        self._positions: typing.Optional[array] = None
+        self._prefixes: typing.List[str] = []
+
+    def __iter__(self) -> typing.Iterator[str]:
+        if self._positions is not None:
+            files = self._files
+            for position, prefix in zip(self._positions, self._prefixes):
+                yield prefix + files[position]
+            return
+        prefixes = self._rules.values
+        if len(prefixes) == 1:
+            # A single rule, like --network-filter and --network-prefix alone
+            ((network_filter, prefix),) = prefixes.items()
+            yield from (
+                prefix + file for file in self._files if file.startswith(network_filter)
+            )
+            return
+        match = self._rules.pattern.match
+        for file in self._files:
+            matched = match(file)
+            if matched is not None:
+                yield prefixes[matched[0]] + file
+
+    def _find_matches(self) -> array:
+        if self._positions is None:
+            positions = array("L")
+            prefixes = []
+            match = self._rules.pattern.match
+            rule_prefixes = self._rules.values
+            for position, file in enumerate(self._files):
+                matched = match(file)
+                if matched is not None:
+                    positions.append(position)
+                    prefixes.append(rule_prefixes[matched[0]])
+            self._positions, self._prefixes = positions, prefixes
+        return self._positions
+
+    def __len__(self) -> int:
+        return len(self._find_matches())
+
+    def __getitem__(self, index):
+        positions = self._find_matches()
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(positions)))]
+        return self._prefixes[index] + self._files[positions[index]]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
 
 
 class NetworkFinder(object):
@@ -12,23 +168,47 @@ class NetworkFinder(object):
         network_filter: typing.Optional[str],
         network_prefix: typing.Optional[str],
         network_root_folder: pathlib.Path,
+        network_rules: typing.Sequence[typing.Tuple[str, str]] = (),
     ):
         self.versioning_system = versioning_system
         self.recurse_submodules = recurse_submodules
         self.network_filter = network_filter
         self.network_prefix = network_prefix
         self.network_root_folder = network_root_folder
+        self.network_rules = network_rules
+        self._files: typing.Optional[typing.List[str]] = None
+        self._filtered_files: typing.Optional[typing.Sequence[str]] = None
 
-    def find_files(self, ignore_filters=False) -> typing.List[str]:
-        files = self.versioning_system.list_relevant_files(
-            self.network_root_folder, self.recurse_submodules
-        )
+    def _list_files(self) -> typing.List[str]:
+        # Listing the files of a large repository is slow, it's done once per finder
+        if self._files is None:
+            self._files = self.versioning_system.list_relevant_files(
+                self.network_root_folder, self.recurse_submodules
+            )
+        return self._files
+
+    def _rules_trie(self) -> PrefixTrie:
+        rules = PrefixTrie()
+        if self.network_filter or self.network_prefix:
+            rules[self.network_filter or ""] = self.network_prefix or ""
+        for network_filter, network_prefix in self.network_rules:
+            rules[network_filter] = network_prefix
+        return rules
+
+    def find_files(self, ignore_filters=False) -> typing.Sequence[str]:
+        """
+        Lists the network files, filtered and prefixed unless `ignore_filters`.
+        Filtered files are a FilteredNetwork view over the listed ones. Both are
+        built the first time they are asked for, and shared between calls, so
+        they shouldn't be modified.
+        """
+        files = self._list_files()
 
         if files and not ignore_filters:
-            if self.network_filter:
-                files = [file for file in files if file.startswith(self.network_filter)]
-            if self.network_prefix:
-                files = [self.network_prefix + file for file in files]
+            if self._filtered_files is None:
+                rules = self._rules_trie()
+                self._filtered_files = FilteredNetwork(files, rules) if rules else files
+            files = self._filtered_files
 
         return files
 
@@ -39,6 +219,7 @@ def select_network_finder(
     network_filter: typing.Optional[str],
     network_prefix: typing.Optional[str],
     network_root_folder: pathlib.Path,
+    network_rules: typing.Sequence[str] = (),
 ):
     return NetworkFinder(
         versioning_system,
@@ -46,4 +227,5 @@ def select_network_finder(
         network_filter,
         network_prefix,
         network_root_folder,
+        [parse_network_rule(rule) for rule in network_rules],
     )
@@ -0,0 +1,285 @@
+import base64
+import copy
+import hashlib
+import json
+import logging
+import tempfile
+import typing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from codecov_cli.services.upload.compression import Codec, ZlibCodec
+from codecov_cli.services.upload.network_encoding import (
+    FRONT_CODED_NETWORK_FORMAT,
+    LIST_NETWORK_FORMAT,
+    front_code,
+)
+from codecov_cli.types import UploadCollectionResultFile
+
+logger = logging.getLogger("codecovcli")
+
+# Payloads up to this size are kept in memory, bigger ones are spilled to disk
+DEFAULT_BUFFER_SIZE = 8 * 1024 * 1024
+# How much of a coverage file is read (and compressed) at a time
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# How many network paths are serialized per chunk
+NETWORK_BATCH_SIZE = 1024
+
+
+class PayloadEncoder(object):
+    """
+    Writes the upload payload JSON incrementally, one coverage file chunk at a time.
+
+    The bytes produced are identical to `json.dumps(payload).encode()` of the
+    equivalent dict. With a single worker, the default, no more than a chunk of
+    any coverage file is held in memory at once. With more workers files are
+    compressed concurrently (the compressors release the GIL) and the whole
+    compressed content of the files in flight is held in memory.
+
+    With `deduplicate`, files are hashed in the same pass that compresses them
+    and only the first of several files with identical content is sent. The
+    others are listed under `file_aliases`, mapping each to the file sent.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: typing.Optional[int] = None,
+        codec: typing.Optional[Codec] = None,
+        deduplicate: bool = False,
+        network_format: str = LIST_NETWORK_FORMAT,
+    ):
+        self.buffer_size = buffer_size
+        self.chunk_size = chunk_size
+        # Workers hold whole compressed files in memory, so they are opt-in
+        self.workers = workers or 1
+        self.codec = codec or ZlibCodec()
+        self.deduplicate = deduplicate
+        self.network_format = network_format
+
+    def with_codec(self, codec: Codec) -> "PayloadEncoder":
+        """A copy of the encoder that compresses with `codec` instead"""
+        encoder = copy.copy(self)
+        encoder.codec = codec
+        return encoder
+
+    def write_payload(
+        self, chunks: typing.Iterable[bytes]
+    ) -> typing.Tuple[tempfile.SpooledTemporaryFile, int]:
+        """
+        Drains `chunks` into a spooled temporary file, rewound to the start.
+        The file stays in memory until it grows past `buffer_size`.
+
+        Returns the file and the payload size in bytes.
+        """
+        payload = tempfile.SpooledTemporaryFile(max_size=self.buffer_size)
+        for chunk in chunks:
+            payload.write(chunk)
+        size = payload.tell()
+        payload.seek(0)
+        return payload, size
+
+    def iter_coverage_payload(
+        self,
+        report_fixes: typing.Dict[str, typing.Dict[str, typing.Any]],
+        network_files: typing.Iterable[str],
+        files: typing.Iterable[UploadCollectionResultFile],
+    ) -> typing.Iterator[bytes]:
+        yield b'{"report_fixes": '
+        yield json.dumps({"format": "legacy", "value": report_fixes}).encode()
+        yield b', "network_files": '
+        yield from self.iter_network(network_files)
+        yield b', "coverage_files": '
+        aliases = {}
+        yield from self.iter_files(files, aliases)
+        yield from self.iter_aliases(aliases)
+        yield b', "metadata": {}}'
+
+    def iter_test_results_payload(
+        self, files: typing.Iterable[UploadCollectionResultFile]
+    ) -> typing.Iterator[bytes]:
+        yield b'{"test_results_files": '
+        aliases = {}
+        yield from self.iter_files(files, aliases)
+        yield from self.iter_aliases(aliases)
+        yield b"}"
+
+    def iter_aliases(self, aliases: typing.Dict[str, str]) -> typing.Iterator[bytes]:
+        if self.deduplicate:
+            yield b', "file_aliases": '
+            yield json.dumps(aliases).encode()
+
+    def iter_network(
+        self, network_files: typing.Iterable[str]
+    ) -> typing.Iterator[bytes]:
+        if self.network_format == FRONT_CODED_NETWORK_FORMAT:
+            yield b'{"format": "front-coded", "value": ['
+            # One json.dumps per batch of lengths and suffixes rather than per path
+            separator = ""
+            values = []
+            for shared, suffix in front_code(network_files):
+                values.append(shared)
+                values.append(suffix)
+                if len(values) == 2 * NETWORK_BATCH_SIZE:
+                    yield (separator + json.dumps(values)[1:-1]).encode()
+                    separator = ", "
+                    values = []
+            if values:
+                yield (separator + json.dumps(values)[1:-1]).encode()
+            yield b"]}"
+        else:
+            yield from self.iter_json_list(network_files)
+
+    def iter_json_list(self, items: typing.Iterable[str]) -> typing.Iterator[bytes]:
+        yield from self._iter_json_array(json.dumps(item) for item in items)
+
+    def _iter_json_array(
+        self, serialized_items: typing.Iterable[str]
+    ) -> typing.Iterator[bytes]:
+        yield b"["
+        batch = []
+        separator = ""
+        for item in serialized_items:
+            batch.append(item)
+            if len(batch) == NETWORK_BATCH_SIZE:
+                yield (separator + ", ".join(batch)).encode()
+                separator = ", "
+                batch = []
+        if batch:
+            yield (separator + ", ".join(batch)).encode()
+        yield b"]"
+
+    def iter_files(
+        self,
+        files: typing.Iterable[UploadCollectionResultFile],
+        aliases: typing.Optional[typing.Dict[str, str]] = None,
+    ) -> typing.Iterator[bytes]:
+        yield b"["
+        compressed_files = self.iter_compressed_files(files, aliases=aliases)
+        for index, (file, content) in enumerate(compressed_files):
+            if index:
+                yield b", "
+            yield from self.iter_file(file, content)
+        yield b"]"
+
+    def iter_file(
+        self,
+        file: UploadCollectionResultFile,
+        content: typing.Optional[typing.Iterable[bytes]] = None,
+    ) -> typing.Iterator[bytes]:
+        if content is None:
+            content = self.iter_compressed_content(file)
+        yield b'{"filename": '
+        yield json.dumps(file.get_filename()).encode()
+        yield b', "format": '
+        yield json.dumps(self.codec.format).encode()
+        yield b', "data": "'
+        yield from content
+        yield b'", "labels": ""}'
+
+    def iter_compressed_files(
+        self,
+        files: typing.Iterable[UploadCollectionResultFile],
+        encoded: bool = True,
+        aliases: typing.Optional[typing.Dict[str, str]] = None,
+    ) -> typing.Iterator[
+        typing.Tuple[UploadCollectionResultFile, typing.Iterable[bytes]]
+    ]:
+        """
+        Yields each file with its compressed content, in the same order as `files`.
+        The content is base64 encoded unless `encoded` is False.
+
+        When deduplicating, files whose content was already yielded are skipped
+        and recorded in `aliases` instead.
+        """
+        iter_content = (
+            self.iter_compressed_content
+            if encoded
+            else self.iter_raw_compressed_content
+        )
+        if self.workers == 1 and not self.deduplicate:
+            for file in files:
+                yield file, iter_content(file)
+            return
+
+        def compress(file):
+            hasher = hashlib.blake2b() if self.deduplicate else None
+            content = b"".join(iter_content(file, hasher))
+            return content, hasher.digest() if hasher else None
+
+        sent = {}
+        duplicates = 0
+        saved_bytes = 0
+        for file, (content, digest) in self._map_in_order(compress, files):
+            if digest is not None:
+                if digest in sent:
+                    if aliases is not None:
+                        aliases[file.get_filename()] = sent[digest]
+                    duplicates += 1
+                    saved_bytes += len(content)
+                    continue
+                sent[digest] = file.get_filename()
+            yield file, [content]
+
+        if duplicates:
+            logger.info(
+                f"Skipped {duplicates} duplicate report files, saving {saved_bytes} bytes of upload"
+            )
+
+    def _map_in_order(
+        self,
+        func: typing.Callable,
+        files: typing.Iterable[UploadCollectionResultFile],
+    ) -> typing.Iterator[typing.Tuple[UploadCollectionResultFile, typing.Any]]:
+        if self.workers == 1:
+            for file in files:
+                yield file, func(file)
+            return
+
+        # Keep a bounded window of files in flight so that memory doesn't grow
+        # with the number of files while every worker still has something to do
+        max_in_flight = self.workers * 2
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = deque()
+            for file in files:
+                in_flight.append((file, executor.submit(func, file)))
+                if len(in_flight) >= max_in_flight:
+                    file, future = in_flight.popleft()
+                    yield file, future.result()
+            while in_flight:
+                file, future = in_flight.popleft()
+                yield file, future.result()
+
+    def iter_compressed_content(
+        self, file: UploadCollectionResultFile, hasher=None
+    ) -> typing.Iterator[bytes]:
+        """
+        Yields the base64 encoding of the compressed file content.
+        Only whole 3 byte groups are encoded until the end so that no padding
+        ends up in the middle of the stream.
+        """
+        pending = b""
+        for compressed in self.iter_raw_compressed_content(file, hasher):
+            pending += compressed
+            cut = len(pending) - len(pending) % 3
+            if cut:
+                yield base64.b64encode(pending[:cut])
+                pending = pending[cut:]
+        yield base64.b64encode(pending)
+
+    def iter_raw_compressed_content(
+        self, file: UploadCollectionResultFile, hasher=None
+    ) -> typing.Iterator[bytes]:
+        """
+        Yields the compressed file content. The raw content is also fed to
+        `hasher`, if given, so that hashing doesn't need a read of its own.
+        """
+        compressor = self.codec.compressobj()
+        for chunk in file.iter_content(self.chunk_size):
+            if hasher is not None:
+                hasher.update(chunk)
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
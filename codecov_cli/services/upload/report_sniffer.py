@@ -0,0 +1,78 @@
+import logging
+import re
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+
+from codecov_cli.types import UploadCollectionResultFile
+
+logger = logging.getLogger("codecovcli")
+
+# Every signature below is found in the first lines of a report
+SNIFF_SIZE = 4096
+DEFAULT_SNIFF_WORKERS = 8
+
+
+class ReportFormat(Enum):
+    CLOVER = "clover"
+    COBERTURA = "cobertura"
+    COVERAGE_PY_JSON = "coverage.py json"
+    GCOV = "gcov"
+    GO_COVER = "go cover"
+    JACOCO = "jacoco"
+    LCOV = "lcov"
+
+
+# Checked in order, clover reports have a <coverage> root element like cobertura ones
+_SIGNATURES: typing.List[typing.Tuple[ReportFormat, typing.Pattern]] = [
+    (ReportFormat.CLOVER, re.compile(rb"<coverage\s[^>]*\b(?:clover|generated)=")),
+    (ReportFormat.COBERTURA, re.compile(rb"<coverage[\s>]")),
+    (ReportFormat.JACOCO, re.compile(rb"-//JACOCO//DTD|<report\s+name=")),
+    (ReportFormat.LCOV, re.compile(rb"\A\s*(?:TN|SF):")),
+    (ReportFormat.GO_COVER, re.compile(rb"\Amode: (?:set|count|atomic)\s")),
+    (ReportFormat.GCOV, re.compile(rb"\A\s*-:\s*0:Source:")),
+    (ReportFormat.COVERAGE_PY_JSON, re.compile(rb'\A\s*\{\s*"meta"\s*:\s*\{')),
+]
+
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def sniff_report_format(
+    file: UploadCollectionResultFile,
+) -> typing.Optional[ReportFormat]:
+    """Tells the format of a report from its first bytes, None if it isn't a known one"""
+    try:
+        with open(file.path, "rb") as f:
+            head = f.read(SNIFF_SIZE)
+    except OSError:
+        return None
+    if head.startswith(_UTF8_BOM):
+        head = head[len(_UTF8_BOM) :]
+    for report_format, signature in _SIGNATURES:
+        if signature.search(head):
+            return report_format
+    return None
+
+
+def filter_known_report_formats(
+    files: typing.List[UploadCollectionResultFile],
+    workers: int = DEFAULT_SNIFF_WORKERS,
+) -> typing.List[UploadCollectionResultFile]:
+    """
+    Keeps the files in a known report format, reading the start of a few of them at
+    a time. The other ones are logged and left out of the upload.
+    """
+    if not files:
+        return files
+    with ThreadPoolExecutor(max_workers=min(workers, len(files))) as executor:
+        report_formats = list(executor.map(sniff_report_format, files))
+    known_files = []
+    for file, report_format in zip(files, report_formats):
+        if report_format is None:
+            logger.info(
+                f"Skipping {file.get_filename()}, it is not in a known coverage report format"
+            )
+        else:
+            logger.debug(f"{file.get_filename()} is a {report_format.value} report")
+            known_files.append(file)
+    return known_files
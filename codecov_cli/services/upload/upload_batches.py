@@ -0,0 +1,105 @@
+import logging
+import typing
+import zlib
+
+from codecov_cli.types import (
+    RequestResult,
+    UploadCollectionResult,
+    UploadCollectionResultFile,
+)
+
+logger = logging.getLogger("codecovcli")
+
+# How much of every report is compressed to estimate how big it is in the payload
+ESTIMATE_SAMPLE_SIZE = 1024 * 1024
+
+
+def _estimate_file_bytes(file: UploadCollectionResultFile) -> int:
+    """
+    The size of the file compressed with zlib and base64 encoded, like it's sent
+    by default. Only its beginning is compressed, the rest is assumed to compress
+    as well, which usually overestimates it as there is more to refer back to.
+    """
+    size = file.get_size()
+    compressed = 0
+    if size:
+        chunks = file.iter_content(ESTIMATE_SAMPLE_SIZE)
+        sample = next(chunks)
+        chunks.close()
+        compressor = zlib.compressobj()
+        compressed = len(compressor.compress(sample)) + len(compressor.flush())
+        compressed = -(-compressed * size // len(sample))
+    return -(-compressed // 3) * 4 + len(file.get_filename()) + 64
+
+
+def _estimate_shared_bytes(upload_data: UploadCollectionResult) -> int:
+    return sum(len(path) + 4 for path in upload_data.network)
+
+
+def split_upload_data(
+    upload_data: UploadCollectionResult, max_payload_bytes: int
+) -> typing.List[UploadCollectionResult]:
+    """
+    Bin-packs the coverage files (first fit, largest first) into as few
+    uploads as possible whose estimated payload stays under `max_payload_bytes`.
+    Every upload carries the whole network section and all the report fixes,
+    so if that alone is over the limit nothing is split.
+    """
+    shared_bytes = _estimate_shared_bytes(upload_data)
+    if shared_bytes >= max_payload_bytes:
+        logger.warning(
+            f"The network section alone (about {shared_bytes} bytes) exceeds the payload budget of {max_payload_bytes} bytes, and every upload carries it. Sending all the reports in a single upload"
+        )
+        return [upload_data]
+    budget = max_payload_bytes - shared_bytes
+    sized_files = sorted(
+        (
+            (_estimate_file_bytes(file), index, file)
+            for index, file in enumerate(upload_data.files)
+        ),
+        key=lambda sized_file: sized_file[0],
+        reverse=True,
+    )
+    bins = []
+    for size, index, file in sized_files:
+        if size > budget:
+            logger.warning(
+                f"Report {file.get_filename()} alone exceeds the payload budget of {max_payload_bytes} bytes. Uploading it on its own"
+            )
+        for space_and_files in bins:
+            if space_and_files[0] >= size:
+                space_and_files[0] -= size
+                space_and_files[1].append((index, file))
+                break
+        else:
+            bins.append([budget - size, [(index, file)]])
+
+    if len(bins) <= 1:
+        return [upload_data]
+    logger.info(
+        f"Splitting {len(upload_data.files)} reports into {len(bins)} uploads to stay under {max_payload_bytes} bytes each"
+    )
+    return [
+        UploadCollectionResult(
+            network=upload_data.network,
+            # Keep the collection order inside each upload
+            files=[file for _, file in sorted(files, key=lambda item: item[0])],
+            file_fixes=upload_data.file_fixes,
+        )
+        for _, files in bins
+    ]
+
+
+def send_upload_batches(
+    sender, batches: typing.List[UploadCollectionResult], **kwargs
+) -> RequestResult:
+    """
+    Sends every batch as its own upload, with the same arguments otherwise. They
+    are sent one after the other, as they are uploads of the same report, and
+    stop at the first one that fails, whose result is returned.
+    """
+    for batch in batches:
+        result = sender.send_upload_data(upload_data=batch, **kwargs)
+        if result.error is not None:
+            break
+    return result
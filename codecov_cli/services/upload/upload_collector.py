@@ -15,6 +15,7 @@ from codecov_cli.services.upload.network_finder import NetworkFinder
 from codecov_cli.types import (
     PreparationPluginInterface,
     UploadCollectionResult,
+    UploadCollectionResultFile,
     UploadCollectionResultFileFixer,
 )
 
@@ -33,12 +34,67 @@ class UploadCollector(object):
         file_finder: FileFinder,
         plugin_config: dict,
         disable_file_fixes: bool = False,
+        max_report_file_bytes: typing.Optional[int] = None,
+        max_report_total_bytes: typing.Optional[int] = None,
     ):
         self.preparation_plugins = preparation_plugins
         self.network_finder = network_finder
         self.file_finder = file_finder
         self.disable_file_fixes = disable_file_fixes
         self.plugin_config = plugin_config
+        self.max_report_file_bytes = max_report_file_bytes
+        self.max_report_total_bytes = max_report_total_bytes
+
+    def _limit_report_sizes(
+        self, report_files: typing.List[UploadCollectionResultFile]
+    ) -> typing.List[UploadCollectionResultFile]:
+        """
+        Leaves out the report files over the size limits, and orders the others largest
+        first, so that the ones taking longest to compress are started first.
+        When over the total limit, the largest files are the ones left out.
+        """
+        sizes = {}
+        for file in report_files:
+            if file.listed_size is not None:
+                # Found by walking, the listing had it already
+                sizes[file] = file.listed_size
+                continue
+            try:
+                sizes[file] = file.get_size()
+            except OSError:
+                # Reading it fails later on, with a clearer error
+                sizes[file] = 0
+
+        kept_files = []
+        for file in report_files:
+            if (
+                self.max_report_file_bytes is not None
+                and sizes[file] > self.max_report_file_bytes
+            ):
+                logger.warning(
+                    f"Skipping {file.get_filename()}, its {sizes[file]} bytes are over the limit of {self.max_report_file_bytes} bytes per report file"
+                )
+            else:
+                kept_files.append(file)
+
+        if self.max_report_total_bytes is not None:
+            total_size = 0
+            within_total = []
+            skipped_files = []
+            for file in sorted(kept_files, key=sizes.__getitem__):
+                if total_size + sizes[file] > self.max_report_total_bytes:
+                    skipped_files.append(file.get_filename())
+                else:
+                    total_size += sizes[file]
+                    within_total.append(file)
+            if skipped_files:
+                logger.warning(
+                    f"Skipping {len(skipped_files)} report files, uploading them would go over the limit of {self.max_report_total_bytes} bytes in total",
+                    extra=dict(extra_log_attributes=dict(files=skipped_files)),
+                )
+            kept_files = within_total
+
+        return sorted(kept_files, key=sizes.__getitem__, reverse=True)
 
     def _produce_file_fixes(
         self, files: typing.List[str]
@@ -161,7 +217,7 @@ class UploadCollector(object):
             with sentry_sdk.start_span(name="file_collector"):
                 network = self.network_finder.find_files()
                 unfiltered_network = self.network_finder.find_files(True)
-                report_files = self.file_finder.find_files()
+                report_files = self._limit_report_sizes(self.file_finder.find_files())
             logger.info(
                 f"Found {len(report_files)} {report_type.value} files to report"
             )
@@ -1,9 +1,8 @@
-import base64
 import json
 import logging
 import typing
-import zlib
-from typing import Any, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator
 
 import sentry_sdk
 
@@ -17,16 +16,70 @@ from codecov_cli.helpers.request import (
     send_post_request,
     send_put_request,
 )
-from codecov_cli.types import (
-    RequestResult,
-    UploadCollectionResult,
-    UploadCollectionResultFile,
+from codecov_cli.services.upload.binary_payload import (
+    BINARY_PAYLOAD_FORMAT,
+    JSON_PAYLOAD_FORMAT,
+    write_binary_payload,
 )
+from codecov_cli.services.upload.chunked_upload import ResumableUploader
+from codecov_cli.services.upload.compression import (
+    AUTO_CODEC,
+    get_codec,
+    select_codec,
+)
+from codecov_cli.services.upload.network_encoding import (
+    LIST_NETWORK_FORMAT,
+    encode_network,
+)
+from codecov_cli.services.upload.payload_encoder import (
+    DEFAULT_BUFFER_SIZE,
+    PayloadEncoder,
+)
+from codecov_cli.types import RequestResult, UploadCollectionResult
 
 logger = logging.getLogger("codecovcli")
 
 
+def _close_payload(pending_payload: Future) -> None:
+    # For payloads nobody is going to send, closing removes any spooled file.
+    # This waits for the payload to be written if it's still being written
+    if pending_payload.exception() is None:
+        reports_payload, _ = pending_payload.result()
+        reports_payload.close()
+
+
 class UploadSender(object):
+    def __init__(
+        self,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        compression_workers: typing.Optional[int] = None,
+        compression_codec: str = "zlib",
+        compression_level: typing.Optional[int] = None,
+        deduplicate_files: bool = False,
+        payload_format: str = JSON_PAYLOAD_FORMAT,
+        upload_part_size: typing.Optional[int] = None,
+        overlap_upload_request: bool = False,
+        network_format: str = LIST_NETWORK_FORMAT,
+    ):
+        self.compression_codec = compression_codec
+        self.compression_level = compression_level
+        self.payload_format = payload_format
+        self.upload_part_size = upload_part_size
+        self.overlap_upload_request = overlap_upload_request
+        # Upper bound on how much of the payload is held in memory,
+        # anything bigger is spooled to a temporary file and streamed from there
+        self.encoder = PayloadEncoder(
+            buffer_size=buffer_size,
+            workers=compression_workers,
+            codec=(
+                None
+                if compression_codec == AUTO_CODEC
+                else get_codec(compression_codec, compression_level)
+            ),
+            deduplicate=deduplicate_files,
+            network_format=network_format,
+        )
+
     def send_upload_data(
         self,
         upload_data: UploadCollectionResult,
@@ -94,46 +147,150 @@ class UploadSender(object):
                     upload_coverage,
                     file_not_found=file_not_found,
                 )
+                if self.payload_format != JSON_PAYLOAD_FORMAT:
+                    data["report_payload_format"] = self.payload_format
                 # Data that goes to storage
-                reports_payload = self._generate_payload(
-                    upload_data, env_vars, report_type
-                )
-                reports_payload_size = len(reports_payload)
-                data["report_payload_bytes"] = reports_payload_size
-
-            with sentry_sdk.start_span(name="upload_sender_storage_request"):
-                logger.debug("Sending upload request to Codecov")
-                resp_from_codecov = send_post_request(
-                    url=url,
-                    data=data,
-                    headers=headers,
+                if self.overlap_upload_request:
+                    # The payload is written while the upload request is in flight,
+                    # so the request can't say how big it is
+                    executor = ThreadPoolExecutor(max_workers=1)
+                    pending_payload = executor.submit(
+                        self._write_payload_with_span,
+                        upload_data,
+                        env_vars,
+                        report_type,
+                    )
+                    executor.shutdown(wait=False)
+                else:
+                    pending_payload = Future()
+                    pending_payload.set_result(
+                        self._write_payload_with_span(
+                            upload_data, env_vars, report_type
+                        )
+                    )
+                    data["report_payload_bytes"] = pending_payload.result()[1]
+
+            put_url = None
+            try:
+                resp_from_codecov, put_url = self._send_upload_request(
+                    url, data, headers, file_not_found
                 )
+            finally:
+                if put_url is None:
+                    _close_payload(pending_payload)
+            if put_url is None:
+                return resp_from_codecov
 
-                if file_not_found:
+            reports_payload, reports_payload_size = pending_payload.result()
+            with reports_payload:
+                with sentry_sdk.start_span(
+                    name="upload_sender_storage"
+                ) as storage_span:
+                    storage_span.set_data("payload_size", reports_payload_size)
                     logger.info(
-                        "No test results reports found. Triggering notifications without uploading."
+                        f"Sending upload ({reports_payload_size} bytes) to storage"
                     )
-                    return resp_from_codecov
+                    resp_from_storage = None
+                    if (
+                        self.upload_part_size
+                        and reports_payload_size > self.upload_part_size
+                    ):
+                        resp_from_storage = ResumableUploader(
+                            self.upload_part_size
+                        ).upload(put_url, reports_payload, reports_payload_size)
+                    if resp_from_storage is not None:
+                        return resp_from_storage
+                    # Storage that can't resume uploads gets a single request too
+                    if reports_payload_size <= self.encoder.buffer_size:
+                        # Small enough to be in memory already, send it in one go
+                        resp_from_storage = send_put_request(
+                            put_url, data=reports_payload.read()
+                        )
+                    else:
+                        resp_from_storage = send_put_request(
+                            put_url, data=reports_payload
+                        )
 
-                if resp_from_codecov.status_code >= 400:
-                    return resp_from_codecov
-                resp_json_obj = json.loads(resp_from_codecov.text)
-                if resp_json_obj.get("url"):
-                    logger.info(
-                        f"Your upload is now queued for processing. When finished, results will be available at: {resp_json_obj.get('url')}"
-                    )
-                logger.debug(
-                    "Upload request to Codecov complete.",
-                    extra=dict(extra_log_attributes=dict(response=resp_json_obj)),
+                return resp_from_storage
+
+    def _send_upload_request(
+        self,
+        url: str,
+        data: dict,
+        headers: typing.Optional[dict],
+        file_not_found: bool,
+    ) -> typing.Tuple[RequestResult, typing.Optional[str]]:
+        """
+        Returns the response from Codecov, and the URL to send the payload to
+        unless there's nothing to send.
+        """
+        with sentry_sdk.start_span(name="upload_sender_storage_request"):
+            logger.debug("Sending upload request to Codecov")
+            resp_from_codecov = send_post_request(
+                url=url,
+                data=data,
+                headers=headers,
+            )
+
+            if file_not_found:
+                logger.info(
+                    "No test results reports found. Triggering notifications without uploading."
                 )
-                put_url = resp_json_obj["raw_upload_location"]
+                return resp_from_codecov, None
+
+            if resp_from_codecov.status_code >= 400:
+                return resp_from_codecov, None
+            resp_json_obj = json.loads(resp_from_codecov.text)
+            if resp_json_obj.get("url"):
+                logger.info(
+                    f"Your upload is now queued for processing. When finished, results will be available at: {resp_json_obj.get('url')}"
+                )
+            logger.debug(
+                "Upload request to Codecov complete.",
+                extra=dict(extra_log_attributes=dict(response=resp_json_obj)),
+            )
+            return resp_from_codecov, resp_json_obj["raw_upload_location"]
 
-            with sentry_sdk.start_span(name="upload_sender_storage") as storage_span:
-                storage_span.set_data("payload_size", reports_payload_size)
-                logger.info(f"Sending upload ({reports_payload_size} bytes) to storage")
-                resp_from_storage = send_put_request(put_url, data=reports_payload)
+    def _write_payload_with_span(
+        self,
+        upload_data: UploadCollectionResult,
+        env_vars: typing.Dict[str, str],
+        report_type: ReportType = ReportType.COVERAGE,
+    ) -> typing.Tuple[typing.BinaryIO, int]:
+        with sentry_sdk.start_span(name="upload_sender_payload") as payload_span:
+            reports_payload, reports_payload_size = self._write_payload(
+                upload_data, env_vars, report_type
+            )
+            payload_span.set_data("payload_size", reports_payload_size)
+        return reports_payload, reports_payload_size
 
-            return resp_from_storage
+    def _write_payload(
+        self,
+        upload_data: UploadCollectionResult,
+        env_vars: typing.Dict[str, str],
+        report_type: ReportType = ReportType.COVERAGE,
+    ) -> typing.Tuple[typing.BinaryIO, int]:
+        encoder = self._encoder_for(upload_data)
+        if self.payload_format == BINARY_PAYLOAD_FORMAT:
+            if report_type == ReportType.COVERAGE:
+                header = {
+                    "report_fixes": {
+                        "format": "legacy",
+                        "value": self._get_file_fixers(upload_data),
+                    },
+                    "network_files": encode_network(
+                        upload_data.network or [], encoder.network_format
+                    ),
+                    "metadata": {},
+                }
+                files_key = "coverage_files"
+            elif report_type == ReportType.TEST_RESULTS:
+                header = {}
+                files_key = "test_results_files"
+            return write_binary_payload(encoder, header, files_key, upload_data.files)
+        return encoder.write_payload(
+            self._iter_payload(upload_data, env_vars, report_type, encoder)
+        )
 
     def _generate_payload(
         self,
@@ -141,24 +298,34 @@ class UploadSender(object):
         env_vars: typing.Dict[str, str],
         report_type: ReportType = ReportType.COVERAGE,
     ) -> bytes:
+        return b"".join(self._iter_payload(upload_data, env_vars, report_type))
+
+    def _iter_payload(
+        self,
+        upload_data: UploadCollectionResult,
+        env_vars: typing.Dict[str, str],
+        report_type: ReportType = ReportType.COVERAGE,
+        encoder: typing.Optional[PayloadEncoder] = None,
+    ) -> Iterator[bytes]:
+        if encoder is None:
+            encoder = self._encoder_for(upload_data)
         network_files = upload_data.network
         if report_type == ReportType.COVERAGE:
-            payload = {
-                "report_fixes": {
-                    "format": "legacy",
-                    "value": self._get_file_fixers(upload_data),
-                },
-                "network_files": network_files if network_files is not None else [],
-                "coverage_files": self._get_files(upload_data),
-                "metadata": {},
-            }
+            return encoder.iter_coverage_payload(
+                self._get_file_fixers(upload_data),
+                network_files if network_files is not None else [],
+                upload_data.files,
+            )
         elif report_type == ReportType.TEST_RESULTS:
-            payload = {
-                "test_results_files": self._get_files(upload_data),
-            }
+            return encoder.iter_test_results_payload(upload_data.files)
 
-        json_data = json.dumps(payload)
-        return json_data.encode()
+    def _encoder_for(self, upload_data: UploadCollectionResult) -> PayloadEncoder:
+        # Batches can be sent at the same time, so the shared encoder is left as it is
+        if self.compression_codec == AUTO_CODEC:
+            return self.encoder.with_codec(
+                select_codec(upload_data.files, self.compression_level)
+            )
+        return self.encoder
 
     def _get_file_fixers(
         self, upload_data: UploadCollectionResult
@@ -188,25 +355,6 @@ class UploadSender(object):
 
         return file_fixers
 
-    def _get_files(self, upload_data: UploadCollectionResult):
-        return [self._format_file(file) for file in upload_data.files]
-
-    def _format_file(self, file: UploadCollectionResultFile):
-        format, formatted_content = self._get_format_info(file)
-        return {
-            "filename": file.get_filename(),
-            "format": format,
-            "data": formatted_content,
-            "labels": "",
-        }
-
-    def _get_format_info(self, file: UploadCollectionResultFile):
-        format = "base64+compressed"
-        formatted_content = (
-            base64.b64encode(zlib.compress((file.get_content())))
-        ).decode()
-        return format, formatted_content
-
     def get_url_and_possibly_update_data(
         self,
         data,
@@ -17,8 +17,14 @@ def upload_coverage_logic(
     build_url: typing.Optional[str],
     commit_sha: str,
     recurse_submodules: bool,
+    compression_codec: str = "zlib",
+    compression_level: typing.Optional[int] = None,
+    compression_workers: typing.Optional[int] = None,
+    deduplicate_files: bool = False,
     disable_file_fixes: bool,
     disable_search: bool,
+    discovery_cache_dir: typing.Optional[pathlib.Path] = None,
+    discovery_mode: str = "walk",
     dry_run: bool,
     enterprise_url: typing.Optional[str],
     env_vars: typing.Dict[str, str],
@@ -32,19 +38,30 @@ def upload_coverage_logic(
     gcov_ignore: typing.Optional[str],
     gcov_include: typing.Optional[str],
     git_service: typing.Optional[str],
+    gzip_legacy_upload: bool = False,
     handle_no_reports_found: bool,
     job_code: typing.Optional[str],
+    max_payload_bytes: typing.Optional[int] = None,
+    max_report_file_bytes: typing.Optional[int] = None,
+    max_report_total_bytes: typing.Optional[int] = None,
     name: typing.Optional[str],
     network_filter: typing.Optional[str],
+    network_format: str = "list",
     network_prefix: typing.Optional[str],
     network_root_folder: pathlib.Path,
+    network_rules: typing.Sequence[str] = (),
+    overlap_upload_request: bool = False,
     parent_sha: typing.Optional[str],
+    payload_format: str = "json",
     plugin_names: typing.List[str],
     pull_request_number: typing.Optional[str],
     report_code: str,
+    search_workers: int = 1,
     slug: typing.Optional[str],
+    sniff_report_formats: bool = False,
     swift_project: typing.Optional[str],
     token: typing.Optional[str],
+    upload_part_size: typing.Optional[int] = None,
     use_legacy_uploader: bool,
     report_type: ReportType = ReportType.COVERAGE,
     args: dict = None,
@@ -60,8 +77,14 @@ def upload_coverage_logic(
         build_url=build_url,
         commit_sha=commit_sha,
         recurse_submodules=recurse_submodules,
+        compression_codec=compression_codec,
+        compression_level=compression_level,
+        compression_workers=compression_workers,
+        deduplicate_files=deduplicate_files,
         disable_file_fixes=disable_file_fixes,
         disable_search=disable_search,
+        discovery_cache_dir=discovery_cache_dir,
+        discovery_mode=discovery_mode,
         dry_run=dry_run,
         enterprise_url=enterprise_url,
         env_vars=env_vars,
@@ -75,19 +98,30 @@ def upload_coverage_logic(
         gcov_ignore=gcov_ignore,
         gcov_include=gcov_include,
         git_service=git_service,
+        gzip_legacy_upload=gzip_legacy_upload,
         handle_no_reports_found=handle_no_reports_found,
         job_code=job_code,
+        max_payload_bytes=max_payload_bytes,
+        max_report_file_bytes=max_report_file_bytes,
+        max_report_total_bytes=max_report_total_bytes,
         name=name,
         network_filter=network_filter,
+        network_format=network_format,
         network_prefix=network_prefix,
         network_root_folder=network_root_folder,
+        network_rules=network_rules,
+        overlap_upload_request=overlap_upload_request,
         parent_sha=parent_sha,
+        payload_format=payload_format,
         plugin_names=plugin_names,
         pull_request_number=pull_request_number,
         report_code=report_code,
+        search_workers=search_workers,
         slug=slug,
+        sniff_report_formats=sniff_report_formats,
         swift_project=swift_project,
         token=token,
+        upload_part_size=upload_part_size,
         use_legacy_uploader=use_legacy_uploader,
         report_type=report_type,
     )
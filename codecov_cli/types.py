@@ -1,5 +1,9 @@
+import mmap
+import os
 import pathlib
+import stat
 import typing as t
+from contextlib import contextmanager
 from dataclasses import dataclass
 
 import click
@@ -20,16 +24,58 @@ class CommandContext(click.Context):
 
 
 class UploadCollectionResultFile(object):
-    def __init__(self, path: pathlib.Path):
+    def __init__(self, path: pathlib.Path, listed_size: t.Optional[int] = None):
         self.path = path
+        # The size in the directory listing the file was found in, if it was walked
+        self.listed_size = listed_size
 
     def get_filename(self) -> str:
         return self.path.as_posix()
 
+    def get_size(self) -> int:
+        return self.path.stat().st_size
+
     def get_content(self) -> bytes:
         with open(self.path, "rb") as f:
             return f.read()
 
+    @contextmanager
+    def open_buffer(self) -> t.Iterator[memoryview]:
+        """
+        Yields a read-only memoryview of the file content, backed by a memory
+        map when possible so that slicing it doesn't copy anything.
+        Views taken from the buffer should not be used after the block ends.
+        """
+        with open(self.path, "rb") as f:
+            mapped = None
+            info = os.fstat(f.fileno())
+            if stat.S_ISREG(info.st_mode) and info.st_size:
+                try:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    pass
+            # Pipes, special files and empty files can't be mapped
+            buffer = memoryview(mapped if mapped is not None else f.read())
+        try:
+            yield buffer
+        finally:
+            buffer.release()
+            if mapped is not None:
+                try:
+                    mapped.close()
+                except BufferError:
+                    # Somebody still holds a view into the map,
+                    # it gets unmapped once that is garbage collected
+                    pass
+
+    def iter_content(self, chunk_size: int = 64 * 1024) -> t.Iterator[memoryview]:
+        """
+        Yields the file content in zero-copy chunks of up to `chunk_size` bytes
+        """
+        with self.open_buffer() as buffer:
+            for start in range(0, len(buffer), chunk_size):
+                yield buffer[start : start + chunk_size]
+
     def __repr__(self) -> str:
         return str(self.path)
 
@@ -55,7 +101,7 @@ class UploadCollectionResultFileFixer(object):
 @dataclass
 class UploadCollectionResult(object):
     __slots__ = ["network", "files", "file_fixes"]
-    network: t.List[str]
+    network: t.Sequence[str]
     files: t.List[UploadCollectionResultFile]
     file_fixes: t.List[UploadCollectionResultFileFixer]
 
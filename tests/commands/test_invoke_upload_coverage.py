@@ -115,6 +115,11 @@ def test_upload_coverage_options(mocker):
             "  -d, --dry-run                   Don't upload files to Codecov",
             "  --legacy, --use-legacy-uploader",
             "                                  Use the legacy upload endpoint",
+            "  --gzip-legacy-upload            Gzip the report sent to storage by the legacy",
+            "                                  uploader. It is then sent with chunked",
+            "                                  transfer encoding and no Content-Length, which",
+            "                                  some storage backends, like presigned S3 URLs,",
+            "                                  reject",
             "  --handle-no-reports-found       Raise no exceptions when no coverage reports",
             "                                  found.",
             "  --report-type [coverage|test_results]",
@@ -134,6 +139,93 @@ def test_upload_coverage_options(mocker):
             "  --gcov-include TEXT             Paths to include during gcov gathering",
             "  --gcov-executable TEXT          gcov executable to run. Defaults to 'gcov'",
             "  --swift-project TEXT            Specify the swift project",
+            "  --compression-workers INTEGER RANGE",
+            "                                  Number of threads used to compress coverage",
+            "                                  files before upload. Defaults to 1, which",
+            "                                  streams every file in chunks. More threads",
+            "                                  hold up to twice as many whole compressed",
+            "                                  files in memory  [x>=1]",
+            "  --compression-codec [zlib|deflate|lzma|auto]",
+            "                                  Codec used to compress coverage files. 'auto'",
+            "                                  benchmarks a few zlib levels on the reports",
+            "                                  and picks the fastest overall, or uses",
+            "                                  --compression-level if given. Codecs other",
+            "                                  than zlib must be supported by the Codecov",
+            "                                  instance receiving the upload  [default: zlib]",
+            "  --compression-level INTEGER RANGE",
+            "                                  Compression level, from 0 (fastest) to 9",
+            "                                  (smallest). Defaults to the codec's default",
+            "                                  level  [0<=x<=9]",
+            "  --payload-format [json|binary]  Format of the payload sent to storage.",
+            "                                  'binary' sends compressed files as raw bytes",
+            "                                  instead of base64 in JSON, and must be",
+            "                                  supported by the Codecov instance receiving",
+            "                                  the upload  [default: json]",
+            "  --deduplicate-files             Send coverage files with identical content",
+            "                                  only once, listing the others as aliases. Must",
+            "                                  be supported by the Codecov instance receiving",
+            "                                  the upload",
+            "  --upload-part-size INTEGER RANGE",
+            "                                  Send payloads bigger than this many bytes to",
+            "                                  storage in a resumable upload session (the",
+            "                                  Google Cloud Storage protocol), in parts of",
+            "                                  this size rounded down to a multiple of",
+            "                                  262144, resuming from what storage has after a",
+            "                                  failure. Storage that doesn't start a session,",
+            "                                  like presigned PUT URLs, gets the payload in a",
+            "                                  single request instead  [x>=262144]",
+            "  --max-payload-bytes INTEGER RANGE",
+            "                                  Split the reports into several uploads, sent",
+            "                                  one after the other, when the estimated",
+            "                                  payload is bigger than this many bytes. Every",
+            "                                  upload carries the network section and file",
+            "                                  fixes  [x>=1]",
+            "  --overlap-upload-request        Write the payload while the upload request to",
+            "                                  Codecov is in flight instead of before it. The",
+            "                                  request then doesn't carry the payload size",
+            "  --search-workers INTEGER RANGE  Number of threads listing directories when",
+            "                                  searching for reports. With more than one,",
+            "                                  reports are found in no particular order",
+            "                                  [default: 1; x>=1]",
+            "  --discovery-cache-dir DIRECTORY",
+            "                                  Folder to keep a cache of the report search",
+            "                                  in. Folders that didn't change since the last",
+            "                                  search with the same options aren't listed",
+            "                                  again",
+            "  --discovery-mode [walk|git]     How to search for reports. `walk` lists every",
+            "                                  folder of the search root, `git` only looks at",
+            "                                  the files git doesn't track (ignored ones",
+            "                                  included), so reports committed to the",
+            "                                  repository or in submodules aren't found",
+            "                                  [default: walk]",
+            "  --sniff-report-formats          Read the start of every coverage report found",
+            "                                  by the search, and leave out the ones that",
+            "                                  aren't lcov, cobertura, jacoco, clover, go",
+            "                                  cover, gcov or coverage.py json reports. Files",
+            "                                  given with --file are always uploaded",
+            "  --max-report-file-bytes INTEGER RANGE",
+            "                                  Leave out report files larger than this, with",
+            "                                  a warning  [x>=1]",
+            "  --max-report-total-bytes INTEGER RANGE",
+            "                                  Leave out the largest report files, with a",
+            "                                  warning, until the ones left add up to at most",
+            "                                  this  [x>=1]",
+            "  --network-format [list|front-coded]",
+            "                                  How the list of files in the repository is",
+            "                                  sent. 'front-coded' sends each path as the",
+            "                                  length of the prefix it shares with the",
+            "                                  previous one and the rest of it, which is much",
+            "                                  smaller for large repositories, and must be",
+            "                                  supported by the Codecov instance receiving",
+            "                                  the upload  [default: list]",
+            "  --network-rule TEXT             A filter and a prefix for the files listed in",
+            "                                  the network section, as FILTER=PREFIX, either",
+            "                                  of which can be empty. Can be given several",
+            "                                  times, for instance for each service of a",
+            "                                  monorepo: files are kept if their path begins",
+            "                                  with one of the filters, and get the prefix of",
+            "                                  the longest one. Applied together with",
+            "                                  --network-filter and --network-prefix",
             "  --parent-sha TEXT               SHA (with 40 chars) of what should be the",
             "                                  parent of this commit",
             "  -h, --help                      Show this message and exit.",
@@ -1,8 +1,19 @@
+import os
+import pathlib
 import re
+import time
 
 import pytest
 
-from codecov_cli.helpers.folder_searcher import globs_to_regex, search_files
+from codecov_cli.helpers import folder_searcher
+from codecov_cli.helpers.folder_searcher import (
+    FolderIgnoreMatcher,
+    GlobSet,
+    globs_to_regex,
+    match_files,
+    search_files,
+)
+from codecov_cli.services.upload import file_finder
 
 
 def test_search_files(tmp_path):
@@ -233,8 +244,11 @@ def test_search_files_with_multipart_excluded_regex_with_foldername(tmp_path):
         ),
     ],
 )
-def test_globs_to_regex_matches_expected_files(patterns, should_match, shouldnt_match):
-    regex = globs_to_regex(patterns)
+@pytest.mark.parametrize("compile_globs", [globs_to_regex, GlobSet])
+def test_globs_to_regex_matches_expected_files(
+    patterns, should_match, shouldnt_match, compile_globs
+):
+    regex = compile_globs(patterns)
 
     # assert all(regex.match(file_name) for file_name in should_match)
     # assert all(not regex.match(file_name) for file_name in shouldnt_match)
@@ -246,6 +260,66 @@ def test_globs_to_regex_matches_expected_files(patterns, should_match, shouldnt_
         assert not regex.match(file_name)
 
 
+def test_glob_set_tables():
+    globs = GlobSet(
+        ["coverage.xml", "*.py", "*~", "*", ".coverage*", "jacoco*.xml", "*/a.txt"]
+    )
+
+    assert globs.names == {"coverage.xml"}
+    assert globs.extensions == {"py"}
+    assert globs.suffixes == {1: {"~"}, 0: {""}}
+    assert globs.prefixes == {9: {".coverage"}}
+    assert globs.regex.pattern == globs_to_regex(["jacoco*.xml", "*/a.txt"]).pattern
+    assert GlobSet([]).match("anything") is False
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [
+        file_finder.coverage_files_patterns,
+        file_finder.coverage_files_excluded_patterns,
+        file_finder.test_results_files_patterns,
+        file_finder.test_results_files_excluded_patterns,
+    ],
+)
+def test_glob_set_matches_report_patterns_like_globs_to_regex(patterns):
+    regex = globs_to_regex(patterns)
+    globs = GlobSet(patterns)
+    names = [
+        "",
+        "a",
+        "~",
+        "coverage.xml",
+        "main.py",
+        "main.pyc",
+        "app.min.js",
+        ".coveragerc",
+        ".coverage.host.1234",
+        "codecov.yml",
+        "junit-report.xml",
+        "TEST-com.example.xml",
+        "test_a_coverage.txt",
+        "lib.jar.sha",
+        *(pattern.replace("*", "x").replace("?", "y") for pattern in patterns),
+    ]
+
+    for name in names:
+        assert globs.match(name) == bool(regex.match(name)), name
+
+
+def test_globs_to_regex_is_memoized(mocker):
+    translate = mocker.spy(folder_searcher, "translate")
+    mocked_logger = mocker.patch.object(folder_searcher, "logger")
+    patterns = ["*.memoized", "memoized-*.xml"]
+
+    regex = globs_to_regex(patterns)
+    assert globs_to_regex(list(patterns)) is regex
+    assert globs_to_regex(iter(patterns)) is regex
+    assert translate.call_count == 2
+    assert mocked_logger.debug.call_count == 2
+    assert globs_to_regex(patterns[:1]) is not regex
+
+
 def test_globs_to_regex_returns_none_if_patterns_empty():
     regex = globs_to_regex([])
 
@@ -281,3 +355,366 @@ def test_search_directories(tmp_path):
             tmp_path / "path/to/apple.app",
         ]
     )
+
+
+def _search_files_with_os_walk(
+    folder_to_search,
+    folders_to_ignore,
+    *,
+    filename_include_regex,
+    filename_exclude_regex=None,
+    multipart_include_regex=None,
+    multipart_exclude_regex=None,
+    search_for_directories=False,
+):
+    # The os.walk implementation search_files used to have
+    for dirpath, dirnames, filenames in os.walk(folder_to_search):
+        dirnames[:] = [d for d in dirnames if d not in folders_to_ignore]
+        for name in dirnames if search_for_directories else filenames:
+            path = pathlib.Path(dirpath) / name
+            if (
+                filename_exclude_regex is not None
+                and filename_exclude_regex.match(path.name)
+            ) or (
+                multipart_exclude_regex is not None
+                and multipart_exclude_regex.match(path.as_posix())
+            ):
+                continue
+            if filename_include_regex.match(path.name) and (
+                multipart_include_regex is None
+                or multipart_include_regex.match(path.resolve().as_posix())
+            ):
+                yield path
+
+
+@pytest.mark.parametrize("search_for_directories", [False, True])
+@pytest.mark.parametrize("relative", [False, True])
+def test_search_files_matches_os_walk(
+    tmp_path, monkeypatch, search_for_directories, relative
+):
+    for f in [
+        "coverage.xml",
+        "src/app/coverage.xml",
+        "src/app/main.py",
+        "src/node_modules/pkg/coverage.xml",
+        "build/reports/coverage/coverage.xml",
+        "build/reports/other.xml",
+        "real/coverage.xml",
+    ]:
+        (tmp_path / f).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / f).touch()
+    (tmp_path / "src/linked.xml").symlink_to(tmp_path / "real/coverage.xml")
+    (tmp_path / "src/linked_dir").symlink_to(tmp_path / "real")
+    (tmp_path / "src/broken.xml").symlink_to(tmp_path / "missing.xml")
+
+    root = tmp_path
+    if relative:
+        monkeypatch.chdir(tmp_path)
+        root = pathlib.Path(".")
+    for kwargs in [
+        dict(filename_include_regex=re.compile(".*")),
+        dict(
+            filename_include_regex=re.compile(r".*\.xml|app|coverage|linked_dir"),
+            filename_exclude_regex=re.compile("other.*"),
+        ),
+        dict(
+            filename_include_regex=re.compile(".*"),
+            multipart_include_regex=re.compile(".*/real/.*|.*/reports/.*"),
+        ),
+        dict(
+            filename_include_regex=re.compile(".*"),
+            multipart_exclude_regex=re.compile(r"(.*/)?build/.*"),
+        ),
+    ]:
+        assert list(
+            search_files(
+                root,
+                ["node_modules"],
+                search_for_directories=search_for_directories,
+                **kwargs,
+            )
+        ) == list(
+            _search_files_with_os_walk(
+                root,
+                ["node_modules"],
+                search_for_directories=search_for_directories,
+                **kwargs,
+            )
+        )
+
+
+def test_search_files_missing_folder(tmp_path):
+    assert (
+        list(
+            search_files(
+                tmp_path / "missing", [], filename_include_regex=re.compile(".*")
+            )
+        )
+        == []
+    )
+
+
+@pytest.mark.parametrize("search_for_directories", [False, True])
+def test_search_files_in_parallel(tmp_path, search_for_directories):
+    for d in range(30):
+        for f in ["coverage.xml", "main.py"]:
+            path = tmp_path / f"pkg{d % 3}" / f"module{d}" / "reports" / f
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+    (tmp_path / "pkg0" / "node_modules" / "reports").mkdir(parents=True)
+    (tmp_path / "pkg0" / "node_modules" / "coverage.xml").touch()
+
+    kwargs = dict(
+        filename_include_regex=re.compile("coverage.*|reports"),
+        search_for_directories=search_for_directories,
+    )
+    sequential = list(search_files(tmp_path, ["node_modules"], **kwargs))
+    assert len(sequential) == 30
+
+    parallel = list(search_files(tmp_path, ["node_modules"], workers=4, **kwargs))
+    assert sorted(parallel) == sorted(sequential)
+
+    assert list(
+        search_files(tmp_path, ["node_modules"], workers=4, sort_results=True, **kwargs)
+    ) == sorted(sequential)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_search_files_sizes(tmp_path, workers):
+    for index, f in enumerate(["coverage.xml", "a/coverage.xml", "a/b/main.py"]):
+        (tmp_path / f).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / f).write_bytes(b"x" * index * 10)
+
+    sizes = {}
+    found = search_files(
+        tmp_path,
+        [],
+        filename_include_regex=re.compile("coverage.xml"),
+        workers=workers,
+        sizes=sizes,
+    )
+    assert sorted(found) == [tmp_path / "a/coverage.xml", tmp_path / "coverage.xml"]
+    assert sizes == {tmp_path / "coverage.xml": 0, tmp_path / "a/coverage.xml": 10}
+
+
+def test_search_files_in_parallel_stops_early(tmp_path, mocker):
+    for d in range(50):
+        (tmp_path / f"dir{d}").mkdir()
+        (tmp_path / f"dir{d}" / "coverage.xml").touch()
+    scan_directory = folder_searcher._scan_directory
+
+    def slow_scan_directory(directory):
+        time.sleep(0.01)
+        return scan_directory(directory)
+
+    scan = mocker.patch.object(
+        folder_searcher, "_scan_directory", side_effect=slow_scan_directory
+    )
+
+    found = search_files(
+        tmp_path, [], filename_include_regex=re.compile("coverage.*"), workers=2
+    )
+    next(found)
+    found.close()
+    listed = scan.call_count
+    assert listed < 10
+    time.sleep(0.05)
+    # Nothing is left running in the background after closing
+    assert scan.call_count == listed
+
+
+def test_folder_ignore_matcher():
+    matcher = FolderIgnoreMatcher(
+        [
+            "node_modules",
+            "js/generated/coverage",
+            "js/generated/coverage/deeper",
+            "./build",
+            "a/b/c",
+            "a/b",
+            "../outside",
+            pathlib.Path("vendor"),
+            pathlib.Path("/root/project/abs/folder"),
+            "/elsewhere/folder",
+        ]
+    )
+    assert matcher.names == {"node_modules", "vendor"}
+    assert matcher.path_trie(pathlib.Path("/root/project")) == {
+        "js": {"generated": {"coverage": None}},
+        "build": None,
+        "a": {"b": None},
+        "abs": {"folder": None},
+    }
+    assert FolderIgnoreMatcher(["a", "b"]).path_trie(pathlib.Path(".")) is None
+
+
+def test_search_files_ignores_nested_folders(tmp_path, mocker):
+    for f in [
+        "js/generated/coverage/coverage.xml",
+        "js/generated/other/coverage.xml",
+        "js/coverage/coverage.xml",
+        "src/js/generated/coverage/coverage.xml",
+        "abs/ignored/coverage.xml",
+        "abs/kept/coverage.xml",
+        "gcov/ignored/coverage.xml",
+    ]:
+        (tmp_path / f).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / f).touch()
+    scan = mocker.spy(folder_searcher, "_scan_directory")
+
+    found = search_files(
+        tmp_path,
+        [
+            "js/generated/coverage",
+            (tmp_path / "abs" / "ignored").as_posix(),
+            pathlib.Path("ignored"),
+        ],
+        filename_include_regex=re.compile("coverage.xml"),
+    )
+    assert sorted(found) == [
+        tmp_path / "abs/kept/coverage.xml",
+        tmp_path / "js/coverage/coverage.xml",
+        tmp_path / "js/generated/other/coverage.xml",
+        tmp_path / "src/js/generated/coverage/coverage.xml",
+    ]
+    scanned = {pathlib.Path(call.args[0]) for call in scan.call_args_list}
+    assert tmp_path / "js/generated/coverage" not in scanned
+    assert tmp_path / "abs/ignored" not in scanned
+    assert tmp_path / "gcov/ignored" not in scanned
+
+
+def test_search_files_prunes_multipart_excluded_folders(tmp_path, mocker):
+    for f in ["build/out/coverage.xml", "src/coverage.xml"]:
+        (tmp_path / f).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / f).touch()
+    scan = mocker.spy(folder_searcher, "_scan_directory")
+
+    found = search_files(
+        tmp_path,
+        [],
+        filename_include_regex=re.compile("coverage.xml"),
+        multipart_exclude_regex=re.compile(".*/build"),
+    )
+    assert list(found) == [tmp_path / "src/coverage.xml"]
+    scanned = {pathlib.Path(call.args[0]) for call in scan.call_args_list}
+    assert scanned == {tmp_path, tmp_path / "src"}
+
+
+def _age_tree(root, seconds=60):
+    # Directories modified just now are never cached, see RACY_MTIME_WINDOW_NS
+    past = time.time() - seconds
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (past, past))
+
+
+def test_search_files_discovery_cache(tmp_path, mocker):
+    root = tmp_path / "project"
+    cache_dir = tmp_path / "cache"
+    for f in ["a/coverage.xml", "a/b/coverage.xml", "c/other.txt", "coverage.xml"]:
+        (root / f).parent.mkdir(parents=True, exist_ok=True)
+        (root / f).touch()
+    _age_tree(root)
+
+    def search():
+        return sorted(
+            search_files(
+                root,
+                [],
+                filename_include_regex=re.compile("coverage.xml"),
+                cache_dir=cache_dir,
+            )
+        )
+
+    scan = mocker.spy(folder_searcher, "_scan_directory")
+
+    expected = [
+        root / "a/b/coverage.xml",
+        root / "a/coverage.xml",
+        root / "coverage.xml",
+    ]
+    assert search() == expected
+    assert scan.call_count == 4
+    assert len(list(cache_dir.iterdir())) == 1
+
+    scan.reset_mock()
+    assert search() == expected
+    assert scan.call_count == 0
+
+    (root / "a/b/c").mkdir()
+    (root / "a/b/c/coverage.xml").touch()
+    scan.reset_mock()
+    assert search() == [root / "a/b/c/coverage.xml", *expected]
+    scanned = {pathlib.Path(call.args[0]) for call in scan.call_args_list}
+    assert scanned == {root / "a/b", root / "a/b/c"}
+
+    # The folder just changed, it's listed until its mtime is old enough
+    scan.reset_mock()
+    search()
+    scanned = {pathlib.Path(call.args[0]) for call in scan.call_args_list}
+    assert scanned == {root / "a/b", root / "a/b/c"}
+
+
+def test_search_files_discovery_cache_is_per_pattern_set(tmp_path, mocker):
+    root = tmp_path / "project"
+    cache_dir = tmp_path / "cache"
+    (root / "a").mkdir(parents=True)
+    (root / "a/coverage.xml").touch()
+    (root / "a/jacoco.xml").touch()
+    _age_tree(root)
+    scan = mocker.spy(folder_searcher, "_scan_directory")
+
+    for name in ["coverage.xml", "jacoco.xml"]:
+        assert list(
+            search_files(
+                root,
+                [],
+                filename_include_regex=re.compile(name),
+                cache_dir=cache_dir,
+            )
+        ) == [root / "a" / name]
+    assert scan.call_count == 4
+    assert len(list(cache_dir.iterdir())) == 2
+
+    # An unreadable cache is the same as no cache
+    for cache_file in cache_dir.iterdir():
+        cache_file.write_text("{not json")
+    scan.reset_mock()
+    assert list(
+        search_files(
+            root,
+            [],
+            filename_include_regex=re.compile("coverage.xml"),
+            cache_dir=cache_dir,
+        )
+    ) == [root / "a/coverage.xml"]
+    assert scan.call_count == 2
+
+
+def test_match_files_filters_like_search_files(tmp_path):
+    files = [
+        "coverage.xml",
+        "a/coverage.xml",
+        "a/other.txt",
+        "a/coverage.ignored.xml",
+        "node_modules/pkg/coverage.xml",
+        "js/generated/coverage/coverage.xml",
+        "js/generated/other/coverage.xml",
+        "js/generated",
+    ]
+    for f in files:
+        (tmp_path / f).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / f).touch()
+    folders_to_ignore = FolderIgnoreMatcher(["node_modules", "js/generated/coverage"])
+    regexes = dict(
+        filename_include_regex=re.compile(r".*coverage.*\.xml"),
+        filename_exclude_regex=re.compile(r".*\.ignored\..*"),
+    )
+
+    assert list(match_files(tmp_path, files, folders_to_ignore, **regexes)) == [
+        tmp_path / "coverage.xml",
+        tmp_path / "a/coverage.xml",
+        tmp_path / "js/generated/other/coverage.xml",
+    ]
+    assert sorted(match_files(tmp_path, files, folders_to_ignore, **regexes)) == sorted(
+        search_files(tmp_path, folders_to_ignore, **regexes)
+    )
@@ -0,0 +1,85 @@
+import subprocess
+
+import pytest
+
+from codecov_cli.helpers.git_index import GitIndexError, read_index_paths
+
+EMPTY_BLOB = "e69de29bb2d1d6434b8b29ae5ce06ac6ffd9a13e"
+
+PATHS = [
+    "README.md",
+    "src/app/a.py",
+    "src/app/b.py",
+    "src/lib/c.py",
+    "tests/data/Контроллеры/Пользователь.php",
+    "x" * 300 + "/" + "y" * 4000 + ".py",
+]
+
+
+def make_index(repository, paths, *update_index_args):
+    subprocess.run(["git", "init", "-q", str(repository)], check=True)
+    subprocess.run(
+        ["git", "-C", str(repository), "update-index", "--add", "--index-info"],
+        input="".join(f"100644 {EMPTY_BLOB}\t{path}\n" for path in paths).encode(),
+        check=True,
+    )
+    if update_index_args:
+        subprocess.run(
+            ["git", "-C", str(repository), "update-index", *update_index_args],
+            check=True,
+        )
+    return repository / ".git" / "index"
+
+
+def ls_files(repository):
+    res = subprocess.run(
+        ["git", "-C", str(repository), "ls-files", "-z"],
+        capture_output=True,
+        check=True,
+    )
+    return res.stdout.split(b"\0")[:-1]
+
+
+@pytest.mark.parametrize(
+    "update_index_args",
+    [
+        ["--index-version", "2"],
+        ["--index-version", "3", "--skip-worktree", "src/app/b.py"],
+        ["--index-version", "4"],
+        ["--index-version", "4", "--skip-worktree", "README.md"],
+    ],
+)
+def test_read_index_paths(tmp_path, update_index_args):
+    index = make_index(tmp_path, PATHS, *update_index_args)
+
+    paths = read_index_paths(index)
+    assert paths == ls_files(tmp_path)
+    assert [path.decode() for path in paths] == PATHS
+
+
+def test_read_index_paths_of_an_empty_repository(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    assert read_index_paths(tmp_path / ".git" / "index") == []
+
+
+def test_read_index_paths_of_a_split_index(tmp_path):
+    index = make_index(tmp_path, PATHS, "--split-index")
+    with pytest.raises(GitIndexError):
+        read_index_paths(index)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b"", b"DIRC", b"DIRC\0\0\0\x05\0\0\0\0", b"PACK\0\0\0\x02\0\0\0\0"],
+)
+def test_read_index_paths_of_an_invalid_index(tmp_path, content):
+    (tmp_path / "index").write_bytes(content)
+    with pytest.raises(GitIndexError):
+        read_index_paths(tmp_path / "index")
+
+
+def test_read_index_paths_of_a_truncated_index(tmp_path):
+    index = make_index(tmp_path, PATHS)
+    index.write_bytes(index.read_bytes()[:200])
+    with pytest.raises(GitIndexError):
+        read_index_paths(index)
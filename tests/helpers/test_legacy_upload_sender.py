@@ -1,3 +1,4 @@
+import gzip
 from urllib import parse
 
 import pytest
@@ -5,8 +6,9 @@ import responses
 from responses import matchers
 
 from codecov_cli import __version__ as codecov_cli_version
+from codecov_cli.services.upload import legacy_upload_sender
 from codecov_cli.services.upload.legacy_upload_sender import LegacyUploadSender
-from codecov_cli.types import UploadCollectionResult
+from codecov_cli.types import UploadCollectionResult, UploadCollectionResultFile
 from tests.data import reports_examples
 
 upload_collection = UploadCollectionResult(["1", "apple.py", "3"], [], [])
@@ -114,6 +116,51 @@ class TestUploadSender(object):
         put_req_mad = mocked_responses.calls[1].request
         assert put_req_mad.url == "https://puturl.com/"
 
+    def test_upload_sender_put_streams_payload(
+        self,
+        mocked_responses,
+        mocked_legacy_upload_endpoint,
+        mocked_storage_server,
+        tmp_path,
+    ):
+        report = tmp_path / "coverage.xml"
+        report.write_bytes(b"<coverage/>" * 100_000)
+        upload_data = UploadCollectionResult(
+            ["apple.py"], [UploadCollectionResultFile(report)], []
+        )
+        sender = LegacyUploadSender()
+        sending_result = sender.send_upload_data(
+            upload_data, random_sha, random_token, {"A": "b"}, **named_upload_data
+        )
+        assert sending_result.error is None
+
+        put_request = mocked_responses.calls[1].request
+        payload = sender._generate_payload(upload_data, {"A": "b"})
+        # Storage backends like presigned S3 URLs need the length up front
+        assert put_request.headers["Content-Length"] == str(len(payload))
+        assert "Transfer-Encoding" not in put_request.headers
+        chunks = list(put_request.body)
+        assert len(chunks) > 3
+        assert b"".join(chunks) == payload
+        # Iterating the body again regenerates it, for retries
+        assert b"".join(put_request.body) == b"".join(chunks)
+
+    def test_upload_sender_put_gzipped_payload(
+        self, mocked_responses, mocked_legacy_upload_endpoint, mocked_storage_server
+    ):
+        sending_result = LegacyUploadSender(gzip_payload=True).send_upload_data(
+            upload_collection, random_sha, random_token, {}, **named_upload_data
+        )
+        assert sending_result.error is None
+
+        put_request = mocked_responses.calls[1].request
+        assert put_request.headers["Content-Encoding"] == "gzip"
+        assert put_request.headers["Transfer-Encoding"] == "chunked"
+        assert "Content-Length" not in put_request.headers
+        assert gzip.decompress(
+            b"".join(put_request.body)
+        ) == LegacyUploadSender()._generate_payload(upload_collection, {})
+
     def test_upload_sender_result_success(
         self, mocked_responses, mocked_legacy_upload_endpoint, mocked_storage_server
     ):
@@ -248,6 +295,28 @@ class TestPayloadGeneration(object):
             line for line in actual_network_section.split(b"\n")
         ]
 
+    def test_network_section_in_batches(self, mocker):
+        mocker.patch.object(legacy_upload_sender, "NETWORK_BATCH_SIZE", 2)
+        network_files = ["a.py", "Контроллер.php", "src/b.py", "c.py", "d.py"]
+        upload_data = UploadCollectionResult(network_files, [], [])
+        sender = LegacyUploadSender()
+
+        assert list(sender._iter_network_section(upload_data)) == [
+            "a.py\nКонтроллер.php\n".encode(),
+            b"src/b.py\nc.py\n",
+            b"d.py\n",
+            b"<<<<<< network\n",
+        ]
+        generate = mocker.spy(sender, "_generate_network_section")
+        assert sender._network_section_length(upload_data) == len(
+            b"".join(sender._iter_network_section(upload_data))
+        )
+        assert sender._payload_length(upload_data, {}) == len(
+            sender._generate_payload(upload_data, {})
+        )
+        generate.assert_not_called()
+        assert sender._network_section_length(UploadCollectionResult([], [], [])) == 0
+
     def test_generate_network_section_empty_result(self):
         assert (
             LegacyUploadSender()._generate_network_section(
@@ -256,12 +325,8 @@ class TestPayloadGeneration(object):
             == b""
         )
 
-    def test_format_coverage_file(self, mocker):
+    def test_format_coverage_file(self, mocker, tmp_path):
         fake_result_file = mocker.MagicMock()
-        mocker.patch(
-            "codecov_cli.services.upload.upload_sender.UploadCollectionResultFile",
-            return_value=fake_result_file,
-        )
 
         coverage_file_seperated = reports_examples.coverage_file_section_simple.split(
             b"\n", 1
@@ -270,9 +335,11 @@ class TestPayloadGeneration(object):
         fake_result_file.get_filename.return_value = (
             coverage_file_seperated[0][len(b"# path=") :].strip().decode()
         )
-        fake_result_file.get_content.return_value = coverage_file_seperated[1][
-            : -len(b"\n<<<<<< EOF\n")
-        ]
+        content_path = tmp_path / "coverage.xml"
+        content_path.write_bytes(coverage_file_seperated[1][: -len(b"\n<<<<<< EOF\n")])
+        fake_result_file.iter_content.side_effect = lambda: UploadCollectionResultFile(
+            content_path
+        ).iter_content(chunk_size=16)
         actual_coverage_file_section = LegacyUploadSender()._format_coverage_file(
             fake_result_file
         )
@@ -284,8 +351,8 @@ class TestPayloadGeneration(object):
 
     def test_generate_coverage_files_section(self, mocker):
         mocker.patch(
-            "codecov_cli.services.upload.LegacyUploadSender._format_coverage_file",
-            side_effect=lambda file_bytes: file_bytes,
+            "codecov_cli.services.upload.LegacyUploadSender._iter_coverage_file",
+            side_effect=lambda file_bytes: [file_bytes],
         )
 
         coverage_files = [
@@ -309,12 +376,12 @@ class TestPayloadGeneration(object):
             return_value=reports_examples.env_section,
         )
         mocker.patch(
-            "codecov_cli.services.upload.LegacyUploadSender._generate_network_section",
-            return_value=reports_examples.network_section,
+            "codecov_cli.services.upload.LegacyUploadSender._iter_network_section",
+            return_value=[reports_examples.network_section],
         )
         mocker.patch(
-            "codecov_cli.services.upload.LegacyUploadSender._generate_coverage_files_section",
-            return_value=reports_examples.coverage_file_section_simple,
+            "codecov_cli.services.upload.LegacyUploadSender._iter_coverage_files_section",
+            return_value=[reports_examples.coverage_file_section_simple],
         )
 
         actual_report = LegacyUploadSender()._generate_payload(None, None)
@@ -2,7 +2,13 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from codecov_cli.services.upload.network_finder import NetworkFinder
+from codecov_cli.services.upload.network_finder import (
+    FilteredNetwork,
+    NetworkFinder,
+    PrefixTrie,
+    parse_network_rule,
+    select_network_finder,
+)
 
 
 def test_find_files(mocker, tmp_path):
@@ -133,3 +139,115 @@ def test_find_files_with_filter_and_prefix(mocker, tmp_path):
         == filenames
     )
     mocked_vs.list_relevant_files.assert_called_with(tmp_path, False)
+
+
+def test_find_files_lists_files_once(mocker, tmp_path):
+    filenames = ["hello/a.txt", "hello/c.txt", "bello/b.txt"]
+
+    mocked_vs = MagicMock()
+    mocked_vs.list_relevant_files.return_value = filenames
+    network_finder = NetworkFinder(
+        versioning_system=mocked_vs,
+        recurse_submodules=True,
+        network_filter="hello",
+        network_prefix="bello",
+        network_root_folder=tmp_path,
+    )
+
+    filtered = network_finder.find_files()
+    assert filtered == ["bellohello/a.txt", "bellohello/c.txt"]
+    assert network_finder.find_files(True) == filenames
+    assert network_finder.find_files() is filtered
+    mocked_vs.list_relevant_files.assert_called_once_with(tmp_path, True)
+
+
+def test_prefix_trie():
+    trie = PrefixTrie(
+        [
+            ("services/api/", "a"),
+            ("services/", "s"),
+            ("services/api-gateway/", "g"),
+            ("lib", "l"),
+            ("services/web/", "w"),
+            ("a.b*c", "x"),
+        ]
+    )
+    assert trie.longest_prefix_value("services/api/main.py") == "a"
+    assert trie.longest_prefix_value("services/api-gateway/main.py") == "g"
+    assert trie.longest_prefix_value("services/api-other/main.py") == "s"
+    assert trie.longest_prefix_value("services/web/main.py") == "w"
+    assert trie.longest_prefix_value("services/") == "s"
+    assert trie.longest_prefix_value("service") is None
+    assert trie.longest_prefix_value("libraries/a.py") == "l"
+    assert trie.longest_prefix_value("a.b*c.py") == "x"
+    assert trie.longest_prefix_value("aXb*c.py") is None
+    assert trie.longest_prefix_value("") is None
+
+    trie[""] = "root"
+    assert trie.longest_prefix_value("docs/index.md") == "root"
+    assert trie.longest_prefix_value("services/api/main.py") == "a"
+    assert not PrefixTrie()
+    assert PrefixTrie().longest_prefix_value("a") is None
+
+
+def test_filtered_network():
+    files = ["services/api/a.py", "docs/b.md", "services/web/c.js", "services/d.py"]
+    rules = PrefixTrie([("services/api/", "api/"), ("services/web/", "")])
+    network = FilteredNetwork(files, rules)
+
+    assert list(network) == ["api/services/api/a.py", "services/web/c.js"]
+    assert network == ["api/services/api/a.py", "services/web/c.js"]
+    assert len(network) == 2
+    assert network[1] == "services/web/c.js"
+    assert network[-2:] == ["api/services/api/a.py", "services/web/c.js"]
+    assert list(network) == ["api/services/api/a.py", "services/web/c.js"]
+    assert "services/web/c.js" in network
+    assert network != ["api/services/api/a.py"]
+    with pytest.raises(IndexError):
+        network[2]
+
+
+def test_find_files_with_rules(tmp_path):
+    filenames = [
+        "services/api/a.py",
+        "services/api/b.py",
+        "services/web/c.js",
+        "services/worker/d.py",
+        "docs/e.md",
+    ]
+    mocked_vs = MagicMock()
+    mocked_vs.list_relevant_files.return_value = filenames
+
+    network_finder = select_network_finder(
+        mocked_vs,
+        recurse_submodules=False,
+        network_filter="docs/",
+        network_prefix="site/",
+        network_root_folder=tmp_path,
+        network_rules=["services/api/=backend/", "services/web/=frontend/"],
+    )
+    assert network_finder.find_files() == [
+        "backend/services/api/a.py",
+        "backend/services/api/b.py",
+        "frontend/services/web/c.js",
+        "site/docs/e.md",
+    ]
+    assert network_finder.find_files(True) == filenames
+
+
+@pytest.mark.parametrize(
+    "rule,expected",
+    [
+        ("services/api/=api/", ("services/api/", "api/")),
+        ("services/api/=", ("services/api/", "")),
+        ("=prefix/", ("", "prefix/")),
+        ("a=b=c", ("a", "b=c")),
+    ],
+)
+def test_parse_network_rule(rule, expected):
+    assert parse_network_rule(rule) == expected
+
+
+def test_parse_network_rule_without_separator():
+    with pytest.raises(ValueError):
+        parse_network_rule("services/api/")
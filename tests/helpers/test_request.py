@@ -1,3 +1,4 @@
+import io
 import uuid
 
 import pytest
@@ -154,6 +155,23 @@ def test_request_retry_too_many_errors(mocker):
     assert str(exp.value) == "Request failed after too many retries. URL: my_url"
 
 
+def test_request_retry_rewinds_file_body(mocker, valid_response):
+    mocker.patch("codecov_cli.helpers.request.sleep")
+    bodies = []
+
+    def mock_put(url, data=None, headers=None):
+        bodies.append(data.read())
+        if len(bodies) == 1:
+            raise requests.exceptions.ConnectionError()
+        return valid_response
+
+    mocker.patch.object(requests, "put", side_effect=mock_put)
+    body = io.BytesIO(b"payload")
+    resp = send_put_request("my_url", data=body)
+    assert resp == request_result(valid_response)
+    assert bodies == [b"payload", b"payload"]
+
+
 def test_user_agent(mocker):
     def mock_request(*args, headers={}, **kwargs):
         assert headers["User-Agent"] == f"codecov-cli/{__version__}"
@@ -1,5 +1,8 @@
+import base64
 import json
 import re
+import threading
+import zlib
 from pathlib import Path
 
 from copy import deepcopy
@@ -9,6 +12,10 @@ from responses import matchers
 
 from codecov_cli import __version__ as codecov_cli_version
 from codecov_cli.helpers.encoder import encode_slug
+from codecov_cli.services.upload.binary_payload import decode_binary_payload
+from codecov_cli.services.upload import payload_encoder, upload_sender
+from codecov_cli.services.upload.compression import LzmaCodec, ZlibCodec
+from codecov_cli.services.upload.payload_encoder import PayloadEncoder
 from codecov_cli.services.upload.upload_sender import UploadSender
 from codecov_cli.types import (
     UploadCollectionResult,
@@ -177,9 +184,11 @@ def mocked_coverage_file(mocker):
     fake_result_file.get_filename.return_value = (
         coverage_file_seperated[0][len(b"# path=") :].strip().decode()
     )
-    fake_result_file.get_content.return_value = coverage_file_seperated[1][
-        : -len(b"\n<<<<<< EOF\n")
-    ]
+    content = coverage_file_seperated[1][: -len(b"\n<<<<<< EOF\n")]
+    fake_result_file.get_content.return_value = content
+    fake_result_file.iter_content.side_effect = lambda chunk_size: (
+        content[i : i + chunk_size] for i in range(0, len(content), chunk_size)
+    )
     return fake_result_file
 
 
@@ -421,6 +430,108 @@ class TestUploadSender(object):
         put_req_mad = mocked_responses.calls[1].request
         assert put_req_mad.url == "https://puturl.com/"
 
+    def test_upload_sender_streams_payload_bigger_than_buffer(
+        self, mocked_responses, mocked_legacy_upload_endpoint, mocked_coverage_file
+    ):
+        upload_data = get_fake_upload_collection_result(mocked_coverage_file)
+        expected_payload = UploadSender()._generate_payload(upload_data, None)
+        put_bodies = []
+
+        def storage_callback(request):
+            put_bodies.append(request.body.read())
+            return (200, {}, "")
+
+        mocked_responses.add_callback(
+            responses.PUT, "https://puturl.com", callback=storage_callback
+        )
+
+        sending_result = UploadSender(buffer_size=16).send_upload_data(
+            upload_data, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+        assert put_bodies == [expected_payload]
+        assert json.loads(mocked_responses.calls[0].request.body)[
+            "report_payload_bytes"
+        ] == len(expected_payload)
+
+    def test_upload_sender_binary_payload(
+        self,
+        mocked_responses,
+        mocked_legacy_upload_endpoint,
+        mocked_storage_server,
+        mocked_coverage_file,
+    ):
+        upload_data = get_fake_upload_collection_result(mocked_coverage_file)
+        sending_result = UploadSender(payload_format="binary").send_upload_data(
+            upload_data, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+
+        post_data = json.loads(mocked_responses.calls[0].request.body)
+        put_body = mocked_responses.calls[1].request.body
+        assert post_data["report_payload_format"] == "binary"
+        assert post_data["report_payload_bytes"] == len(put_body)
+        decoded = decode_binary_payload(put_body)
+        assert decoded["network_files"] == upload_data.network
+        assert [f["data"] for f in decoded["coverage_files"]] == [
+            mocked_coverage_file.get_content()
+        ] * 2
+
+    def test_upload_sender_overlaps_request_and_payload(
+        self, mocker, mocked_responses, mocked_storage_server, mocked_coverage_file
+    ):
+        upload_data = get_fake_upload_collection_result(mocked_coverage_file)
+        expected_payload = UploadSender()._generate_payload(upload_data, None)
+        request_in_flight = threading.Event()
+
+        def upload_request_callback(request):
+            request_in_flight.set()
+            return (200, {}, json.dumps({"raw_upload_location": "https://puturl.com"}))
+
+        mocked_responses.add_callback(
+            responses.POST,
+            re.compile(r"https://ingest.codecov.io/upload/.*/uploads"),
+            callback=upload_request_callback,
+        )
+        write_payload = UploadSender._write_payload
+
+        def slow_write_payload(self, *args):
+            # Only finishes if the upload request was sent without waiting for it
+            assert request_in_flight.wait(timeout=5)
+            return write_payload(self, *args)
+
+        mocker.patch.object(UploadSender, "_write_payload", slow_write_payload)
+        start_span = mocker.spy(upload_sender.sentry_sdk, "start_span")
+
+        sending_result = UploadSender(overlap_upload_request=True).send_upload_data(
+            upload_data, random_sha, random_token, **named_upload_data
+        )
+        assert sending_result.error is None
+        assert "report_payload_bytes" not in json.loads(
+            mocked_responses.calls[0].request.body
+        )
+        assert mocked_responses.calls[1].request.body == expected_payload
+        assert {call.kwargs["name"] for call in start_span.call_args_list} == {
+            "upload_sender",
+            "upload_sender_preparation",
+            "upload_sender_payload",
+            "upload_sender_storage_request",
+            "upload_sender_storage",
+        }
+
+    def test_upload_sender_overlap_closes_unsent_payload(
+        self, mocker, mocked_responses, mocked_legacy_upload_endpoint
+    ):
+        mocked_legacy_upload_endpoint.status = 400
+        payload = mocker.MagicMock()
+        mocker.patch.object(UploadSender, "_write_payload", return_value=(payload, 3))
+
+        sending_result = UploadSender(overlap_upload_request=True).send_upload_data(
+            upload_collection, random_sha, random_token, **named_upload_data
+        )
+        assert "400" in sending_result.error.code
+        payload.close.assert_called_once()
+
     def test_upload_sender_result_success(
         self, mocked_responses, mocked_legacy_upload_endpoint, mocked_storage_server
     ):
@@ -584,25 +695,212 @@ class TestPayloadGeneration(object):
         assert actual_report == json.dumps(expected_report).encode()
 
     def test_formatting_file_coverage_info(self, mocker, mocked_coverage_file):
-        format, formatted_content = UploadSender()._get_format_info(
-            mocked_coverage_file
-        )
-        assert format == "base64+compressed"
+        formatted_content = b"".join(
+            PayloadEncoder().iter_compressed_content(mocked_coverage_file)
+        ).decode()
         assert (
             formatted_content
             == "eJzdVctymzAU3ecrVPYg4hrHkyHOTDfddtM1I8SNUQsSo3vx4+8rngE7pIs6M21ZMNyHzpHOPUD8fCoLdgCLyugn7z4IPfa8u4ulcTmxB5ZaoWXuW0Hw5LliFwP6bQdk8+RBFKpLSVNWBZwUnduwUBoGkGDTxROMz+GQ6hEilyBVApIoK7evTRhuolW42m4jt3rc7zqIgrW3u2Puij/5PvsKGhqajKVnNhwiqM6PLCeq8JHzMWlBZJRDZiQGyjDfn8B8EeggjB5XWXEM9oryOq0RrDSaQFPgDunwUrBUW8GPkPJSIIHlOTWw3Gk78vnhOsgoe+VBU1sJ2EWTzI5/dxTIKVdib6wVpUH+zZofIAm5LBQ05AcOJ9FI7Fdnyo2Oeb+6A+cz9LgS8qfbw5SsT10N+N3BbT2mRemexRHQlOC9AragshCIU5p55XdkL6qAGT5PEqUVJYkb4eVe1g/3w26mXdfcLX8JTqUM+UK5Nd/btbHOckXovOhY69INvXlcwuMLgDFvhbidQNJkkLyo9Fqgh2iQZ9rzD8rTJ2fu5b19/9DQ0WrQiNynBj/Mzi36oplv7eM3ijfzXXeS5p50Y07oaK7MN1X1ou/DDRj+Fe/nRCdsv9OLQ7/o+S9f0DF0LfH4S9z9Ar0cTD8="
         )
 
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+    def test_formatting_file_coverage_info_chunked(
+        self, mocked_coverage_file, chunk_size
+    ):
+        expected = PayloadEncoder().iter_compressed_content(mocked_coverage_file)
+        actual = PayloadEncoder(chunk_size=chunk_size).iter_compressed_content(
+            mocked_coverage_file
+        )
+        assert b"".join(actual) == b"".join(expected)
+
     def test_coverage_file_format(self, mocker, mocked_coverage_file):
         mocker.patch(
-            "codecov_cli.services.upload.upload_sender.UploadSender._get_format_info",
-            return_value=("base64+compressed", "encoded_file_data"),
+            "codecov_cli.services.upload.payload_encoder.PayloadEncoder.iter_compressed_content",
+            return_value=[b"encoded_file_data"],
+        )
+        json_formatted_coverage_file = json.loads(
+            b"".join(PayloadEncoder().iter_file(mocked_coverage_file))
         )
-        json_formatted_coverage_file = UploadSender()._format_file(mocked_coverage_file)
-        print(json_formatted_coverage_file["data"])
         assert json_formatted_coverage_file == {
             "filename": mocked_coverage_file.get_filename(),
             "format": "base64+compressed",
             "data": "encoded_file_data",
             "labels": "",
         }
+
+    def test_generate_payload_matches_json_dumps(self, mocked_coverage_file, mocker):
+        mocker.patch(
+            "codecov_cli.services.upload.payload_encoder.NETWORK_BATCH_SIZE", 2
+        )
+        upload_data = get_fake_upload_collection_result(mocked_coverage_file)
+        sender = UploadSender()
+        expected = {
+            "report_fixes": {
+                "format": "legacy",
+                "value": sender._get_file_fixers(upload_data),
+            },
+            "network_files": upload_data.network,
+            "coverage_files": [
+                json.loads(b"".join(sender.encoder.iter_file(file)))
+                for file in upload_data.files
+            ],
+            "metadata": {},
+        }
+        assert (
+            sender._generate_payload(upload_data, None) == json.dumps(expected).encode()
+        )
+
+    def test_generate_payload_streams_files_by_default(self, tmp_path, mocker):
+        path = tmp_path / "coverage.xml"
+        path.write_bytes(b"<coverage/>" * 1000)
+        mocked_pool = mocker.patch.object(payload_encoder, "ThreadPoolExecutor")
+
+        sender = UploadSender()
+        files = sender.encoder.iter_compressed_files([UploadCollectionResultFile(path)])
+        ((file, content),) = list(files)
+        # The content is compressed as it's read, not held whole
+        assert not isinstance(content, list)
+        assert sender.encoder.workers == 1
+        mocked_pool.assert_not_called()
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_generate_payload_preserves_file_order(self, tmp_path, workers):
+        files = []
+        for i in range(10):
+            path = tmp_path / f"coverage_{i}.xml"
+            path.write_bytes(f"<coverage>{i}</coverage>".encode() * (10 - i) * 1000)
+            files.append(UploadCollectionResultFile(path))
+
+        payload = json.loads(
+            UploadSender(compression_workers=workers)._generate_payload(
+                UploadCollectionResult([], files, []), None
+            )
+        )
+        assert [f["filename"] for f in payload["coverage_files"]] == [
+            f.get_filename() for f in files
+        ]
+        assert [
+            zlib.decompress(base64.b64decode(f["data"]))
+            for f in payload["coverage_files"]
+        ] == [f.get_content() for f in files]
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_generate_payload_deduplicates_files(self, tmp_path, workers, mocker):
+        files = []
+        for i, content in enumerate(
+            [b"a" * 1000, b"b" * 1000, b"a" * 1000, b"a" * 1000]
+        ):
+            path = tmp_path / f"coverage_{i}.xml"
+            path.write_bytes(content)
+            files.append(UploadCollectionResultFile(path))
+
+        mock_info = mocker.patch.object(payload_encoder.logger, "info")
+        payload = json.loads(
+            UploadSender(
+                compression_workers=workers, deduplicate_files=True
+            )._generate_payload(UploadCollectionResult([], files, []), None)
+        )
+        assert [f["filename"] for f in payload["coverage_files"]] == [
+            files[0].get_filename(),
+            files[1].get_filename(),
+        ]
+        assert payload["file_aliases"] == {
+            files[2].get_filename(): files[0].get_filename(),
+            files[3].get_filename(): files[0].get_filename(),
+        }
+        saved = 2 * len(payload["coverage_files"][0]["data"])
+        mock_info.assert_called_once_with(
+            f"Skipped 2 duplicate report files, saving {saved} bytes of upload"
+        )
+
+    def test_generate_payload_keeps_duplicates_by_default(self, tmp_path):
+        files = []
+        for i in range(2):
+            path = tmp_path / f"coverage_{i}.xml"
+            path.write_bytes(b"same")
+            files.append(UploadCollectionResultFile(path))
+
+        payload = json.loads(
+            UploadSender()._generate_payload(
+                UploadCollectionResult([], files, []), None
+            )
+        )
+        assert len(payload["coverage_files"]) == 2
+        assert "file_aliases" not in payload
+
+    @pytest.mark.parametrize(
+        "codec,level,expected_format",
+        [
+            ("zlib", 1, "base64+compressed"),
+            ("deflate", None, "base64+deflate"),
+            ("lzma", 9, "base64+lzma"),
+        ],
+    )
+    def test_generate_payload_with_codec(
+        self, mocked_coverage_file, codec, level, expected_format
+    ):
+        sender = UploadSender(compression_codec=codec, compression_level=level)
+        payload = json.loads(
+            sender._generate_payload(
+                UploadCollectionResult([], [mocked_coverage_file], []), None
+            )
+        )
+        (coverage_file,) = payload["coverage_files"]
+        assert coverage_file["format"] == expected_format
+        assert (
+            sender.encoder.codec.decompress(base64.b64decode(coverage_file["data"]))
+            == mocked_coverage_file.get_content()
+        )
+
+    def test_generate_payload_with_auto_codec(self, mocker, mocked_coverage_file):
+        mocked_select = mocker.patch(
+            "codecov_cli.services.upload.upload_sender.select_codec",
+            return_value=LzmaCodec(),
+        )
+        upload_data = UploadCollectionResult([], [mocked_coverage_file], [])
+        payload = json.loads(
+            UploadSender(compression_codec="auto")._generate_payload(upload_data, None)
+        )
+        mocked_select.assert_called_with(upload_data.files, None)
+        assert payload["coverage_files"][0]["format"] == "base64+lzma"
+
+    def test_generate_payloads_with_auto_codec_per_batch(
+        self, mocker, mocked_coverage_file
+    ):
+        lzma_batch = UploadCollectionResult([], [mocked_coverage_file], [])
+        zlib_batch = UploadCollectionResult([], [mocked_coverage_file], [])
+        mocker.patch(
+            "codecov_cli.services.upload.upload_sender.select_codec",
+            side_effect=lambda files, level: (
+                LzmaCodec() if files is lzma_batch.files else ZlibCodec()
+            ),
+        )
+        sender = UploadSender(compression_codec="auto")
+        shared_codec = sender.encoder.codec
+
+        # Payloads are written lazily, while other batches pick their own codec
+        lzma_payload = sender._iter_payload(lzma_batch, None)
+        zlib_payload = sender._iter_payload(zlib_batch, None)
+        for payload, codec in [
+            (lzma_payload, LzmaCodec()),
+            (zlib_payload, ZlibCodec()),
+        ]:
+            (coverage_file,) = json.loads(b"".join(payload))["coverage_files"]
+            assert coverage_file["format"] == codec.format
+            assert (
+                codec.decompress(base64.b64decode(coverage_file["data"]))
+                == mocked_coverage_file.get_content()
+            )
+        assert sender.encoder.codec is shared_codec
+
+    def test_write_payload_spools_to_disk(self, mocked_coverage_file):
+        upload_data = get_fake_upload_collection_result(mocked_coverage_file)
+        sender = UploadSender(buffer_size=16)
+        expected = sender._generate_payload(upload_data, None)
+        payload, size = sender.encoder.write_payload(
+            sender._iter_payload(upload_data, None)
+        )
+        with payload:
+            assert payload._rolled
+            assert size == len(expected)
+            assert payload.read() == expected
@@ -3,7 +3,10 @@ from unittest.mock import MagicMock
 import click
 import pytest
 
-from codecov_cli.helpers.validators import validate_commit_sha
+from codecov_cli.helpers.validators import (
+    validate_commit_sha,
+    validate_network_rules,
+)
 
 
 @pytest.mark.parametrize(
@@ -28,3 +31,10 @@ def test_commit_validator(input, should_raise):
             validate_commit_sha(MagicMock(), "commit_sha", input)
     else:
         assert validate_commit_sha(MagicMock(), "commit_sha", input) == input
+
+
+def test_network_rules_validator():
+    rules = ("services/api/=api/", "=prefix/", "services/web/=")
+    assert validate_network_rules(MagicMock(), "network_rules", rules) == rules
+    with pytest.raises(click.BadParameter):
+        validate_network_rules(MagicMock(), "network_rules", ("services/api/",))
@@ -1,9 +1,12 @@
+import subprocess
 from unittest.mock import MagicMock
 
 import pytest
 
 from codecov_cli.fallbacks import FallbackFieldEnum
+from codecov_cli.helpers import versioning_systems
 from codecov_cli.helpers.versioning_systems import (
+    GitIndexVersioningSystem,
     GitVersioningSystem,
     NoVersioningSystem,
 )
@@ -108,7 +111,7 @@ class TestGitVersioningSystem(object):
             "codecov_cli.helpers.versioning_systems.subprocess.run",
             return_value=mocked_subprocess,
         )
-        mocked_subprocess.stdout = b"a.txt\0b.txt\0a\\nb.txt\0c.txt\0d.txt\0.circleci/config.yml\0LICENSE\0app/advanced calculations/advanced_calculator.js"
+        mocked_subprocess.stdout = b"a.txt\0b.txt\0a\\nb.txt\0c.txt\0d.txt\0.circleci/config.yml\0LICENSE\0app/advanced calculations/advanced_calculator.js\0"
 
         vs = GitVersioningSystem()
 
@@ -135,19 +138,153 @@ class TestGitVersioningSystem(object):
 
     def test_list_relevant_files_recurse_submodules(self, mocker, tmp_path):
         subproc_run = mocker.patch(
-            "codecov_cli.helpers.versioning_systems.subprocess.run"
+            "codecov_cli.helpers.versioning_systems.subprocess.run",
+            return_value=MagicMock(stdout=b""),
         )
         vs = GitVersioningSystem()
-        _ = vs.list_relevant_files(tmp_path, recurse_submodules=True)
+        assert vs.list_relevant_files(tmp_path, recurse_submodules=True) == []
         subproc_run.assert_called_with(
             ["git", "-C", str(tmp_path), "ls-files", "-z", "--recurse-submodules"],
             capture_output=True,
         )
 
+    def test_list_untracked_files(self, tmp_path):
+        subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+        for f in [
+            ".gitignore",
+            "tracked/coverage.xml",
+            "src/coverage.xml",
+            "node_modules/pkg/coverage.xml",
+            "*.egg-info/coverage.xml",
+            "a.egg-info/coverage.xml",
+        ]:
+            (tmp_path / f).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / f).touch()
+        (tmp_path / ".gitignore").write_text("*.xml\n")
+        subprocess.run(
+            ["git", "-C", str(tmp_path), "add", "-f", ".gitignore", "tracked"],
+            check=True,
+        )
+
+        vs = GitVersioningSystem()
+        assert sorted(
+            vs.list_untracked_files(tmp_path, ["node_modules", "*.egg-info"])
+        ) == ["a.egg-info/coverage.xml", "src/coverage.xml"]
+        assert vs.list_untracked_files(tmp_path / "src") == ["coverage.xml"]
+
+    def test_list_untracked_files_outside_of_a_repository(self, mocker, tmp_path):
+        mocker.patch(
+            "codecov_cli.helpers.versioning_systems.subprocess.run",
+            return_value=MagicMock(returncode=128, stdout=b""),
+        )
+        assert GitVersioningSystem().list_untracked_files(tmp_path) is None
+
+    def test_list_untracked_files_without_git(self, mocker, tmp_path):
+        mocker.patch(
+            "codecov_cli.helpers.versioning_systems.subprocess.run",
+            side_effect=FileNotFoundError("git"),
+        )
+        assert GitVersioningSystem().list_untracked_files(tmp_path) is None
+
+
+class TestGitIndexVersioningSystem(object):
+    def make_repository(self, path, *files):
+        subprocess.run(["git", "init", "-q", str(path)], check=True)
+        for f in files:
+            (path / f).parent.mkdir(parents=True, exist_ok=True)
+            (path / f).touch()
+        subprocess.run(["git", "-C", str(path), "add", *files], check=True)
+
+    def test_list_relevant_files(self, mocker, tmp_path):
+        self.make_repository(tmp_path, "a.txt", "src/b.py", "src/c/Контроллер.php")
+        (tmp_path / "untracked.txt").touch()
+        mocked_run = mocker.patch.object(versioning_systems.subprocess, "run")
+
+        vs = GitIndexVersioningSystem(tmp_path / "src")
+        assert vs.get_network_root() == tmp_path.resolve()
+        assert vs.list_relevant_files() == [
+            "a.txt",
+            "src/b.py",
+            "src/c/Контроллер.php",
+        ]
+        assert vs.list_relevant_files(tmp_path / "src") == [
+            "b.py",
+            "c/Контроллер.php",
+        ]
+        assert vs.list_relevant_files(tmp_path / "src/c") == ["Контроллер.php"]
+        mocked_run.assert_not_called()
+
+    def test_list_relevant_files_falls_back_to_git(self, mocker, tmp_path):
+        self.make_repository(tmp_path, "a.txt", "src/b.py")
+        subprocess.run(["git", "-C", str(tmp_path), "update-index", "--split-index"])
+        mocked_logger = mocker.patch.object(versioning_systems, "logger")
+
+        vs = GitIndexVersioningSystem(tmp_path)
+        assert vs.list_relevant_files() == ["a.txt", "src/b.py"]
+        assert vs.list_relevant_files(tmp_path / "src") == ["b.py"]
+        mocked_logger.debug.assert_called_with(
+            "Can't read the git index, listing files with git: Unsupported index extension 'link'"
+        )
+
+    def test_list_relevant_files_without_git(self, mocker, tmp_path):
+        self.make_repository(tmp_path, "a.txt", "src/b.py")
+        subprocess.run(["git", "-C", str(tmp_path), "update-index", "--split-index"])
+        mocker.patch.object(versioning_systems, "which", return_value=None)
+
+        mocked_run = mocker.patch.object(versioning_systems.subprocess, "run")
+
+        vs = GitIndexVersioningSystem(tmp_path)
+        assert not isinstance(vs, GitVersioningSystem)
+        assert sorted(vs.list_relevant_files(tmp_path / "src")) == ["b.py"]
+        assert vs.get_fallback_value(FallbackFieldEnum.branch) is None
+        assert vs.list_untracked_files(tmp_path) is None
+        mocked_run.assert_not_called()
+
+    def test_worktree(self, tmp_path):
+        self.make_repository(tmp_path / "main", "a.txt")
+        subprocess.run(
+            ["git", "-C", str(tmp_path / "main"), "-c", "user.name=a"]
+            + ["-c", "user.email=a@b", "commit", "-q", "-m", "a"],
+            check=True,
+        )
+        subprocess.run(
+            ["git", "-C", str(tmp_path / "main"), "worktree", "add", "-q"]
+            + [str(tmp_path / "other")],
+            check=True,
+        )
+        (tmp_path / "other" / "b.txt").touch()
+        subprocess.run(["git", "-C", str(tmp_path / "other"), "add", "b.txt"])
+
+        vs = GitIndexVersioningSystem(tmp_path / "other")
+        assert vs.get_network_root() == (tmp_path / "other").resolve()
+        assert vs.list_relevant_files() == ["a.txt", "b.txt"]
+
+    def test_is_available(self, mocker, tmp_path):
+        mocker.patch.dict(versioning_systems.os.environ)
+        versioning_systems.os.environ.pop("GIT_DIR", None)
+        mocker.patch.object(versioning_systems.Path, "cwd", return_value=tmp_path)
+        assert not GitIndexVersioningSystem.is_available()
+
+        self.make_repository(tmp_path)
+        assert GitIndexVersioningSystem.is_available()
+
+        versioning_systems.os.environ["GIT_DIR"] = str(tmp_path / ".git")
+        assert not GitIndexVersioningSystem.is_available()
+
+    def test_used_without_git(self, mocker, tmp_path):
+        self.make_repository(tmp_path, "a.txt")
+        mocker.patch.object(versioning_systems, "which", return_value=None)
+        mocker.patch.object(versioning_systems.Path, "cwd", return_value=tmp_path)
+
+        vs = versioning_systems.get_versioning_system()
+        assert isinstance(vs, GitIndexVersioningSystem)
+        assert vs.list_relevant_files() == ["a.txt"]
+
 
 def test_exotic_git_filenames():
     vs = GitVersioningSystem()
     found_repo_files = vs.list_relevant_files()
+    assert "" not in found_repo_files
 
     # See <https://github.com/codecov/codecov-action/issues/1550>
     assert (
@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from codecov_cli.services.upload.binary_payload import (
+    MAGIC,
+    BinaryPayloadError,
+    decode_binary_payload,
+    write_binary_payload,
+)
+from codecov_cli.services.upload.compression import LzmaCodec, ZlibCodec
+from codecov_cli.services.upload.payload_encoder import PayloadEncoder
+from codecov_cli.services.upload.upload_sender import UploadSender
+from codecov_cli.types import (
+    UploadCollectionResult,
+    UploadCollectionResultFile,
+    UploadCollectionResultFileFixer,
+)
+
+
+@pytest.fixture
+def report_files(tmp_path):
+    files = []
+    for i in range(4):
+        path = tmp_path / f"coverage_{i}.info"
+        path.write_bytes(
+            b"".join(f"DA:{line},{i}\n".encode() for line in range(100 * (i + 1)))
+        )
+        files.append(UploadCollectionResultFile(path))
+    return files
+
+
+def _read(payload_and_size):
+    payload, size = payload_and_size
+    with payload:
+        content = payload.read()
+    assert len(content) == size
+    return content
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("codec", [ZlibCodec(), LzmaCodec(1)])
+def test_binary_payload_round_trip(report_files, workers, codec):
+    encoder = PayloadEncoder(workers=workers, codec=codec)
+    header = {"network_files": ["a.py", "b/c.py"], "metadata": {}}
+    content = _read(
+        write_binary_payload(encoder, header, "coverage_files", report_files)
+    )
+
+    assert content.startswith(MAGIC)
+    decoded = decode_binary_payload(content)
+    assert decoded["network_files"] == ["a.py", "b/c.py"]
+    assert decoded["metadata"] == {}
+    assert decoded["coverage_files"] == [
+        {"filename": f.get_filename(), "labels": "", "data": f.get_content()}
+        for f in report_files
+    ]
+
+
+def test_binary_payload_deduplicates_files(report_files, tmp_path):
+    duplicate = tmp_path / "copy.info"
+    duplicate.write_bytes(report_files[1].get_content())
+    files = report_files + [UploadCollectionResultFile(duplicate)]
+
+    encoder = PayloadEncoder(workers=2, deduplicate=True)
+    decoded = decode_binary_payload(
+        _read(write_binary_payload(encoder, {}, "coverage_files", files))
+    )
+    assert [f["filename"] for f in decoded["coverage_files"]] == [
+        f.get_filename() for f in report_files
+    ]
+    assert decoded["file_aliases"] == {
+        files[-1].get_filename(): report_files[1].get_filename()
+    }
+
+
+def test_binary_payload_is_smaller_than_json(report_files):
+    sender = UploadSender(payload_format="binary")
+    upload_data = UploadCollectionResult([], report_files, [])
+    binary = _read(sender._write_payload(upload_data, None))
+    assert len(binary) < len(UploadSender()._generate_payload(upload_data, None))
+
+
+def test_decode_binary_payload_without_decompressing(report_files):
+    encoder = PayloadEncoder(workers=1)
+    content = _read(
+        write_binary_payload(encoder, {}, "test_results_files", report_files)
+    )
+
+    decoded = decode_binary_payload(content, decompress=False)
+    for entry, file in zip(decoded["test_results_files"], report_files):
+        assert entry["codec"] == "zlib"
+        assert isinstance(entry["data"], memoryview)
+        assert entry["data"].obj is content
+        assert ZlibCodec().decompress(entry["data"]) == file.get_content()
+
+
+def test_decode_binary_payload_invalid(report_files):
+    with pytest.raises(BinaryPayloadError, match="Not a binary upload payload"):
+        decode_binary_payload(json.dumps({"coverage_files": []}).encode())
+
+    content = _read(
+        write_binary_payload(PayloadEncoder(), {}, "coverage_files", report_files)
+    )
+    with pytest.raises(BinaryPayloadError, match="Truncated"):
+        decode_binary_payload(content[:-1])
+    with pytest.raises(BinaryPayloadError, match="Truncated"):
+        decode_binary_payload(content[: len(MAGIC) + 8])
+
+
+def test_upload_sender_binary_coverage_payload(report_files):
+    fixes = [
+        UploadCollectionResultFileFixer(
+            path=Path("main.go"),
+            fixed_lines_without_reason={1, 2},
+            fixed_lines_with_reason={(3, "*/\n")},
+            eof=4,
+        )
+    ]
+    upload_data = UploadCollectionResult(["main.go"], report_files, fixes)
+    sender = UploadSender(payload_format="binary", compression_codec="deflate")
+
+    decoded = decode_binary_payload(_read(sender._write_payload(upload_data, None)))
+    assert decoded["report_fixes"] == {
+        "format": "legacy",
+        "value": {"main.go": {"eof": 4, "lines": [1, 2, 3]}},
+    }
+    assert decoded["network_files"] == ["main.go"]
+    assert [f["data"] for f in decoded["coverage_files"]] == [
+        f.get_content() for f in report_files
+    ]
@@ -0,0 +1,242 @@
+import io
+import os
+import re
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from codecov_cli.services.upload import chunked_upload
+from codecov_cli.services.upload.chunked_upload import ResumableUploader
+from codecov_cli.services.upload.upload_sender import UploadSender
+from codecov_cli.types import UploadCollectionResult, UploadCollectionResultFile
+
+CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+)")
+
+
+class FakeStorage(object):
+    """
+    Stand-in for a bucket behind a signed URL, with the semantics of Google Cloud
+    Storage resumable uploads. `failures` maps part offsets to how many times the
+    part is answered with a 503, `partial` to how many of its bytes are kept when
+    it fails. With `resumable` False it's a plain presigned PUT URL instead, which
+    refuses to start a session and replaces the whole object on every PUT.
+    """
+
+    def __init__(self):
+        self.resumable = True
+        self.data = bytearray()
+        self.total = None
+        self.attempts = Counter()
+        self.status_queries = 0
+        self.failures = Counter()
+        self.partial = Counter()
+        self.lock = threading.Lock()
+
+    def handle_post(self, handler: BaseHTTPRequestHandler):
+        if not self.resumable or handler.headers["x-goog-resumable"] != "start":
+            return 403, {}
+        return 201, {"Location": self.url.replace("/bucket/", "/session/")}
+
+    def handle_put(self, handler: BaseHTTPRequestHandler):
+        body = handler.rfile.read(int(handler.headers["Content-Length"]))
+        if not self.resumable:
+            self.data = bytearray(body)
+            return 200, {}
+        first, last, total = CONTENT_RANGE.fullmatch(
+            handler.headers["Content-Range"]
+        ).groups()
+        with self.lock:
+            self.total = int(total)
+            if first is None:
+                self.status_queries += 1
+            else:
+                first = int(first)
+                if first != len(self.data) or int(last) - first + 1 != len(body):
+                    return 400, {}
+                self.attempts[first] += 1
+                if self.failures[first]:
+                    self.failures[first] -= 1
+                    self.data += body[: self.partial[first]]
+                    return 503, {}
+                self.data += body
+            if len(self.data) == self.total:
+                return 200, {}
+            if not self.data:
+                return 308, {}
+            return 308, {"Range": f"bytes=0-{len(self.data) - 1}"}
+
+
+@pytest.fixture
+def storage():
+    fake = FakeStorage()
+
+    class Handler(BaseHTTPRequestHandler):
+        def respond(self, status, headers):
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self):
+            self.respond(*fake.handle_post(self))
+
+        def do_PUT(self):
+            self.respond(*fake.handle_put(self))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    fake.url = f"http://127.0.0.1:{server.server_port}/bucket/upload?signature=abc"
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(mocker):
+    return mocker.patch.object(chunked_upload, "sleep")
+
+
+@pytest.fixture
+def small_parts(mocker):
+    mocker.patch.object(chunked_upload, "PART_SIZE_ALIGNMENT", 1000)
+
+
+def test_part_size_is_aligned():
+    alignment = chunked_upload.PART_SIZE_ALIGNMENT
+    assert ResumableUploader(3 * alignment + 5).part_size == 3 * alignment
+    assert ResumableUploader(alignment).part_size == alignment
+    assert ResumableUploader(10).part_size == alignment
+
+
+def test_resumable_upload(storage, small_parts):
+    content = bytes(range(256)) * 400
+    result = ResumableUploader(part_size=1000).upload(
+        storage.url, io.BytesIO(content), len(content)
+    )
+
+    assert result.status_code == 200
+    assert result.error is None
+    assert bytes(storage.data) == content
+    assert storage.attempts == {offset: 1 for offset in range(0, len(content), 1000)}
+
+
+def test_resumable_upload_resumes_from_what_storage_has(
+    storage, small_parts, no_backoff
+):
+    content = b"abcdefghij" * 1000
+    storage.failures.update({2000: 1, 5500: 2})
+    storage.partial.update({2000: 500})
+
+    result = ResumableUploader(part_size=1000).upload(
+        storage.url, io.BytesIO(content), len(content)
+    )
+
+    assert result.error is None
+    assert bytes(storage.data) == content
+    # The part at 2000 failed after 500 of its bytes were kept, the rest follows
+    assert storage.attempts == {
+        0: 1,
+        1000: 1,
+        2000: 1,
+        2500: 1,
+        3500: 1,
+        4500: 1,
+        5500: 3,
+        6500: 1,
+        7500: 1,
+        8500: 1,
+        9500: 1,
+    }
+    assert storage.status_queries == 3
+    assert no_backoff.call_count == 3
+
+
+def test_resumable_upload_gives_up(storage, small_parts):
+    content = b"x" * 3000
+    storage.failures.update({1000: 10})
+
+    result = ResumableUploader(part_size=1000).upload(
+        storage.url, io.BytesIO(content), len(content)
+    )
+
+    assert result.status_code == 503
+    assert result.error.code == "Upload incomplete"
+    assert "Storage has 1000 of 3000 bytes" in result.error.description
+    assert storage.attempts == {0: 1, 1000: 3}
+
+
+def test_resumable_upload_to_storage_without_sessions(storage, small_parts, mocker):
+    storage.resumable = False
+    content = b"x" * 3000
+    mocked_logger = mocker.patch.object(chunked_upload, "logger")
+
+    result = ResumableUploader(part_size=1000).upload(
+        storage.url, io.BytesIO(content), len(content)
+    )
+
+    assert result is None
+    assert storage.data == b""
+    mocked_logger.warning.assert_called_once_with(
+        "Storage didn't start a resumable upload. Sending the payload in a single request",
+        extra=dict(extra_log_attributes=dict(status_code=403)),
+    )
+
+
+def test_resumable_upload_ended_early(storage, small_parts, mocker):
+    content = b"x" * 3000
+    session = mocker.MagicMock(status_code=201, headers={"Location": storage.url})
+    mocker.patch.object(chunked_upload, "post", return_value=session)
+    # Like a plain signed URL, which replaces the object with every part
+    storage.resumable = False
+
+    result = ResumableUploader(part_size=1000).upload(
+        storage.url, io.BytesIO(content), len(content)
+    )
+
+    assert result.error.code == "Upload incomplete"
+    assert "after 1000 of 3000 bytes" in result.error.description
+
+
+@pytest.mark.parametrize("resumable", [True, False])
+def test_upload_sender_resumable_storage_request(storage, mocker, tmp_path, resumable):
+    storage.resumable = resumable
+    mocker.patch.object(chunked_upload, "PART_SIZE_ALIGNMENT", 1024)
+    coverage = tmp_path / "coverage.xml"
+    coverage.write_bytes(os.urandom(64 * 1024))
+    upload_data = UploadCollectionResult([], [UploadCollectionResultFile(coverage)], [])
+    mocker.patch(
+        "codecov_cli.services.upload.upload_sender.send_post_request",
+        return_value=mocker.MagicMock(
+            status_code=200, text=f'{{"raw_upload_location": "{storage.url}"}}'
+        ),
+    )
+
+    sender = UploadSender(upload_part_size=4096)
+    result = sender.send_upload_data(
+        upload_data,
+        "sha",
+        "token",
+        {},
+        "report_code",
+        slug="org/repo",
+        git_service="github",
+    )
+
+    assert result.error is None
+    expected = sender._generate_payload(upload_data, {})
+    assert len(expected) > 4096
+    assert bytes(storage.data) == expected
+    if resumable:
+        assert len(storage.attempts) == -(-len(expected) // 4096)
+    else:
+        # Like a presigned PUT URL, the payload is sent in a single request
+        assert not storage.attempts
@@ -0,0 +1,114 @@
+import pytest
+
+from codecov_cli.services.upload.compression import (
+    CodecBenchmark,
+    DeflateCodec,
+    LzmaCodec,
+    ZlibCodec,
+    benchmark_codecs,
+    codecs,
+    get_codec,
+    select_codec,
+)
+from codecov_cli.types import UploadCollectionResultFile
+
+
+@pytest.fixture
+def report_files(tmp_path):
+    files = []
+    for i in range(3):
+        path = tmp_path / f"coverage_{i}.info"
+        path.write_bytes(
+            b"".join(f"DA:{line},{line % 3}\n".encode() for line in range(2000))
+        )
+        files.append(UploadCollectionResultFile(path))
+    return files
+
+
+@pytest.mark.parametrize("name", ["zlib", "deflate", "lzma"])
+@pytest.mark.parametrize("level", [None, 0, 1, 9])
+def test_codec_round_trip(name, level):
+    content = b"SF:src/file.c\nDA:1,1\nDA:2,0\nend_of_record\n" * 100
+    codec = get_codec(name, level)
+    compressor = codec.compressobj()
+    compressed = compressor.compress(content) + compressor.flush()
+    assert codec.decompress(compressed) == content
+
+
+def test_codec_format_tags():
+    assert ZlibCodec().format == "base64+compressed"
+    assert DeflateCodec().format == "base64+deflate"
+    assert LzmaCodec().format == "base64+lzma"
+    assert set(codecs) == {"zlib", "deflate", "lzma"}
+
+
+def test_codec_level_is_applied():
+    content = b"".join(f"DA:{line},1\n".encode() for line in range(5000))
+
+    def compressed_size(level):
+        compressor = ZlibCodec(level).compressobj()
+        return len(compressor.compress(content) + compressor.flush())
+
+    assert compressed_size(0) > compressed_size(1) >= compressed_size(9)
+
+
+def test_get_codec_invalid():
+    with pytest.raises(ValueError, match="Unknown compression codec"):
+        get_codec("brotli")
+    with pytest.raises(ValueError, match="must be between 0 and 9"):
+        get_codec("zlib", 10)
+
+
+def test_benchmark_codecs(report_files):
+    results = benchmark_codecs(report_files, [ZlibCodec(), LzmaCodec()], 3000)
+    assert [type(result.codec) for result in results] == [ZlibCodec, LzmaCodec]
+    for result in results:
+        assert result.input_bytes == 3000
+        assert 0 < result.output_bytes < result.input_bytes
+        assert result.ratio > 1
+
+
+def test_codec_benchmark_cost():
+    fast = CodecBenchmark(ZlibCodec(), 1000, 500, 0.001)
+    small = CodecBenchmark(LzmaCodec(), 1000, 100, 0.01)
+    # on a slow link the smaller payload wins, on a fast one the faster codec
+    assert small.cost(bandwidth=1000) < fast.cost(bandwidth=1000)
+    assert fast.cost(bandwidth=10**9) < small.cost(bandwidth=10**9)
+
+
+def test_select_codec(mocker, report_files):
+    mocked_benchmark = mocker.patch(
+        "codecov_cli.services.upload.compression.benchmark_codecs",
+        return_value=[
+            CodecBenchmark(ZlibCodec(1), 1000, 500, 0.001),
+            CodecBenchmark(ZlibCodec(6), 1000, 300, 0.002),
+            CodecBenchmark(ZlibCodec(9), 1000, 290, 0.05),
+        ],
+    )
+    codec = select_codec(report_files, bandwidth=1000)
+    assert isinstance(codec, ZlibCodec)
+    assert codec.level == 6
+    ((files, candidates), _) = mocked_benchmark.call_args
+    assert [type(candidate) for candidate in candidates] == [ZlibCodec] * 3
+
+
+def test_select_codec_only_picks_zlib(report_files):
+    # lzma would be far smaller on these, but isn't something Codecov decodes
+    for bandwidth in [1, 10**12]:
+        assert type(select_codec(report_files, bandwidth=bandwidth)) is ZlibCodec
+
+
+def test_select_codec_with_level(mocker, report_files):
+    mocked_benchmark = mocker.patch(
+        "codecov_cli.services.upload.compression.benchmark_codecs"
+    )
+    codec = select_codec(report_files, level=3)
+    assert isinstance(codec, ZlibCodec)
+    assert codec.level == 3
+    mocked_benchmark.assert_not_called()
+
+
+def test_select_codec_no_content(tmp_path):
+    path = tmp_path / "empty.info"
+    path.write_bytes(b"")
+    assert isinstance(select_codec([UploadCollectionResultFile(path)]), ZlibCodec)
@@ -1,9 +1,16 @@
+import subprocess
 import tempfile
 from pathlib import Path
 
 import pytest
 
 from codecov_cli.helpers.upload_type import ReportType
+from codecov_cli.helpers import versioning_systems
+from codecov_cli.helpers.versioning_systems import (
+    GitIndexVersioningSystem,
+    GitVersioningSystem,
+)
+from codecov_cli.services.upload import file_finder
 from codecov_cli.services.upload.file_finder import FileFinder
 from codecov_cli.types import UploadCollectionResultFile
 
@@ -97,6 +104,99 @@ class TestCoverageFileFinder(object):
         actual = set(FileFinder(tmp_path).find_files())
         assert actual - expected == {UploadCollectionResultFile(extra)}
 
+    def test_find_coverage_files_listed_sizes(self, tmp_path):
+        (tmp_path / "coverage.xml").write_bytes(b"x" * 10)
+        (tmp_path / "given.txt").write_bytes(b"x" * 20)
+
+        finder = FileFinder(tmp_path, explicitly_listed_files=[tmp_path / "given.txt"])
+        sizes = {
+            Path(file.get_filename()).name: file.listed_size
+            for file in finder.find_files()
+        }
+        # Files given with -f aren't walked for
+        assert sizes == {"coverage.xml": 10, "given.txt": None}
+
+    def test_find_coverage_files_git_discovery(self, tmp_path, mocker):
+        subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+        for f in [
+            "coverage.xml",
+            "sub/coverage.xml",
+            "tracked/coverage.xml",
+            "node_modules/coverage.xml",
+            "excluded/coverage.xml",
+            "sub/other.txt",
+        ]:
+            (tmp_path / f).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / f).touch()
+        subprocess.run(["git", "-C", str(tmp_path), "add", "tracked"], check=True)
+        search_files = mocker.patch(
+            "codecov_cli.services.upload.file_finder.search_files"
+        )
+
+        finder = FileFinder(
+            tmp_path,
+            [Path("excluded")],
+            discovery_mode="git",
+            versioning_system=GitVersioningSystem(),
+        )
+        assert sorted(file.get_filename() for file in finder.find_files()) == [
+            f"{tmp_path}/coverage.xml",
+            f"{tmp_path}/sub/coverage.xml",
+        ]
+        search_files.assert_not_called()
+
+    def test_find_coverage_files_git_discovery_falls_back_to_walking(
+        self, tmp_path, mocker
+    ):
+        (tmp_path / "coverage.xml").touch()
+        versioning_system = mocker.MagicMock(spec=GitVersioningSystem)
+        versioning_system.list_untracked_files.return_value = None
+
+        finder = FileFinder(
+            tmp_path, discovery_mode="git", versioning_system=versioning_system
+        )
+        assert [file.get_filename() for file in finder.find_files()] == [
+            f"{tmp_path}/coverage.xml"
+        ]
+        versioning_system.list_untracked_files.assert_called_once()
+
+    def test_find_coverage_files_git_discovery_without_git(self, tmp_path, mocker):
+        subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+        for f in ["coverage.xml", "tracked/coverage.xml"]:
+            (tmp_path / f).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / f).touch()
+        subprocess.run(["git", "-C", str(tmp_path), "add", "tracked"], check=True)
+        mocker.patch.object(versioning_systems, "which", return_value=None)
+        mocked_logger = mocker.patch.object(file_finder, "logger")
+
+        finder = FileFinder(
+            tmp_path,
+            discovery_mode="git",
+            versioning_system=GitIndexVersioningSystem(tmp_path),
+        )
+        assert sorted(file.get_filename() for file in finder.find_files()) == [
+            f"{tmp_path}/coverage.xml",
+            f"{tmp_path}/tracked/coverage.xml",
+        ]
+        mocked_logger.warning.assert_called_with(
+            f'Could not list the files git doesn\'t track in "{tmp_path}". Searching the whole folder instead'
+        )
+
+    def test_find_coverage_files_sniff_report_formats(self, tmp_path):
+        (tmp_path / "coverage.xml").write_text('<coverage line-rate="1">')
+        (tmp_path / "coverage-summary.txt").write_text("Total: 100%")
+        (tmp_path / "notes-coverage.txt").write_text("Not a report either")
+
+        finder = FileFinder(
+            tmp_path,
+            explicitly_listed_files=[tmp_path / "notes-coverage.txt"],
+            sniff_report_formats=True,
+        )
+        assert sorted(file.get_filename() for file in finder.find_files()) == [
+            f"{tmp_path}/coverage.xml",
+            f"{tmp_path}/notes-coverage.txt",
+        ]
+
     def test_find_coverage_files_test_results(self, tmp_path):
         (tmp_path / "sub").mkdir()
         (tmp_path / "sub" / "subsub").mkdir()
@@ -492,3 +592,81 @@ class TestCoverageFileFinderUserInput:
             "Some files being explicitly added are found in the list of excluded files for upload. We are still going to search for the explicitly added files."
             in capsys.readouterr().err
         )
+
+    def test_find_coverage_files_with_user_specified_files_without_search(
+        self, tmp_path, mocker, monkeypatch
+    ):
+        monkeypatch.chdir(tmp_path)
+        project_root = tmp_path / "project"
+        (project_root / "reports").mkdir(parents=True)
+        (project_root / "excluded").mkdir()
+        for i in range(50):
+            (project_root / "reports" / f"report-{i}.abc").touch()
+        (project_root / "excluded" / "report.abc").touch()
+        (tmp_path / "outside.abc").touch()
+        search_files = mocker.spy(file_finder, "search_files")
+        mocked_logger = mocker.patch.object(file_finder, "logger")
+
+        finder = FileFinder(
+            project_root,
+            [Path("excluded")],
+            [
+                *(Path("project/reports") / f"report-{i}.abc" for i in range(50)),
+                Path("project/excluded/report.abc"),
+                Path("outside.abc"),
+                Path("project/reports/missing.abc"),
+            ],
+            disable_search=True,
+        )
+        result = sorted(file.get_filename() for file in finder.find_files())
+
+        assert result == sorted(
+            [
+                *(f"{project_root}/reports/report-{i}.abc" for i in range(50)),
+                "outside.abc",
+                "project/excluded/report.abc",
+            ]
+        )
+        search_files.assert_not_called()
+        mocked_logger.warning.assert_called_once_with(
+            "Some files were not found",
+            extra=dict(
+                extra_log_attributes=dict(
+                    not_found_files=[Path("project/reports/missing.abc")]
+                )
+            ),
+        )
+
+    def test_find_coverage_files_with_user_specified_globs(
+        self, tmp_path, mocker, monkeypatch
+    ):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "reports").mkdir()
+        for name in ["a.abc", "b.abc", "c.txt", "direct.txt"]:
+            (tmp_path / "reports" / name).touch()
+        search_files = mocker.spy(file_finder, "search_files")
+        mocked_logger = mocker.patch.object(file_finder, "logger")
+
+        finder = FileFinder(
+            tmp_path,
+            explicitly_listed_files=[
+                Path("reports/*.abc"),
+                Path("reports/direct.txt"),
+                Path("reports/*.nothing"),
+            ],
+            disable_search=True,
+        )
+        result = sorted(file.get_filename() for file in finder.find_files())
+
+        assert result == [
+            f"{tmp_path}/reports/a.abc",
+            f"{tmp_path}/reports/b.abc",
+            f"{tmp_path}/reports/direct.txt",
+        ]
+        search_files.assert_called_once()
+        mocked_logger.warning.assert_called_once_with(
+            "Some files were not found",
+            extra=dict(
+                extra_log_attributes=dict(not_found_files=[Path("reports/*.nothing")])
+            ),
+        )
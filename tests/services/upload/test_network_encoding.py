@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from codecov_cli.services.upload.binary_payload import decode_binary_payload
+from codecov_cli.services.upload.network_encoding import (
+    decode_network,
+    encode_network,
+    front_code,
+    shared_prefix_length,
+)
+from codecov_cli.services.upload.upload_sender import UploadSender
+from codecov_cli.types import UploadCollectionResult
+
+NETWORK = [
+    "src/app/b.py",
+    "src/app/a.py",
+    "src/lib/c.py",
+    "README.md",
+    "src/app/a.pyi",
+    "docs/Контроллеры/Пользователь.php",
+    "docs/Контроллеры/Главный.php",
+]
+
+
+@pytest.mark.parametrize(
+    "first,second,expected",
+    [
+        ("", "abc", 0),
+        ("abc", "abc", 3),
+        ("abc", "abd", 2),
+        ("abc", "abcdef", 3),
+        ("src/app/a.py", "src/lib/c.py", 4),
+        ("Контроллеры/a", "Контроллеры/b", 12),
+    ],
+)
+def test_shared_prefix_length(first, second, expected):
+    assert shared_prefix_length(first, second) == expected
+    assert shared_prefix_length(second, first) == expected
+
+
+def test_front_code():
+    assert list(front_code(["src/lib/c.py", "src/app/b.py", "src/app/a.py"])) == [
+        (0, "src/app/a.py"),
+        (8, "b.py"),
+        (4, "lib/c.py"),
+    ]
+    assert list(front_code([])) == []
+
+
+def test_encode_network_round_trip():
+    encoded = encode_network(NETWORK, "front-coded")
+    assert encoded["format"] == "front-coded"
+    assert decode_network(json.loads(json.dumps(encoded))) == sorted(NETWORK)
+    assert encode_network(NETWORK) == NETWORK
+    assert decode_network(NETWORK) == NETWORK
+    with pytest.raises(ValueError):
+        decode_network({"format": "unknown", "value": []})
+
+
+def test_front_coded_network_in_json_payload(mocker):
+    mocker.patch("codecov_cli.services.upload.payload_encoder.NETWORK_BATCH_SIZE", 2)
+    network = [f"src/module{i // 10}/file{i}.py" for i in range(100)]
+    upload_data = UploadCollectionResult(network, [], [])
+    sender = UploadSender(network_format="front-coded")
+
+    payload = sender._generate_payload(upload_data, None)
+    section = json.loads(payload)["network_files"]
+    assert section == encode_network(network, "front-coded")
+    assert decode_network(section) == sorted(network)
+
+    list_payload = UploadSender()._generate_payload(upload_data, None)
+    assert len(payload) < len(list_payload) * 0.6
+
+
+def test_front_coded_network_in_binary_payload():
+    upload_data = UploadCollectionResult(NETWORK, [], [])
+    sender = UploadSender(payload_format="binary", network_format="front-coded")
+
+    payload, _ = sender._write_payload(upload_data, None)
+    with payload:
+        decoded = decode_binary_payload(payload.read())
+    assert decode_network(decoded["network_files"]) == sorted(NETWORK)
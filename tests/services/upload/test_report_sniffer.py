@@ -0,0 +1,79 @@
+import pytest
+
+from codecov_cli.services.upload import report_sniffer
+from codecov_cli.services.upload.report_sniffer import (
+    ReportFormat,
+    filter_known_report_formats,
+    sniff_report_format,
+)
+from codecov_cli.types import UploadCollectionResultFile
+
+
+@pytest.mark.parametrize(
+    "content,expected",
+    [
+        (b"TN:\nSF:src/a.c\nDA:1,1\nend_of_record\n", ReportFormat.LCOV),
+        (b"SF:src/a.c\nDA:1,1\n", ReportFormat.LCOV),
+        (
+            b'<?xml version="1.0" ?>\n<!DOCTYPE coverage SYSTEM "http://cobertura.sourceforge.net/xml/coverage-04.dtd">\n<coverage line-rate="0.5" branch-rate="0" version="7.2">',
+            ReportFormat.COBERTURA,
+        ),
+        (
+            b'\xef\xbb\xbf<?xml version="1.0" encoding="UTF-8"?>\n<coverage generated="1580000000">\n  <project timestamp="1580000000">',
+            ReportFormat.CLOVER,
+        ),
+        (
+            b'<?xml version="1.0"?>\n<coverage clover="4.4.1" generated="1580000000">',
+            ReportFormat.CLOVER,
+        ),
+        (
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><!DOCTYPE report PUBLIC "-//JACOCO//DTD Report 1.1//EN" "report.dtd"><report name="app">',
+            ReportFormat.JACOCO,
+        ),
+        (b"mode: atomic\ngithub.com/a/b/c.go:3.2,4.3 1 1\n", ReportFormat.GO_COVER),
+        (
+            b"        -:    0:Source:src/a.c\n        -:    0:Runs:1\n",
+            ReportFormat.GCOV,
+        ),
+        (
+            b'{"meta": {"format": 3, "version": "7.2.7"}, "files": {}}',
+            ReportFormat.COVERAGE_PY_JSON,
+        ),
+        (b'{\n  "meta": {\n    "format": 3', ReportFormat.COVERAGE_PY_JSON),
+        (b"", None),
+        (b"some coverage notes\nTN:\n", None),
+        (b'{"coverage": {"a.py": {"1": 1}}}', None),
+        (b"\x89PNG\r\n\x1a\n\x00\x00", None),
+    ],
+)
+def test_sniff_report_format(tmp_path, content, expected):
+    report = tmp_path / "report"
+    report.write_bytes(content)
+
+    assert sniff_report_format(UploadCollectionResultFile(report)) == expected
+
+
+def test_sniff_report_format_reads_the_start_only(tmp_path):
+    report = tmp_path / "coverage.txt"
+    report.write_bytes(b"x" * report_sniffer.SNIFF_SIZE + b"\nTN:\n")
+
+    assert sniff_report_format(UploadCollectionResultFile(report)) is None
+    assert sniff_report_format(UploadCollectionResultFile(tmp_path / "gone")) is None
+
+
+def test_filter_known_report_formats(tmp_path, mocker):
+    mocked_logger = mocker.patch.object(report_sniffer, "logger")
+    files = []
+    for name, content in [
+        ("lcov.info", b"TN:\nSF:a.c\n"),
+        ("coverage-notes.txt", b"Nothing to see here"),
+        ("coverage.xml", b'<coverage line-rate="1">'),
+    ]:
+        (tmp_path / name).write_bytes(content)
+        files.append(UploadCollectionResultFile(tmp_path / name))
+
+    assert filter_known_report_formats(files, workers=2) == [files[0], files[2]]
+    mocked_logger.info.assert_called_once_with(
+        f"Skipping {tmp_path}/coverage-notes.txt, it is not in a known coverage report format"
+    )
+    assert filter_known_report_formats([]) == []
@@ -0,0 +1,156 @@
+import base64
+import os
+import zlib
+
+import pytest
+
+from codecov_cli.services.upload import upload_batches
+from codecov_cli.services.upload.upload_batches import (
+    send_upload_batches,
+    split_upload_data,
+)
+from codecov_cli.types import (
+    RequestError,
+    RequestResult,
+    UploadCollectionResult,
+    UploadCollectionResultFile,
+)
+
+
+def _upload_data(tmp_path, sizes):
+    files = []
+    for index, size in enumerate(sizes):
+        path = tmp_path / f"{index}.xml"
+        path.write_bytes(b"x" * size)
+        files.append(UploadCollectionResultFile(path))
+    return UploadCollectionResult(["a.py", "b/c.py"], files, ["fixes"])
+
+
+@pytest.fixture
+def uncompressed_estimate(mocker):
+    # Packing is easier to follow with files counted at their size on disk
+    mocker.patch.object(
+        upload_batches,
+        "_estimate_file_bytes",
+        side_effect=lambda file: file.get_size() + len(file.get_filename()) + 64,
+    )
+
+
+def test_estimate_file_bytes(tmp_path, mocker):
+    report = tmp_path / "coverage.info"
+    report.write_bytes(
+        b"".join(f"DA:{line % 500},{line % 7}\n".encode() for line in range(100_000))
+    )
+    noise = tmp_path / "noise.bin"
+    noise.write_bytes(os.urandom(200_000))
+    empty = tmp_path / "empty.info"
+    empty.touch()
+
+    def encoded_size(path):
+        encoded = base64.b64encode(zlib.compress(path.read_bytes()))
+        return len(encoded) + len(path.as_posix()) + 64
+
+    for path in [report, noise]:
+        estimate = upload_batches._estimate_file_bytes(UploadCollectionResultFile(path))
+        assert estimate == encoded_size(path)
+    assert (
+        upload_batches._estimate_file_bytes(UploadCollectionResultFile(empty))
+        == len(empty.as_posix()) + 64
+    )
+    # Text reports are counted at a fraction of their size
+    assert encoded_size(report) < report.stat().st_size / 10
+
+    # Bigger files are extrapolated from their beginning
+    mocker.patch.object(upload_batches, "ESTIMATE_SAMPLE_SIZE", 64 * 1024)
+    for path in [report, noise]:
+        estimate = upload_batches._estimate_file_bytes(UploadCollectionResultFile(path))
+        assert encoded_size(path) <= estimate <= 5 * encoded_size(path)
+
+
+def test_split_upload_data_compressible_reports(tmp_path):
+    upload_data = _upload_data(tmp_path, [3000, 1000, 6000, 2000, 4000])
+    assert split_upload_data(upload_data, 7000) == [upload_data]
+
+
+def test_split_upload_data_under_budget(tmp_path, uncompressed_estimate):
+    upload_data = _upload_data(tmp_path, [100, 200, 300])
+    assert split_upload_data(upload_data, 10_000) == [upload_data]
+
+
+def test_split_upload_data(tmp_path, uncompressed_estimate):
+    upload_data = _upload_data(tmp_path, [3000, 1000, 6000, 2000, 4000])
+    batches = split_upload_data(upload_data, 7000)
+
+    # Largest first, each file in the first upload with room for it
+    # (filenames and the network section count against the budget too),
+    # keeping the original file order within each upload
+    assert [[file.get_size() for file in batch.files] for batch in batches] == [
+        [6000],
+        [2000, 4000],
+        [3000, 1000],
+    ]
+    for batch in batches:
+        assert batch.network == upload_data.network
+        assert batch.file_fixes == upload_data.file_fixes
+    assert sorted(
+        file.get_filename() for batch in batches for file in batch.files
+    ) == sorted(file.get_filename() for file in upload_data.files)
+
+
+def test_split_upload_data_file_bigger_than_budget(
+    tmp_path, mocker, uncompressed_estimate
+):
+    upload_data = _upload_data(tmp_path, [500, 5000, 500])
+    mock_warning = mocker.patch(
+        "codecov_cli.services.upload.upload_batches.logger.warning"
+    )
+
+    batches = split_upload_data(upload_data, 1500)
+    assert [[file.get_size() for file in batch.files] for batch in batches] == [
+        [5000],
+        [500, 500],
+    ]
+    mock_warning.assert_called_once()
+
+
+def test_split_upload_data_network_bigger_than_budget(tmp_path, mocker):
+    upload_data = _upload_data(tmp_path, [500, 500, 500])
+    upload_data.network = [f"src/module{index}.py" for index in range(100)]
+    mock_warning = mocker.patch(
+        "codecov_cli.services.upload.upload_batches.logger.warning"
+    )
+
+    assert split_upload_data(upload_data, 1500) == [upload_data]
+    mock_warning.assert_called_once_with(
+        "The network section alone (about 1890 bytes) exceeds the payload budget of 1500 bytes, and every upload carries it. Sending all the reports in a single upload"
+    )
+
+
+def test_send_upload_batches(tmp_path, mocker):
+    upload_data = _upload_data(tmp_path, [100, 100, 100])
+    batches = [UploadCollectionResult([], [file], []) for file in upload_data.files]
+    ok = RequestResult(status_code=200, error=None, warnings=[], text="")
+    sender = mocker.MagicMock()
+    sender.send_upload_data.return_value = ok
+
+    assert send_upload_batches(sender, batches, commit_sha="sha") is ok
+    assert sender.send_upload_data.call_args_list == [
+        mocker.call(upload_data=batch, commit_sha="sha") for batch in batches
+    ]
+
+
+def test_send_upload_batches_stops_at_a_failure(tmp_path, mocker):
+    upload_data = _upload_data(tmp_path, [100, 100, 100])
+    batches = [UploadCollectionResult([], [file], []) for file in upload_data.files]
+    ok = RequestResult(status_code=200, error=None, warnings=[], text="")
+    failed = RequestResult(
+        status_code=400,
+        error=RequestError(code="HTTP Error 400", description="", params={}),
+        warnings=[],
+        text="",
+    )
+    sender = mocker.MagicMock()
+    sender.send_upload_data.side_effect = [ok, failed, ok]
+
+    assert send_upload_batches(sender, batches, commit_sha="sha") is failed
+    assert sender.send_upload_data.call_count == 2
@@ -1,5 +1,5 @@
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from codecov_cli.helpers.versioning_systems import (
     GitVersioningSystem,
@@ -222,3 +222,94 @@ def test_generate_network_with_no_versioning_system(tmp_path):
     (tmp_path / "coverage.xml").touch()
     found_files = versioning_system.list_relevant_files(tmp_path)
     assert len(found_files) == 1
+
+
+@patch("codecov_cli.services.upload.upload_collector.logger")
+def test_generate_upload_data_size_limits(mock_logger, tmp_path):
+    for name, size in [
+        ("coverage-a.xml", 300),
+        ("coverage-b.xml", 100),
+        ("coverage-c.xml", 5000),
+        ("coverage-d.xml", 200),
+        ("coverage-e.xml", 400),
+    ]:
+        (tmp_path / name).write_bytes(b"x" * size)
+    file_finder = MagicMock()
+    file_finder.find_files.return_value = [
+        UploadCollectionResultFile(tmp_path / f"coverage-{letter}.xml")
+        for letter in "abcde"
+    ]
+    network_finder = MagicMock()
+    network_finder.find_files.return_value = []
+
+    collector = UploadCollector(
+        [],
+        network_finder,
+        file_finder,
+        {},
+        disable_file_fixes=True,
+        max_report_file_bytes=1000,
+        max_report_total_bytes=700,
+    )
+    res = collector.generate_upload_data()
+
+    assert [file.path.name for file in res.files] == [
+        "coverage-a.xml",
+        "coverage-d.xml",
+        "coverage-b.xml",
+    ]
+    mock_logger.warning.assert_any_call(
+        f"Skipping {tmp_path}/coverage-c.xml, its 5000 bytes are over the limit of 1000 bytes per report file"
+    )
+    mock_logger.warning.assert_any_call(
+        "Skipping 1 report files, uploading them would go over the limit of 700 bytes in total",
+        extra=dict(extra_log_attributes=dict(files=[f"{tmp_path}/coverage-e.xml"])),
+    )
+
+
+def test_generate_upload_data_size_limits_use_listed_sizes(tmp_path, mocker):
+    (tmp_path / "coverage.xml").write_bytes(b"x" * 100)
+    (tmp_path / "given.xml").write_bytes(b"x" * 2000)
+    file_finder = MagicMock()
+    file_finder.find_files.return_value = [
+        UploadCollectionResultFile(tmp_path / "coverage.xml", listed_size=5000),
+        UploadCollectionResultFile(tmp_path / "given.xml"),
+    ]
+    network_finder = MagicMock()
+    network_finder.find_files.return_value = []
+    get_size = mocker.spy(UploadCollectionResultFile, "get_size")
+
+    collector = UploadCollector(
+        [],
+        network_finder,
+        file_finder,
+        {},
+        disable_file_fixes=True,
+        max_report_file_bytes=3000,
+    )
+    res = collector.generate_upload_data()
+
+    # The size listed when walking is taken as it is, only the other file is stat-ed
+    assert [file.path.name for file in res.files] == ["given.xml"]
+    assert get_size.call_count == 1
+
+
+def test_generate_upload_data_orders_largest_first(tmp_path):
+    for name, size in [("a.xml", 1), ("b.xml", 30), ("c.xml", 20)]:
+        (tmp_path / name).write_bytes(b"x" * size)
+    file_finder = MagicMock()
+    file_finder.find_files.return_value = [
+        UploadCollectionResultFile(tmp_path / name)
+        for name in ["a.xml", "b.xml", "missing.xml", "c.xml"]
+    ]
+    network_finder = MagicMock()
+    network_finder.find_files.return_value = []
+
+    res = UploadCollector([], network_finder, file_finder, {}).generate_upload_data()
+
+    assert [file.path.name for file in res.files] == [
+        "b.xml",
+        "c.xml",
+        "a.xml",
+        "missing.xml",
+    ]
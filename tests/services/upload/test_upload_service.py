@@ -96,11 +96,21 @@ def test_do_upload_logic_happy_path_legacy_uploader(mocker):
             "gcov_ignore": None,
             "gcov_include": None,
             "project_root": None,
+            "search_workers": 1,
             "swift_project": "App",
         },
     )
     mock_select_file_finder.assert_called_with(
-        None, None, None, False, ReportType.COVERAGE
+        None,
+        None,
+        None,
+        False,
+        ReportType.COVERAGE,
+        1,
+        None,
+        "walk",
+        versioning_system,
+        False,
     )
     mock_select_network_finder.assert_called_with(
         versioning_system,
@@ -108,6 +118,7 @@ def test_do_upload_logic_happy_path_legacy_uploader(mocker):
         network_filter=None,
         network_prefix=None,
         network_root_folder=None,
+        network_rules=(),
     )
     mock_generate_upload_data.assert_called_with(ReportType.COVERAGE)
     mock_send_upload_data.assert_called_with(
@@ -211,11 +222,21 @@ def test_do_upload_logic_happy_path(mocker):
             "gcov_ignore": None,
             "gcov_include": None,
             "project_root": None,
+            "search_workers": 1,
             "swift_project": "App",
         },
     )
     mock_select_file_finder.assert_called_with(
-        None, None, None, False, ReportType.COVERAGE
+        None,
+        None,
+        None,
+        False,
+        ReportType.COVERAGE,
+        1,
+        None,
+        "walk",
+        versioning_system,
+        False,
     )
     mock_select_network_finder.assert_called_with(
         versioning_system,
@@ -223,6 +244,7 @@ def test_do_upload_logic_happy_path(mocker):
         network_filter=None,
         network_prefix=None,
         network_root_folder=None,
+        network_rules=(),
     )
     mock_generate_upload_data.assert_called_with(ReportType.COVERAGE)
     mock_send_upload_data.assert_called_with(
@@ -307,7 +329,16 @@ def test_do_upload_logic_dry_run(mocker):
         )
     out_bytes = parse_outstreams_into_log_lines(outstreams[0].getvalue())
     mock_select_file_finder.assert_called_with(
-        None, None, None, False, ReportType.COVERAGE
+        None,
+        None,
+        None,
+        False,
+        ReportType.COVERAGE,
+        1,
+        None,
+        "walk",
+        versioning_system,
+        False,
     )
     mock_select_network_finder.assert_called_with(
         versioning_system,
@@ -315,6 +346,7 @@ def test_do_upload_logic_dry_run(mocker):
         network_filter=None,
         network_prefix=None,
         network_root_folder=None,
+        network_rules=(),
     )
     assert mock_generate_upload_data.call_count == 1
     assert mock_send_upload_data.call_count == 0
@@ -328,6 +360,7 @@ def test_do_upload_logic_dry_run(mocker):
             "gcov_ignore": None,
             "gcov_include": None,
             "project_root": None,
+            "search_workers": 1,
             "swift_project": "App",
         },
     )
@@ -496,11 +529,21 @@ def test_do_upload_no_cov_reports_found(mocker):
             "gcov_ignore": None,
             "gcov_include": None,
             "project_root": None,
+            "search_workers": 1,
             "swift_project": "App",
         },
     )
     mock_select_file_finder.assert_called_with(
-        None, None, None, False, ReportType.COVERAGE
+        None,
+        None,
+        None,
+        False,
+        ReportType.COVERAGE,
+        1,
+        None,
+        "walk",
+        versioning_system,
+        False,
     )
     mock_select_network_finder.assert_called_with(
         versioning_system,
@@ -508,6 +551,7 @@ def test_do_upload_no_cov_reports_found(mocker):
         network_filter=None,
         network_prefix=None,
         network_root_folder=None,
+        network_rules=(),
     )
     mock_generate_upload_data.assert_called_with(ReportType.COVERAGE)
     mock_upload_completion_call.assert_called_with(
@@ -593,11 +637,21 @@ def test_do_upload_rase_no_cov_reports_found_error(mocker):
             "gcov_ignore": None,
             "gcov_include": None,
             "project_root": None,
+            "search_workers": 1,
             "swift_project": "App",
         },
     )
     mock_select_file_finder.assert_called_with(
-        None, None, None, False, ReportType.COVERAGE
+        None,
+        None,
+        None,
+        False,
+        ReportType.COVERAGE,
+        1,
+        None,
+        "walk",
+        versioning_system,
+        False,
     )
     mock_select_network_finder.assert_called_with(
         versioning_system,
@@ -605,6 +659,7 @@ def test_do_upload_rase_no_cov_reports_found_error(mocker):
         network_filter=None,
         network_prefix=None,
         network_root_folder=None,
+        network_rules=(),
     )
     mock_generate_upload_data.assert_called_with(ReportType.COVERAGE)
 
@@ -679,7 +734,16 @@ def test_do_upload_logic_happy_path_test_results(mocker):
     assert res == UploadSender.send_upload_data.return_value
     mock_select_preparation_plugins.assert_not_called
     mock_select_file_finder.assert_called_with(
-        None, None, None, False, ReportType.TEST_RESULTS
+        None,
+        None,
+        None,
+        False,
+        ReportType.TEST_RESULTS,
+        1,
+        None,
+        "walk",
+        versioning_system,
+        False,
     )
     mock_select_network_finder.assert_called_with(
         versioning_system,
@@ -687,6 +751,7 @@ def test_do_upload_logic_happy_path_test_results(mocker):
         network_filter="some_dir",
         network_prefix="hello/",
         network_root_folder="root/",
+        network_rules=(),
     )
     mock_generate_upload_data.assert_called_with(ReportType.TEST_RESULTS)
     mock_send_upload_data.assert_called_with(
@@ -1,3 +1,8 @@
+import os
+import threading
+
+import pytest
+
 from codecov_cli.types import UploadCollectionResultFile
 
 
@@ -20,6 +25,58 @@ class TestUploadCollectionResultFile(object):
 
         assert UploadCollectionResultFile(file).get_content() == content
 
+    def test_iter_content(self, tmp_path):
+        content = b"first line\nsecondline\nlastline\n"
+        file = tmp_path / "a.txt"
+        file.write_bytes(content)
+
+        chunks = list(UploadCollectionResultFile(file).iter_content(chunk_size=8))
+        assert all(len(chunk) <= 8 for chunk in chunks)
+        assert b"".join(chunks) == content
+
+    def test_open_buffer(self, tmp_path):
+        content = b"first line\nsecondline\nlastline\n"
+        file = tmp_path / "a.txt"
+        file.write_bytes(content)
+
+        with UploadCollectionResultFile(file).open_buffer() as buffer:
+            assert isinstance(buffer, memoryview)
+            assert buffer.readonly
+            assert buffer[6:10] == b"line"
+        with pytest.raises(ValueError):
+            buffer.tobytes()
+
+    def test_open_buffer_empty_file(self, tmp_path):
+        file = tmp_path / "a.txt"
+        file.write_bytes(b"")
+
+        with UploadCollectionResultFile(file).open_buffer() as buffer:
+            assert buffer == b""
+        assert list(UploadCollectionResultFile(file).iter_content()) == []
+
+    def test_open_buffer_keeps_slices_valid(self, tmp_path):
+        file = tmp_path / "a.txt"
+        file.write_bytes(b"abcdef" * 1000)
+
+        with UploadCollectionResultFile(file).open_buffer() as buffer:
+            head = buffer[:6]
+        assert head == b"abcdef"
+
+    @pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+    def test_open_buffer_unmappable_file(self, tmp_path):
+        fifo = tmp_path / "fifo"
+        os.mkfifo(fifo)
+
+        def write():
+            with open(fifo, "wb") as f:
+                f.write(b"piped content")
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        with UploadCollectionResultFile(fifo).open_buffer() as buffer:
+            assert buffer == b"piped content"
+        writer.join()
+
     def test_eq(self, tmp_path):
         p = tmp_path / "a.txt"
 